@@ -0,0 +1,151 @@
+"""Profile memory allocations of long-running polling, to find leaks.
+
+Run with `python benchmarks/allocations.py [cycles]`, 100000 by default. Every
+cycle calls measurement() and combined() of a client, alternating between a v1
+and a v2 client that are served from fixtures by the fake session of the tests.
+
+After a warm-up, tracemalloc snapshots taken before and after all cycles are
+compared, and the difference is reported per source line, in bytes and blocks
+per poll, with the bytes allocated at the peak of a single poll. Exits with
+status 1 when memory grew by more than GROWTH_LIMIT bytes.
+"""
+
+import argparse
+import asyncio
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from homewizard_energy import HomeWizardEnergyV1, HomeWizardEnergyV2
+
+# The fake session is shared with the memory tests
+sys.path.insert(0, str(Path(__file__).parent.parent / "tests"))
+
+# pylint: disable-next=wrong-import-order,wrong-import-position
+import fake_session  # noqa: E402
+
+V1_RESPONSES = {
+    "/api": "v1/fixtures/HWE-P1/device.json",
+    "/api/v1/data": "v1/fixtures/HWE-P1/data.json",
+    "/api/v1/system": "v1/fixtures/HWE-P1/system.json",
+}
+V2_RESPONSES = {
+    "/api": "v2/fixtures/HWE-P1/device.json",
+    "/api/measurement": (
+        "v2/fixtures/HWE-P1/measurement_3_phase_with_gas_with_watermeter.json"
+    ),
+    "/api/system": "v2/fixtures/HWE-P1/system.json",
+    "/api/batteries": "v2/fixtures/HWE-P1/batteries.json",
+}
+
+WARMUP_CYCLES = 1000
+GROWTH_LIMIT = 64 * 1024
+
+
+def create_clients() -> list:
+    """Create a v1 and a v2 client that use fake sessions."""
+    client = HomeWizardEnergyV2(
+        "127.0.0.1",
+        identifier="appliance/p1dongle/1",
+        token="1",
+        clientsession=fake_session.FakeSession(V2_RESPONSES),
+    )
+    # Skip loading the certificate authority, the fake does not use TLS
+    client._ssl = True  # pylint: disable=protected-access
+    return [
+        HomeWizardEnergyV1(
+            "127.0.0.1", clientsession=fake_session.FakeSession(V1_RESPONSES)
+        ),
+        client,
+    ]
+
+
+async def cycle(client) -> None:
+    """Poll a client once."""
+    await client.measurement()
+    await client.combined()
+
+
+async def profile(cycles: int, sites: int) -> int:
+    """Print the allocations of polling, return the growth in bytes."""
+    clients = create_clients()
+    for index in range(WARMUP_CYCLES):
+        await cycle(clients[index % 2])
+
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    current, _ = tracemalloc.get_traced_memory()
+    for client in clients:
+        await client.measurement()
+        _, peak = tracemalloc.get_traced_memory()
+        print(f"peak of {type(client).__name__}.measurement() {peak - current:,} bytes")
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+    gc.collect()
+
+    before = tracemalloc.take_snapshot()
+    start = time.perf_counter()
+    for index in range(cycles):
+        await cycle(clients[index % 2])
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    # Leave out the allocations of the profiler and of the fake session
+    filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, fake_session.__file__),
+    ]
+    diff = after.filter_traces(filters).compare_to(
+        before.filter_traces(filters), "lineno"
+    )
+    growth = sum(stat.size_diff for stat in diff)
+    polls = cycles * 2
+
+    print(
+        f"{polls:,} polls in {elapsed:.1f}s, memory grew {growth:,} bytes"
+        f" ({growth / polls:.2f} bytes/poll)"
+    )
+    print(f"{'bytes/poll':>10} {'blocks/poll':>11}  site")
+    for stat in diff[:sites]:
+        if stat.size_diff:
+            frame = stat.traceback[0]
+            print(
+                f"{stat.size_diff / polls:>10.2f} {stat.count_diff / polls:>11.4f}"
+                f"  {frame.filename}:{frame.lineno}"
+            )
+    return growth
+
+
+def main() -> None:
+    """Profile the polling and fail when memory is not flat."""
+    parser = argparse.ArgumentParser(
+        description="Profile memory allocations of long-running polling."
+    )
+    parser.add_argument(
+        "cycles",
+        type=int,
+        nargs="?",
+        default=100_000,
+        help="number of cycles, each polls one client (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--sites",
+        type=int,
+        default=15,
+        help="number of source lines to report (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    growth = asyncio.run(profile(args.cycles, args.sites))
+    if growth > GROWTH_LIMIT:
+        print(f"memory grew by more than {GROWTH_LIMIT:,} bytes")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""Benchmark polling a fleet of simulated devices through the clients.
+
+Run with `python benchmarks/fleet.py --devices 200 --concurrency 10 50 200`.
+The devices are simulated by tests/simulator.py, which requires cryptography.
+They are served by a separate process on loopback addresses, so the reported
+CPU time per poll is spent by the clients only. For every concurrency and interval, the benchmark reports:
+
+    polls/s    Completed polls per second
+    p50, p99   Latency of a poll in milliseconds
+    cpu/poll   CPU time of the client process per poll in microseconds
+    lag p99    Event loop lag in milliseconds, how late a timer fires
+    errors     Failed polls
+
+Pass --json to write the results to a file, to compare runs of transport
+changes made on the same machine.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from multiprocessing.connection import Connection
+from pathlib import Path
+
+from homewizard_energy import HomeWizardEnergyV1, HomeWizardEnergyV2
+from homewizard_energy.errors import HomeWizardEnergyException
+from homewizard_energy.offload import OffloadDecoder
+
+# The simulator is test tooling and not part of the package
+sys.path.insert(0, str(Path(__file__).parent.parent / "tests"))
+
+# pylint: disable-next=wrong-import-order,wrong-import-position
+from simulator import DeviceSimulator, SimulatedDevice  # noqa: E402
+
+# How often the event loop lag is sampled, in seconds
+LAG_INTERVAL = 0.01
+
+
+@dataclass
+class Result:
+    """Result of a run."""
+
+    concurrency: int
+    interval: float
+    polls: int
+    errors: int
+    polls_per_s: float
+    p50_ms: float
+    p99_ms: float
+    cpu_per_poll_us: float
+    lag_p99_ms: float
+    lag_max_ms: float
+
+
+def create_devices(count: int, api_version: int, latency: float) -> list:
+    """Create devices on separate loopback addresses."""
+    return [
+        SimulatedDevice(
+            serial=f"5c2faf{index:06x}",
+            product_type="HWE-P1",
+            api_version=api_version or 1 + index % 2,
+            host=f"127.0.{index // 250}.{index % 250 + 2}",
+            latency_s=latency,
+            tokens={"benchmark"},
+        )
+        for index in range(count)
+    ]
+
+
+def serve(devices: list, pipe: Connection) -> None:
+    """Serve the devices until the pipe is closed, in a separate process."""
+
+    async def run() -> None:
+        async with DeviceSimulator(devices) as simulator:
+            pipe.send((simulator.cacert, [device.port for device in devices]))
+            await asyncio.get_running_loop().run_in_executor(None, pipe.recv)
+
+    asyncio.run(run())
+
+
+def quantile(values: list[float], q: float) -> float:
+    """Return a quantile of values, 0 when empty."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def monitor_lag(lags: list[float], stop: asyncio.Event) -> None:
+    """Measure how late the event loop wakes up a sleeping task."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        lags.append(time.perf_counter() - start - LAG_INTERVAL)
+
+
+async def poll(
+    clients: list,
+    concurrency: int,
+    interval: float,
+    duration: float,
+) -> Result:
+    """Poll every client each interval for a duration, limiting concurrency."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    lags: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    stop = asyncio.Event()
+
+    async def run(client) -> None:
+        nonlocal errors
+        while (now := time.perf_counter()) < deadline:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    await client.measurement()
+                except HomeWizardEnergyException:
+                    errors += 1
+                else:
+                    latencies.append(time.perf_counter() - start)
+            if interval:
+                await asyncio.sleep(max(0.0, now + interval - time.perf_counter()))
+
+    lag_task = asyncio.create_task(monitor_lag(lags, stop))
+    cpu = time.process_time()
+    start = time.perf_counter()
+    await asyncio.gather(*(run(client) for client in clients))
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu
+    stop.set()
+    await lag_task
+
+    polls = len(latencies) + errors
+    return Result(
+        concurrency=concurrency,
+        interval=interval,
+        polls=polls,
+        errors=errors,
+        polls_per_s=polls / elapsed,
+        p50_ms=quantile(latencies, 0.5) * 1000,
+        p99_ms=quantile(latencies, 0.99) * 1000,
+        cpu_per_poll_us=cpu / polls * 1e6 if polls else 0.0,
+        lag_p99_ms=quantile(lags, 0.99) * 1000,
+        lag_max_ms=max(lags, default=0.0) * 1000,
+    )
+
+
+def create_client(device: SimulatedDevice, cacert: str, decoder: OffloadDecoder | None):
+    """Create a client for a device, like an application would."""
+    if device.api_version == 1:
+        return HomeWizardEnergyV1(device.address, decoder=decoder)
+    return HomeWizardEnergyV2(
+        device.address,
+        identifier=device.identifier,
+        token="benchmark",
+        decoder=decoder,
+        cacert=cacert,
+    )
+
+
+async def benchmark(args: argparse.Namespace, cacert: str, devices: list) -> list:
+    """Run the benchmark for every concurrency and interval."""
+    decoder = None
+    if args.offload:
+        executor = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+        decoder = OffloadDecoder(executor[args.offload](), threshold=0)
+    clients = [create_client(device, cacert, decoder) for device in devices]
+    results = []
+    try:
+        # Warm up connections and TLS sessions
+        await poll(clients, len(clients), 0, 0.5)
+
+        for interval in args.interval:
+            for concurrency in args.concurrency:
+                result = await poll(clients, concurrency, interval, args.duration)
+                results.append(result)
+                print(
+                    f"{result.concurrency:>11} {result.interval:>8.2f}"
+                    f" {result.polls_per_s:>9,.0f} {result.p50_ms:>7.1f}"
+                    f" {result.p99_ms:>7.1f} {result.cpu_per_poll_us:>9,.0f}"
+                    f" {result.lag_p99_ms:>8.1f} {result.errors:>6}",
+                    flush=True,
+                )
+    finally:
+        await asyncio.gather(*(client.close() for client in clients))
+    return results
+
+
+def main() -> None:
+    """Start the simulated devices and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument(
+        "--api-version",
+        type=int,
+        choices=(0, 1, 2),
+        default=0,
+        help="API version of the devices, 0 for half of each",
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 100])
+    parser.add_argument(
+        "--interval",
+        type=float,
+        nargs="+",
+        default=[0.0],
+        help="Seconds between polls of a device, 0 to poll as fast as possible",
+    )
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument(
+        "--offload",
+        choices=("thread", "process"),
+        help="Decode all responses in a thread or process pool",
+    )
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    devices = create_devices(args.devices, args.api_version, args.latency)
+
+    pipe, child_pipe = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=serve, args=(devices, child_pipe))
+    server.start()
+    try:
+        cacert, ports = pipe.recv()
+        for device, port in zip(devices, ports, strict=True):
+            device.port = port
+
+        print(
+            f"{len(devices)} devices, {args.duration:.0f}s per run\n"
+            "concurrency interval   polls/s  p50 ms  p99 ms  cpu/poll"
+            "   lag p99 errors"
+        )
+        results = asyncio.run(benchmark(args, cacert, devices))
+    finally:
+        pipe.send(None)
+        server.join()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "devices": len(devices),
+                    "duration": args.duration,
+                    "results": [asdict(result) for result in results],
+                },
+                file,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
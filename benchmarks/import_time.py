@@ -0,0 +1,109 @@
+"""Benchmark the startup cost of the library against a baseline.
+
+Run with `python benchmarks/import_time.py [rounds] [--baseline REF]`. Every
+step is timed in a new interpreter, so nothing is cached between rounds, for
+the library in this tree and for the library at the baseline git ref, main by
+default. The median of both and the change are printed. Use
+`python -X importtime -c "import homewizard_energy"` to see the cost per module.
+"""
+
+import argparse
+import io
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+FIXTURE = (
+    ROOT / "tests/v2/fixtures/HWE-P1/measurement_3_phase_with_gas_with_watermeter.json"
+)
+
+# Code that is timed, after the setup has run
+STEPS = {
+    "import homewizard_energy": ("", "import homewizard_energy"),
+    "import the v2 client": (
+        "",
+        "from homewizard_energy import HomeWizardEnergyV2",
+    ),
+    "import models": ("", "import homewizard_energy.models"),
+    "first Measurement decode": (
+        f"from homewizard_energy.models import Measurement\n"
+        f"payload = open({str(FIXTURE)!r}, 'rb').read()",
+        "Measurement.from_json(payload)",
+    ),
+}
+
+TEMPLATE = """
+import time
+{setup}
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start)
+"""
+
+
+def measure(tree: Path, setup: str, code: str) -> float:
+    """Return the seconds code takes to run in a new interpreter on a tree."""
+    result = subprocess.run(
+        [sys.executable, "-c", TEMPLATE.format(setup=setup, code=code)],
+        capture_output=True,
+        check=True,
+        cwd=tree,
+        text=True,
+    )
+    return float(result.stdout)
+
+
+def extract(ref: str, directory: str) -> Path:
+    """Extract the library at a git ref into a directory."""
+    archive = subprocess.run(
+        ["git", "archive", ref, "homewizard_energy"],
+        capture_output=True,
+        check=True,
+        cwd=ROOT,
+    ).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(directory, filter="data")
+    return Path(directory)
+
+
+def main() -> None:
+    """Print the median time of every step, for this tree and the baseline."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the startup cost of the library against a baseline."
+    )
+    parser.add_argument(
+        "rounds",
+        type=int,
+        nargs="?",
+        default=20,
+        help="number of interpreters per step and tree (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--baseline",
+        default="main",
+        help="git ref of the library to compare with (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        baseline = extract(args.baseline, directory)
+        print(f"{'':<28} {'current':>10} {args.baseline[:10]:>10} {'change':>8}")
+        for name, (setup, code) in STEPS.items():
+            current = statistics.median(
+                measure(ROOT, setup, code) for _ in range(args.rounds)
+            )
+            before = statistics.median(
+                measure(baseline, setup, code) for _ in range(args.rounds)
+            )
+            print(
+                f"{name:<28} {current * 1000:>7.1f} ms {before * 1000:>7.1f} ms"
+                f" {(current - before) / before:>+8.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark writing and replaying a binary measurement log.
+
+Run with `python benchmarks/measurement_log.py [records]`. The log is written
+from the v2 HWE-P1 fixture and can be kept as corpus for other benchmarks by
+passing a path as second argument.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from homewizard_energy.measurement_log import MeasurementLog, MeasurementLogReader
+from homewizard_energy.models import Measurement
+
+FIXTURE = (
+    Path(__file__).parent.parent
+    / "tests/v2/fixtures/HWE-P1/measurement_3_phase_with_gas_with_watermeter.json"
+)
+
+
+def run(path: Path, records: int) -> None:
+    """Write and replay a log, printing the throughput."""
+    measurement = Measurement.from_json(FIXTURE.read_text(encoding="utf-8"))
+
+    start = time.perf_counter()
+    with MeasurementLog(path) as log:
+        for index in range(records):
+            log.append(measurement, timestamp=index)
+    print(f"append       {records / (time.perf_counter() - start):>12,.0f} records/s")
+
+    with MeasurementLogReader(path) as reader:
+        start = time.perf_counter()
+        for _ in reader.records():
+            pass
+        print(
+            f"records      {records / (time.perf_counter() - start):>12,.0f} records/s"
+        )
+
+        start = time.perf_counter()
+        for _ in reader.measurements():
+            pass
+        print(
+            f"measurements {records / (time.perf_counter() - start):>12,.0f} records/s"
+        )
+
+
+def main(records: str = "1000000", path: str | None = None) -> None:
+    """Benchmark a log in path, or in a temporary directory."""
+    if path is not None:
+        run(Path(path), int(records))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        run(Path(directory) / "measurements.log", int(records))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
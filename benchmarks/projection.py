@@ -0,0 +1,53 @@
+"""Benchmark the CPU cost of decoding a fleet poll with and without projection.
+
+Run with `python benchmarks/projection.py [devices] [rounds]`.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from homewizard_energy.models import Measurement
+from homewizard_energy.projection import project_measurement
+
+FIXTURES = Path(__file__).parent.parent / "tests"
+PAYLOADS = {
+    "v1 HWE-P1": FIXTURES / "v1/fixtures/HWE-P1/data.json",
+    "v1 HWE-KWH3": FIXTURES / "v1/fixtures/HWE-KWH3/data.json",
+    "v2 HWE-P1": FIXTURES
+    / "v2/fixtures/HWE-P1/measurement_3_phase_with_gas_with_watermeter.json",
+    "v2 HWE-KWH3": FIXTURES / "v2/fixtures/HWE-KWH3/measurement.json",
+}
+
+
+def cpu_per_poll(decode, payload: str, devices: int, rounds: int) -> float:
+    """Return the CPU time in milliseconds to decode one poll of the fleet."""
+    start = time.process_time()
+    for _ in range(rounds):
+        for _ in range(devices):
+            decode(payload)
+    return (time.process_time() - start) / rounds * 1000
+
+
+def main(devices: int = 800, rounds: int = 20) -> None:
+    """Print decode CPU time per fleet poll."""
+    print(f"CPU per poll of {devices} devices, in ms")
+    print(f"{'payload':<14}{'full':>10}{'power_w':>10}{'saved':>10}")
+
+    for name, path in PAYLOADS.items():
+        payload = path.read_text(encoding="utf-8")
+        # Wrap both decoders in a lambda, so they pay the same call overhead
+        full = cpu_per_poll(
+            lambda p: Measurement.from_json(p), payload, devices, rounds
+        )
+        projected = cpu_per_poll(
+            lambda p: project_measurement(p, ("power_w",)), payload, devices, rounds
+        )
+        print(
+            f"{name:<14}{full:>10.2f}{projected:>10.2f}"
+            f"{(1 - projected / full) * 100:>9.0f}%"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,47 @@
+"""Benchmark rendering a fleet in Prometheus text format.
+
+Run with `python benchmarks/prometheus.py [devices] [rounds]`.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from homewizard_energy.models import Batteries, Device, Measurement, System
+from homewizard_energy.prometheus import PrometheusExporter
+
+FIXTURES = Path(__file__).parent.parent / "tests/v2/fixtures"
+
+
+def load(model, path: str):
+    """Decode a fixture."""
+    return model.from_json((FIXTURES / path).read_text(encoding="utf-8"))
+
+
+def main(devices: int = 2000, rounds: int = 20) -> None:
+    """Print the time to render a scrape of the fleet."""
+    device = load(Device, "HWE-P1/device.json")
+    measurement = load(
+        Measurement, "HWE-P1/measurement_3_phase_with_gas_with_watermeter.json"
+    )
+    system = load(System, "HWE-P1/system.json")
+    batteries = load(Batteries, "HWE-P1/batteries.json")
+
+    exporter = PrometheusExporter()
+    for index in range(devices):
+        device.serial = f"{index:012x}"
+        exporter.update(device, measurement, system, batteries)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        text = exporter.render()
+    elapsed = (time.perf_counter() - start) / rounds
+
+    print(
+        f"{devices} devices, {text.count(chr(10))} lines, {len(text) / 1e6:.1f} MB: "
+        f"{elapsed * 1000:.1f} ms per scrape, {devices / elapsed:,.0f} devices/s"
+    )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,126 @@
+"""Benchmark decoding of the models, for every fixture of the test suite.
+
+Store a baseline and compare later runs against it, failing on a regression:
+
+    pytest --no-cov benchmarks --benchmark-autosave
+    pytest --no-cov benchmarks --benchmark-compare --benchmark-compare-fail=min:25%
+
+The fastest round is compared, as it is the least affected by other load on the
+machine. Baselines are stored per machine in .benchmarks, only compare runs made
+on the same machine.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from homewizard_energy.models import (
+    Batteries,
+    CombinedModels,
+    Device,
+    Measurement,
+    State,
+    System,
+)
+
+FIXTURES = Path(__file__).parent.parent / "tests"
+
+# Model of a fixture, by the start of its file name
+MODELS = {
+    "device": Device,
+    "data": Measurement,
+    "measurement": Measurement,
+    "system": System,
+    "state": State,
+    "batteries": Batteries,
+}
+
+
+def _model(path: Path) -> type | None:
+    """Return the model a fixture holds, None when it holds no model."""
+    return next(
+        (model for prefix, model in MODELS.items() if path.stem.startswith(prefix)),
+        None,
+    )
+
+
+def _decodes(model: type, payload: str) -> bool:
+    """Return if a payload decodes, some fixtures hold invalid payloads."""
+    try:
+        model.from_json(payload)
+    except Exception:  # noqa: BLE001 pylint: disable=broad-exception-caught
+        return False
+    return True
+
+
+def _fixtures() -> list:
+    """Return a parameter per fixture that decodes into a model."""
+    params = []
+    for path in sorted(FIXTURES.glob("v*/fixtures/*/*.json")):
+        if (model := _model(path)) is None:
+            continue
+        payload = path.read_text(encoding="utf-8")
+        if _decodes(model, payload):
+            name = path.relative_to(FIXTURES).as_posix().replace("/fixtures", "")
+            params.append(pytest.param(model, payload, id=name))
+    return params
+
+
+def _devices() -> list:
+    """Return a parameter per measurement fixture, with the models of its device.
+
+    The other models are the first fixture of their type in the same directory.
+    """
+    params = []
+    for directory in sorted(FIXTURES.glob("v*/fixtures/*")):
+        models: dict[type, list] = {}
+        for path in sorted(directory.glob("*.json")):
+            payload = path.read_text(encoding="utf-8")
+            if (model := _model(path)) is not None and _decodes(model, payload):
+                models.setdefault(model, []).append((path, model.from_json(payload)))
+
+        if Device not in models:
+            continue
+
+        device = models[Device][0][1]
+        others = {
+            model: models.get(model, [(None, None)])[0][1] for model in MODELS.values()
+        }
+        for path, measurement in models.get(Measurement, []):
+            name = path.relative_to(FIXTURES).as_posix().replace("/fixtures", "")
+            params.append(
+                pytest.param(
+                    {
+                        "device": device,
+                        "measurement": measurement,
+                        "system": others[System],
+                        "state": others[State],
+                        "batteries": others[Batteries],
+                    },
+                    id=name,
+                )
+            )
+    return params
+
+
+@pytest.mark.parametrize(("model", "payload"), _fixtures())
+def test_decode(benchmark, model: type, payload: str) -> None:
+    """Benchmark decoding a fixture."""
+    # Look up from_json on every round instead of binding it once
+    result = benchmark(lambda: model.from_json(payload))
+    assert isinstance(result, model)
+
+
+@pytest.mark.parametrize("models", _devices())
+def test_combined_models(benchmark, models: dict) -> None:
+    """Benchmark combining the decoded models of a device."""
+    result = benchmark(
+        lambda: CombinedModels(
+            device=models["device"],
+            measurement=models["measurement"],
+            state=models["state"],
+            system=models["system"],
+            batteries=models["batteries"],
+        )
+    )
+    assert result.device is models["device"]
@@ -1,11 +1,25 @@
 """HomeWizard Energy API library."""
 
-from aiohttp import ClientSession
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
 from .errors import DisabledError, InvalidStateError, RequestError, UnsupportedError
-from .homewizard_energy import HomeWizardEnergy
-from .v1 import HomeWizardEnergyV1
-from .v2 import HomeWizardEnergyV2
+
+if TYPE_CHECKING:
+    from aiohttp import ClientSession
+
+    from .homewizard_energy import HomeWizardEnergy
+    from .v1 import HomeWizardEnergyV1
+    from .v2 import HomeWizardEnergyV2
+
+# Clients are imported on first use, importing them loads aiohttp and the models
+_LAZY_IMPORTS = {
+    "HomeWizardEnergy": ".homewizard_energy",
+    "HomeWizardEnergyV1": ".v1",
+    "HomeWizardEnergyV2": ".v2",
+}
 
 __all__ = [
     "DisabledError",
@@ -18,8 +32,26 @@ __all__ = [
 ]
 
 
+def __getattr__(name: str) -> Any:
+    """Import a client on first access."""
+    if (module := _LAZY_IMPORTS.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """Return the attributes of the module, including the lazy imports."""
+    return sorted({*globals(), *_LAZY_IMPORTS})
+
+
 async def has_v2_api(host: str, websession: ClientSession | None = None) -> bool:
     """Check if the device has support for the v2 api."""
+    # pylint: disable-next=import-outside-toplevel
+    from aiohttp import ClientSession
+
     websession_provided = websession is not None
     if websession is None:
         websession = ClientSession()
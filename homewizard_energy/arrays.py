@@ -0,0 +1,102 @@
+"""Export measurements to NumPy arrays.
+
+NumPy is an optional dependency, install it with the 'numpy' extra to use this module.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable, Sequence
+from itertools import chain
+
+try:
+    import numpy as np
+except ImportError as exception:  # pragma: no cover
+    raise ImportError(
+        "homewizard_energy.arrays requires NumPy, "
+        "install it with 'pip install python-homewizard-energy[numpy]'"
+    ) from exception
+
+from .columnar import NUMERIC_MEASUREMENT_FIELDS, field_getter
+from .history import MeasurementHistory
+from .models import Measurement
+
+# Key under which the monotonic timestamps of a MeasurementHistory are exported
+MONOTONIC = "monotonic"
+
+# Fields that are reported per phase, mapped to the key of their stacked array
+PHASE_GROUPS: dict[tuple[str, str, str], str] = {
+    (name, name.replace("_l1", "_l2"), name.replace("_l1", "_l3")): name.replace(
+        "_l1", "_phases"
+    )
+    for name in NUMERIC_MEASUREMENT_FIELDS
+    if "_l1" in name
+}
+
+
+def _stack_phases(arrays: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """Replace complete groups of l1/l2/l3 arrays with one (n, 3) array."""
+    for group, key in PHASE_GROUPS.items():
+        if all(name in arrays for name in group):
+            arrays[key] = np.column_stack([arrays.pop(name) for name in group])
+
+    return arrays
+
+
+def to_arrays(
+    source: Sequence[Measurement] | MeasurementHistory,
+    fields: Iterable[str] | None = None,
+    phases: bool = False,
+) -> dict[str, np.ndarray]:
+    """Convert measurements to a float64 array per field, with NaN for None.
+
+    Args:
+        source: Measurement objects, or a history. Arrays of a history share
+            memory with it and also contain the 'monotonic' timestamps.
+        fields: Numeric Measurement fields to export, defaults to all of them.
+        phases: Stack l1/l2/l3 fields into one array of shape (n, 3), stored
+            under the field name with 'l1' replaced by 'phases'.
+
+    Returns:
+        A dict with an array per field.
+    """
+    if isinstance(source, MeasurementHistory):
+        fields, _ = field_getter(fields, source.fields)
+        arrays = {MONOTONIC: np.frombuffer(source.timestamps(), dtype=np.float64)}
+        for name in fields:
+            arrays[name] = np.frombuffer(source.column(name), dtype=np.float64)
+
+    else:
+        fields, getter = field_getter(fields)
+        # Gather all values row by row in one flat list and convert it in a single
+        # call, NumPy is a lot slower when it has to convert None itself
+        values = [
+            math.nan if value is None else value
+            for value in chain.from_iterable(map(getter, source))
+        ]
+        matrix = np.fromiter(values, dtype=np.float64, count=len(values))
+        columns = matrix.reshape(len(source), len(fields)).T.copy()
+        arrays = dict(zip(fields, columns, strict=True))
+
+    return _stack_phases(arrays) if phases else arrays
+
+
+def to_structured_array(
+    source: Sequence[Measurement] | MeasurementHistory,
+    fields: Iterable[str] | None = None,
+    phases: bool = False,
+) -> np.ndarray:
+    """Convert measurements to a structured array with a float64 record per sample.
+
+    See `to_arrays` for the arguments, stacked phases are stored as a (3,) subarray.
+    """
+    arrays = to_arrays(source, fields, phases)
+    dtype = np.dtype(
+        [(name, np.float64, values.shape[1:]) for name, values in arrays.items()]
+    )
+
+    records = np.empty(len(source), dtype=dtype)
+    for name, values in arrays.items():
+        records[name] = values
+
+    return records
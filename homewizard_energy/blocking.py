@@ -0,0 +1,134 @@
+"""Detect synchronous sections of a client that block the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable, Coroutine, Generator
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+from pathlib import Path
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+# Report sections that take longer than this, in seconds
+DEFAULT_THRESHOLD = 0.01
+
+# Endpoint the running section is attributed to
+_ENDPOINT: ContextVar[str] = ContextVar("endpoint", default="")
+# Task whose sections are being timed, to not time nested method calls twice
+_TIMED_TASK: ContextVar[asyncio.Task | None] = ContextVar("timed_task", default=None)
+
+_PACKAGE = str(Path(__file__).parent)
+
+
+@dataclass(kw_only=True, frozen=True)
+class BlockingSection:
+    """A synchronous section that took longer than the threshold.
+
+    A section is the code that runs between two awaits, without giving other
+    coroutines a chance to run. Start and end are the source lines of the
+    library where the section started and ended, like 'v2/__init__.py:331'.
+    """
+
+    host: str
+    endpoint: str
+    method: str
+    duration: float
+    start: str
+    end: str
+
+
+def set_endpoint(endpoint: str) -> None:
+    """Attribute the running section to an endpoint."""
+    _ENDPOINT.set(endpoint)
+
+
+def _location(coroutine: Any) -> str:
+    """Return the innermost line of the library a coroutine is suspended at."""
+    location = "-"
+    while (frame := getattr(coroutine, "cr_frame", None)) is not None:
+        if frame.f_code.co_filename.startswith(_PACKAGE):
+            filename = frame.f_code.co_filename[len(_PACKAGE) + 1 :]
+            location = f"{filename}:{frame.f_lineno}"
+        coroutine = coroutine.cr_await
+    return location
+
+
+class _SectionTimer:
+    """Run a coroutine, timing every step it takes until it awaits."""
+
+    __slots__ = ("_coroutine", "_report")
+
+    def __init__(
+        self,
+        coroutine: Coroutine[Any, Any, T],
+        report: Callable[[str, float, str, str], None],
+    ):
+        self._coroutine = coroutine
+        self._report = report
+
+    def __await__(self) -> Generator[Any, Any, T]:
+        coroutine = self._coroutine
+        value: Any = None
+        error: BaseException | None = None
+        start = "-"
+
+        while True:
+            started = time.perf_counter()
+            try:
+                if error is None:
+                    future = coroutine.send(value)
+                else:
+                    future = coroutine.throw(error)
+            except StopIteration as stop:
+                self._report(
+                    _ENDPOINT.get(), time.perf_counter() - started, start, "return"
+                )
+                return stop.value
+            except BaseException:
+                self._report(
+                    _ENDPOINT.get(), time.perf_counter() - started, start, "raise"
+                )
+                raise
+
+            duration = time.perf_counter() - started
+            end = _location(coroutine)
+            self._report(_ENDPOINT.get(), duration, start, end)
+            start = end
+
+            try:
+                value, error = (yield future), None
+            except BaseException as exception:  # pylint: disable=broad-except
+                value, error = None, exception
+
+
+def detect_blocking(
+    func: Callable[..., Coroutine[Any, Any, T]],
+) -> Callable[..., Coroutine[Any, Any, T]]:
+    """Time the synchronous sections of a client method, when enabled."""
+
+    @wraps(func)
+    async def wrapper(self, *args, **kwargs) -> T:
+        # pylint: disable=protected-access
+        if not self._blocking_listeners or _TIMED_TASK.get() is (
+            task := asyncio.current_task()
+        ):
+            # Disabled, or already timed by the method that called this one
+            return await func(self, *args, **kwargs)
+
+        tokens = _TIMED_TASK.set(task), _ENDPOINT.set(func.__name__)
+        try:
+            return await _SectionTimer(
+                func(self, *args, **kwargs),
+                lambda endpoint, duration, start, end: self._on_section(
+                    func.__name__, endpoint, duration, start, end
+                ),
+            )
+        finally:
+            _TIMED_TASK.reset(tokens[0])
+            _ENDPOINT.reset(tokens[1])
+
+    return wrapper
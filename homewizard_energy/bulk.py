@@ -0,0 +1,103 @@
+"""Apply the same update to many devices at once."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import orjson
+
+from .errors import HomeWizardEnergyException, RequestError
+from .homewizard_energy import HomeWizardEnergy
+from .models import State, StateUpdate
+
+# Number of devices that are updated at the same time
+DEFAULT_CONCURRENCY = 32
+# Number of times a device is tried again after a request error
+DEFAULT_RETRIES = 1
+
+
+@dataclass(kw_only=True, frozen=True)
+class BulkResult:
+    """Result of an update of one device."""
+
+    host: str
+    attempts: int
+    state: State | None = None
+    error: HomeWizardEnergyException | None = None
+
+    @property
+    def success(self) -> bool:
+        """Return if the device was updated."""
+        return self.error is None
+
+
+async def update_states(
+    clients: Iterable[HomeWizardEnergy],
+    update: StateUpdate,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    retries: int = DEFAULT_RETRIES,
+    timeout: float | None = None,
+) -> dict[str, BulkResult]:
+    """Apply a state update to many Energy Sockets, like for load shedding.
+
+    The update is encoded once and sent to every device. Devices that fail with
+    a request error, after the retries of the client itself, are tried again
+    after the devices that are waiting for their turn.
+
+    Args:
+        clients: Clients of the devices, devices without state fail with
+            UnsupportedError.
+        update: Update to apply.
+        concurrency: Maximum number of devices that are updated at once.
+        retries: Number of times a device is tried again after a request error.
+        timeout: Seconds after which devices that were not updated yet fail
+            with a RequestError, no limit when not set.
+
+    Returns:
+        The result of every device, by host.
+    """
+    body = orjson.dumps(update.to_dict())
+    semaphore = asyncio.Semaphore(concurrency)
+    results: dict[str, BulkResult] = {}
+
+    async def apply(client: HomeWizardEnergy) -> None:
+        for attempt in range(1, retries + 2):
+            async with semaphore:
+                try:
+                    state = await client.update_state(body)
+                except RequestError as exception:
+                    error: HomeWizardEnergyException = exception
+                except HomeWizardEnergyException as exception:
+                    results[client.host] = BulkResult(
+                        host=client.host, attempts=attempt, error=exception
+                    )
+                    return
+                else:
+                    results[client.host] = BulkResult(
+                        host=client.host, attempts=attempt, state=state
+                    )
+                    return
+            results[client.host] = BulkResult(
+                host=client.host, attempts=attempt, error=error
+            )
+
+    if not (clients := list(clients)):
+        return {}
+
+    tasks = [asyncio.create_task(apply(client)) for client in clients]
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    return {
+        client.host: results.get(client.host)
+        or BulkResult(
+            host=client.host,
+            attempts=0,
+            error=RequestError(f"Timeout updating the device at {client.host}"),
+        )
+        for client in clients
+    }
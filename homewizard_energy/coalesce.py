@@ -0,0 +1,148 @@
+"""Coalesce rapid state and system updates into few writes."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any, Generic, TypeVar
+
+from .homewizard_energy import HomeWizardEnergy
+from .models import State, System
+from .v1 import HomeWizardEnergyV1
+
+T = TypeVar("T")
+
+# Seconds updates are collected before they are written
+DEFAULT_DELAY = 0.1
+
+
+class _Coalescer(Generic[T]):
+    """Merge updates that arrive while waiting, and write them at once."""
+
+    def __init__(self, write: Callable[..., Awaitable[T]], delay: float):
+        self._write = write
+        self._delay = delay
+        self._fields: dict[str, Any] = {}
+        self._waiters: list[asyncio.Future[T]] = []
+        self._task: asyncio.Task | None = None
+        self.writes = 0
+
+    async def update(self, fields: dict[str, Any]) -> T:
+        """Add an update and return the result of the write that includes it."""
+        loop = asyncio.get_running_loop()
+        self._fields.update(fields)
+        future: asyncio.Future[T] = loop.create_future()
+        self._waiters.append(future)
+
+        if self._task is None:
+            self._task = loop.create_task(self._run())
+        return await future
+
+    async def flush(self) -> None:
+        """Wait until all pending updates are written."""
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    async def _run(self) -> None:
+        """Write the collected updates, until no updates arrived while writing."""
+        waiters: list[asyncio.Future[T]] = []
+        try:
+            while self._waiters:
+                await asyncio.sleep(self._delay)
+                fields, self._fields = self._fields, {}
+                waiters, self._waiters = self._waiters, []
+
+                self.writes += 1
+                try:
+                    result = await self._write(**fields)
+                except Exception as exception:  # pylint: disable=broad-except
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_exception(exception)
+                else:
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_result(result)
+        finally:
+            self._task = None
+            # Callers of updates that are not written, like when this task is
+            # cancelled, would wait forever, so cancel their calls too
+            waiters += self._waiters
+            self._fields, self._waiters = {}, []
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.cancel()
+
+
+class WriteCoalescer:
+    """Limit the writes of rapid state() and system() updates to a device.
+
+    Updates are collected for delay seconds, later values replacing earlier
+    values of the same field, and written as one update. Updates that arrive
+    while writing are written next, so a device gets at most one write per
+    delay plus round trip, no matter how fast updates arrive. Every call
+    returns the result of the write that included its update.
+
+    On v1 devices, the status LED brightness is part of the state, so setting
+    it through system() is merged with the state updates.
+    """
+
+    def __init__(self, client: HomeWizardEnergy, delay: float = DEFAULT_DELAY):
+        """Create a coalescer for the updates of a client.
+
+        Args:
+            client: Client of the device to write to.
+            delay: Seconds to collect updates before writing them.
+        """
+        self._client = client
+        self._state: _Coalescer[State] = _Coalescer(client.state, delay)
+        self._system: _Coalescer[System] = _Coalescer(client.system, delay)
+
+    @property
+    def writes(self) -> int:
+        """Return the number of writes sent to the device."""
+        return self._state.writes + self._system.writes
+
+    async def state(
+        self,
+        power_on: bool | None = None,
+        switch_lock: bool | None = None,
+        brightness: int | None = None,
+    ) -> State:
+        """Update the state, see HomeWizardEnergy.state."""
+        return await self._state.update(
+            _given(power_on=power_on, switch_lock=switch_lock, brightness=brightness)
+        )
+
+    async def system(
+        self,
+        cloud_enabled: bool | None = None,
+        status_led_brightness_pct: int | None = None,
+        api_v1_enabled: bool | None = None,
+    ) -> System:
+        """Update the system, see HomeWizardEnergy.system."""
+        if (
+            isinstance(self._client, HomeWizardEnergyV1)
+            and status_led_brightness_pct is not None
+            and cloud_enabled is None
+            and api_v1_enabled is None
+        ):
+            state = await self.state(brightness=status_led_brightness_pct * 2.55)
+            return System(status_led_brightness_pct=state.brightness / 2.55)
+
+        return await self._system.update(
+            _given(
+                cloud_enabled=cloud_enabled,
+                status_led_brightness_pct=status_led_brightness_pct,
+                api_v1_enabled=api_v1_enabled,
+            )
+        )
+
+    async def flush(self) -> None:
+        """Wait until all pending updates are written."""
+        await asyncio.gather(self._state.flush(), self._system.flush())
+
+
+def _given(**fields: Any) -> dict[str, Any]:
+    """Return the fields that are not None."""
+    return {name: value for name, value in fields.items() if value is not None}
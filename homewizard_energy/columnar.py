@@ -0,0 +1,261 @@
+"""Columnar decoding of recorded HomeWizard Energy measurement payloads."""
+
+from __future__ import annotations
+
+import typing
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields as dataclass_fields
+from functools import lru_cache
+from itertools import islice, repeat
+from operator import attrgetter
+from os import PathLike
+from types import NoneType
+from typing import Any
+
+import orjson
+
+from .models import V1_MEASUREMENT_KEYS, Measurement
+
+Columns = dict[str, list[Any]]
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+def _valid_tariff(value: Any) -> int | None:
+    """Convert tariff, dropping values other than 1, 2, 3 or 4 like Measurement does."""
+    tariff = int(value)
+    return tariff if tariff in (1, 2, 3, 4) else None
+
+
+def _build_decoders() -> dict[str, tuple[str, tuple[str, ...], Callable[[Any], Any]]]:
+    """Build the (key, v1 keys, converter) decoder for every Measurement field."""
+    hints = typing.get_type_hints(Measurement)
+    decoders = {}
+
+    for item in dataclass_fields(Measurement):
+        converter = item.metadata.get("deserialize")
+        if converter is None:
+            # Fields are typed as 'X | None', use X as converter
+            converter = next(
+                arg for arg in typing.get_args(hints[item.name]) if arg is not NoneType
+            )
+
+        decoders[item.name] = (
+            item.metadata.get("alias", item.name),
+            V1_MEASUREMENT_KEYS.get(item.name, ()),
+            converter,
+        )
+
+    decoders["tariff"] = (*decoders["tariff"][:2], _valid_tariff)
+    return decoders
+
+
+MEASUREMENT_DECODERS = _build_decoders()
+
+# Measurement fields that hold a number, these can be stored as float
+NUMERIC_MEASUREMENT_FIELDS = tuple(
+    name
+    for name, (_, _, converter) in MEASUREMENT_DECODERS.items()
+    if converter in (float, int, _valid_tariff)
+)
+
+# Numeric fields that only increase, until the meter is replaced or reset
+COUNTER_MEASUREMENT_FIELDS = tuple(
+    name
+    for name in NUMERIC_MEASUREMENT_FIELDS
+    if name.startswith("energy_")
+    or name.endswith("_count")
+    or name in ("total_liter_m3", "cycles")
+)
+
+# Numeric fields that represent an instantaneous value
+GAUGE_MEASUREMENT_FIELDS = tuple(
+    name
+    for name in NUMERIC_MEASUREMENT_FIELDS
+    if name not in COUNTER_MEASUREMENT_FIELDS
+)
+
+
+def field_getter(
+    fields: Iterable[str] | None,
+    available: Sequence[str] = NUMERIC_MEASUREMENT_FIELDS,
+    kind: str = "numeric",
+) -> tuple[tuple[str, ...], Callable[[Measurement], tuple[Any, ...]]]:
+    """Validate requested fields and return them with a getter for their values.
+
+    Args:
+        fields: Requested fields, defaults to all available fields.
+        available: Fields that may be requested.
+        kind: Kind of the available fields, used in the error message.
+
+    Returns:
+        The fields, and a function that returns their values of a Measurement as
+        a tuple, also when there is only one field.
+
+    Raises:
+        ValueError: When no fields or an unavailable field is requested.
+    """
+    fields = tuple(available) if fields is None else tuple(fields)
+    if not fields:
+        raise ValueError("No fields given")
+    if unknown := [name for name in fields if name not in available]:
+        raise ValueError(f"Unknown {kind} Measurement field(s): {', '.join(unknown)}")
+
+    # attrgetter returns a tuple only when getting multiple attributes
+    getter = attrgetter(*fields)
+    if len(fields) == 1:
+        return fields, lambda measurement: (getter(measurement),)
+    return fields, getter
+
+
+def _resolve_fields(fields: Iterable[str] | None) -> tuple[str, ...]:
+    """Validate requested fields, defaulting to all Measurement fields."""
+    if fields is None:
+        return tuple(MEASUREMENT_DECODERS)
+
+    fields = tuple(fields)
+    if unknown := [name for name in fields if name not in MEASUREMENT_DECODERS]:
+        raise ValueError(f"Unknown Measurement field(s): {', '.join(unknown)}")
+
+    return fields
+
+
+def decode_measurement_fields(
+    data: dict[str, Any], fields: Iterable[str] | None = None
+) -> dict[str, Any]:
+    """Decode fields from a single parsed v1 or v2 measurement payload.
+
+    The v1 API is remapped the same way as `Measurement.from_dict` does, without
+    modifying the input or creating a Measurement object.
+    """
+    fields = _resolve_fields(fields)
+    columns = _decode_chunk([data], fields, parsed=True)
+    return {name: column[0] for name, column in columns.items()}
+
+
+@lru_cache
+def _build_lookups(
+    fields: tuple[str, ...],
+) -> tuple[dict[str, list[tuple]], dict[str, list[tuple]]]:
+    """Map payload keys to the (column, converter, overriding keys) they decode into.
+
+    Returns separate lookups for v2 and v1 payloads. A value is skipped when one of
+    its overriding keys is present, which mirrors the fallbacks in V1_MEASUREMENT_KEYS.
+    """
+    v2_lookup: dict[str, list[tuple]] = {}
+    v1_lookup: dict[str, list[tuple]] = {}
+
+    for index, name in enumerate(fields):
+        key, v1_keys, converter = MEASUREMENT_DECODERS[name]
+        v2_lookup.setdefault(key, []).append((index, converter, ()))
+
+        if not v1_keys:
+            v1_lookup.setdefault(key, []).append((index, converter, ()))
+        for position, v1_key in enumerate(v1_keys):
+            v1_lookup.setdefault(v1_key, []).append(
+                (index, converter, v1_keys[:position])
+            )
+
+    return v2_lookup, v1_lookup
+
+
+def _decode_chunk(
+    payloads: list[Any], fields: tuple[str, ...], parsed: bool = False
+) -> Columns:
+    """Decode a chunk of payloads into columns.
+
+    Only the keys present in a payload are visited, fields that are missing are
+    left at None.
+    """
+    columns: list[list[Any]] = [[None] * len(payloads) for _ in fields]
+    v2_lookup, v1_lookup = _build_lookups(fields)
+
+    for row, payload in enumerate(payloads):
+        data = payload if parsed else orjson.loads(payload)
+
+        # v1 responses are recognized by 'wifi_ssid', see Measurement.__pre_deserialize__
+        lookup = v1_lookup if "wifi_ssid" in data else v2_lookup
+        _decode_row(data, lookup, columns, row)
+
+    return dict(zip(fields, columns, strict=True))
+
+
+def _decode_row(
+    data: dict[str, Any],
+    lookup: dict[str, list[tuple]],
+    columns: list[list[Any]],
+    row: int,
+) -> None:
+    """Decode the values of one payload into the given row of the columns."""
+    for key, value in data.items():
+        if value is None or (targets := lookup.get(key)) is None:
+            continue
+
+        for index, converter, overriding_keys in targets:
+            if overriding_keys and any(k in data for k in overriding_keys):
+                continue
+            columns[index][row] = converter(value)
+
+
+def _chunked(
+    payloads: Iterable[str | bytes], chunk_size: int
+) -> Iterator[list[str | bytes]]:
+    """Split payloads in lists of at most chunk_size items."""
+    iterator = iter(payloads)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def decode_measurements(
+    payloads: Iterable[str | bytes],
+    fields: Iterable[str] | None = None,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Columns:
+    """Decode raw measurement payloads into a list of values per field.
+
+    Args:
+        payloads: Raw JSON bodies of '/api/v1/data' (v1) or '/api/measurement' (v2).
+        fields: Measurement fields to decode, defaults to all fields.
+        workers: Number of worker processes, decodes in this process when not set.
+        chunk_size: Number of payloads handed to a worker at once.
+
+    Returns:
+        A dict with a list per field, where each list has a value for every payload.
+    """
+    fields = _resolve_fields(fields)
+    chunks = _chunked(payloads, chunk_size)
+
+    if workers is None:
+        results: Iterable[Columns] = map(_decode_chunk, chunks, repeat(fields))
+        return _concat(results, fields)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return _concat(executor.map(_decode_chunk, chunks, repeat(fields)), fields)
+
+
+def decode_measurement_file(
+    path: str | PathLike[str],
+    fields: Iterable[str] | None = None,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Columns:
+    """Decode a file with one raw measurement payload per line into columns.
+
+    Empty lines are skipped. See `decode_measurements` for the arguments.
+    """
+    with open(path, "rb") as fptr:
+        return decode_measurements(
+            (line for line in fptr if line.strip()), fields, workers, chunk_size
+        )
+
+
+def _concat(results: Iterable[Columns], fields: tuple[str, ...]) -> Columns:
+    """Concatenate decoded chunks in order."""
+    columns: Columns = {name: [] for name in fields}
+    for result in results:
+        for name in fields:
+            columns[name].extend(result[name])
+
+    return columns
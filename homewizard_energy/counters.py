@@ -0,0 +1,139 @@
+"""Detect counter resets and correct counters into monotonic series."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass, replace
+
+from .columnar import COUNTER_MEASUREMENT_FIELDS, field_getter
+from .models import Measurement
+
+# Decreases up to this amount are treated as rounding noise, not as a reset
+DEFAULT_TOLERANCE = 0.001
+
+
+@dataclass(kw_only=True, frozen=True)
+class CounterReset:
+    """A counter that went back, after a meter swap or firmware reset."""
+
+    device: Hashable
+    field: str
+    timestamp: float
+    previous: float
+    value: float
+    offset: float
+
+
+class CounterResetDetector:
+    """Turn counters of a stream of measurements into monotonic series.
+
+    When a counter decreases, the meter is assumed to have started again at zero.
+    The last value before the reset is added to an offset that is applied to all
+    later values, so deltas between corrected values never go negative. Only the
+    last raw value and the offset are kept per counter and per device.
+    """
+
+    def __init__(
+        self,
+        fields: Iterable[str] | None = None,
+        on_reset: Callable[[CounterReset], None] | None = None,
+        tolerance: float = DEFAULT_TOLERANCE,
+    ):
+        """Create a detector.
+
+        Args:
+            fields: Counter fields of Measurement to correct, defaults to all.
+            on_reset: Called with every detected reset.
+            tolerance: Decrease that is ignored instead of treated as a reset.
+        """
+        fields, self._values = field_getter(
+            fields, COUNTER_MEASUREMENT_FIELDS, "counter"
+        )
+
+        self._fields = fields
+        self._on_reset = on_reset
+        self._tolerance = tolerance
+        # Per device, the last raw value and offset of each field
+        self._last: dict[Hashable, list[float | None]] = {}
+        self._offsets: dict[Hashable, list[float]] = {}
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        """Return the corrected fields."""
+        return self._fields
+
+    def offsets(self, device: Hashable = None) -> dict[str, float]:
+        """Return the offsets of the counters of a device that were reset."""
+        return {
+            name: offset
+            for name, offset in zip(
+                self._fields, self._offsets.get(device, ()), strict=False
+            )
+            if offset
+        }
+
+    def update(
+        self,
+        measurement: Measurement,
+        timestamp: float | None = None,
+        device: Hashable = None,
+    ) -> Measurement:
+        """Add a sample and return it with corrected counters.
+
+        Args:
+            measurement: Measurement to add.
+            timestamp: Time of the sample in seconds since epoch, defaults to now.
+            device: Key of the device the measurement is from, like its serial.
+
+        Returns:
+            The measurement itself when no counter of the device was ever reset,
+            otherwise a copy with the offsets applied.
+        """
+        if (last := self._last.get(device)) is None:
+            last = self._last[device] = [None] * len(self._fields)
+            offsets = self._offsets[device] = [0] * len(self._fields)
+        else:
+            offsets = self._offsets[device]
+
+        values = zip(self._fields, self._values(measurement), strict=True)
+        for slot, (name, value) in enumerate(values):
+            if value is None:
+                continue
+
+            previous = last[slot]
+            if previous is not None and value < previous:
+                if previous - value <= self._tolerance:
+                    # Keep the highest value so the noise is not counted twice
+                    continue
+
+                offsets[slot] += previous
+                if self._on_reset is not None:
+                    self._on_reset(
+                        CounterReset(
+                            device=device,
+                            field=name,
+                            timestamp=time.time() if timestamp is None else timestamp,
+                            previous=previous,
+                            value=value,
+                            offset=offsets[slot],
+                        )
+                    )
+            last[slot] = value
+
+        if not any(offsets):
+            return measurement
+
+        return replace(
+            measurement,
+            **{
+                name: getattr(measurement, name) + offset
+                for name, offset in zip(self._fields, offsets, strict=True)
+                if offset and getattr(measurement, name) is not None
+            },
+        )
+
+    def forget(self, device: Hashable = None) -> None:
+        """Remove the state of a device."""
+        self._last.pop(device, None)
+        self._offsets.pop(device, None)
@@ -0,0 +1,143 @@
+"""Store the credentials of v2 devices, to reconnect without pairing again."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from os import PathLike
+
+import orjson
+from aiohttp.client import ClientSession
+
+from .models import Credentials
+from .v2 import HomeWizardEnergyV2
+
+
+class CredentialStore(ABC):
+    """Store of credentials, by the Device.id of the device."""
+
+    @abstractmethod
+    async def load(self) -> dict[str, Credentials]:
+        """Return all stored credentials, by id."""
+
+    @abstractmethod
+    async def save(self, credentials: Iterable[Credentials]) -> None:
+        """Add or replace credentials."""
+
+    @abstractmethod
+    async def remove(self, ids: Iterable[str]) -> None:
+        """Remove the credentials with the given ids."""
+
+
+class FileCredentialStore(CredentialStore):
+    """Store credentials in a JSON file.
+
+    The file is replaced as a whole on every change, through a temporary file in
+    the same directory, so it is never left half written. Like the temporary
+    file, it is only readable by its owner, as it contains the tokens.
+    """
+
+    def __init__(self, path: str | PathLike[str]):
+        """Create a store.
+
+        Args:
+            path: File to store the credentials in, created on the first save.
+        """
+        self._path = os.fspath(path)
+        self._credentials: dict[str, Credentials] | None = None
+        self._lock = asyncio.Lock()
+
+    async def load(self) -> dict[str, Credentials]:
+        """Return all stored credentials, by id."""
+        async with self._lock:
+            return dict(await self._load())
+
+    async def save(self, credentials: Iterable[Credentials]) -> None:
+        """Add or replace credentials."""
+        async with self._lock:
+            stored = dict(await self._load())
+            stored.update((item.id, item) for item in credentials)
+            await self._write(stored)
+
+    async def remove(self, ids: Iterable[str]) -> None:
+        """Remove the credentials with the given ids."""
+        async with self._lock:
+            stored = dict(await self._load())
+            for id_ in ids:
+                stored.pop(id_, None)
+            await self._write(stored)
+
+    async def _load(self) -> dict[str, Credentials]:
+        """Return the stored credentials, reading the file only once."""
+        if self._credentials is None:
+            loop = asyncio.get_running_loop()
+            self._credentials = await loop.run_in_executor(None, self._read)
+        return self._credentials
+
+    def _read(self) -> dict[str, Credentials]:
+        """Read the credentials from the file."""
+        try:
+            with open(self._path, "rb") as file:
+                data = orjson.loads(file.read())
+        except FileNotFoundError:
+            return {}
+
+        return {id_: Credentials.from_dict(item) for id_, item in data.items()}
+
+    async def _write(self, credentials: dict[str, Credentials]) -> None:
+        """Replace the file with the given credentials, then cache them.
+
+        The cache keeps the stored credentials when writing the file fails.
+        """
+        data = orjson.dumps({id_: item.to_dict() for id_, item in credentials.items()})
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._replace, data)
+        self._credentials = credentials
+
+    def _replace(self, data: bytes) -> None:
+        """Write data to a temporary file and move it over the file."""
+        directory = os.path.dirname(os.path.abspath(self._path))
+        descriptor, temporary = tempfile.mkstemp(
+            dir=directory, prefix=".credentials-", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary, self._path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+
+async def restore_clients(
+    store: CredentialStore,
+    clientsession: ClientSession = None,
+    timeout: int = 10,
+) -> dict[str, HomeWizardEnergyV2]:
+    """Create a client for every device in the store.
+
+    The clients have their token, identifier and device restored, so they can
+    be used without requests to pair or to fetch the device first.
+
+    Args:
+        store: Store to load the credentials from.
+        clientsession: Session shared by the clients, every client creates
+            its own session when not given.
+        timeout: Request timeout in seconds.
+
+    Returns:
+        The clients, by id.
+    """
+    clients: dict[str, HomeWizardEnergyV2] = {}
+    for id_, credentials in (await store.load()).items():
+        client = HomeWizardEnergyV2(
+            credentials.host, clientsession=clientsession, timeout=timeout
+        )
+        client.restore(credentials)
+        clients[id_] = client
+    return clients
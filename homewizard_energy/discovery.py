@@ -0,0 +1,195 @@
+"""Find HomeWizard Energy devices by scanning IP networks."""
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from functools import partial
+from http import HTTPStatus
+
+from aiohttp.client import ClientError, ClientSession, ClientTimeout, TCPConnector
+from mashumaro.exceptions import InvalidFieldValue, MissingField
+
+from .models import Device
+
+# Number of probes that are running at the same time, over all networks
+DEFAULT_CONCURRENCY = 256
+# Seconds to wait for a connection, most addresses have no device
+DEFAULT_CONNECT_TIMEOUT = 0.5
+# Seconds to wait for a complete response
+DEFAULT_TIMEOUT = 2.0
+
+V1_PORT = 80
+V2_PORT = 443
+
+Network = str | ipaddress.IPv4Network | ipaddress.IPv6Network
+
+
+@dataclass(kw_only=True, frozen=True)
+class DiscoveredDevice:
+    """Device found by a scan.
+
+    Attributes:
+        ip: Address the device answered on.
+        host: Host to pass to the client of api_version, with the port when it
+            is not the default port.
+        api_version: 2 when the device has the v2 API, 1 otherwise.
+        device: Device object, when the device answered on the v1 API.
+    """
+
+    ip: str
+    host: str
+    api_version: int
+    device: Device | None = None
+
+
+# pylint: disable-next=too-many-arguments
+async def scan(
+    networks: Iterable[Network],
+    clientsession: ClientSession | None = None,
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    timeout: float = DEFAULT_TIMEOUT,
+    v1_port: int | None = V1_PORT,
+    v2_port: int | None = V2_PORT,
+) -> list[DiscoveredDevice]:
+    """Probe every address in the networks for the v1 and v2 API.
+
+    An address has the v1 API when /api returns a device object, and the v2 API
+    when /api over HTTPS answers 401 Unauthorized, like has_v2_api. A fixed
+    number of workers take the probes one by one, and addresses are checked
+    against the earlier networks instead of being remembered, so the memory
+    used grows with the number of devices found, not with the size of the
+    networks.
+
+    Args:
+        networks: Networks to scan, like '192.168.1.0/24', addresses that are
+            in more than one network are probed once.
+        clientsession: Session used for all probes, a session is created for the
+            scan when not given.
+        concurrency: Maximum number of probes running at the same time.
+        connect_timeout: Seconds to wait for a connection.
+        timeout: Seconds to wait for a complete response.
+        v1_port: Port of the v1 API, None to not probe for it.
+        v2_port: Port of the v2 API, None to not probe for it.
+
+    Returns:
+        The devices found, by address.
+    """
+    probes = [
+        (api_version, port, default_port)
+        for api_version, port, default_port in (
+            (1, v1_port, V1_PORT),
+            (2, v2_port, V2_PORT),
+        )
+        if port is not None
+    ]
+    jobs = ((ip, *probe) for ip in _addresses(networks) for probe in probes)
+    # Host and result of the probes that found an API, by address and API version
+    found: dict[str, dict[int, tuple[str, Device | bool]]] = {}
+
+    close_session = clientsession is None
+    if clientsession is None:
+        clientsession = ClientSession(
+            connector=TCPConnector(limit=concurrency, force_close=True)
+        )
+    client_timeout = ClientTimeout(total=timeout, sock_connect=connect_timeout)
+
+    async def worker() -> None:
+        for ip, api_version, port, default_port in jobs:
+            host = _host(ip, port, default_port)
+            if api_version == 1:
+                result: Device | bool | None = await _probe_v1(
+                    clientsession, host, client_timeout
+                )
+            else:
+                result = await _probe_v2(clientsession, host, client_timeout)
+
+            if result:
+                found.setdefault(ip, {})[api_version] = (host, result)
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        if close_session:
+            await clientsession.close()
+
+    return [
+        _discovered(ip, found[ip]) for ip in sorted(found, key=ipaddress.ip_address)
+    ]
+
+
+def _discovered(
+    ip: str, results: dict[int, tuple[str, Device | bool]]
+) -> DiscoveredDevice:
+    """Return the device at an address, by the host and result per API version."""
+    api_version = max(results)
+    device = results[1][1] if 1 in results else None
+    return DiscoveredDevice(
+        ip=ip,
+        host=results[api_version][0],
+        api_version=api_version,
+        device=device if isinstance(device, Device) else None,
+    )
+
+
+def _addresses(networks: Iterable[Network]) -> Iterator[str]:
+    """Return the host addresses of the networks, each address once."""
+    # IP version and first and last host address of the networks so far
+    scanned: list[tuple[int, int, int]] = []
+    for network in map(partial(ipaddress.ip_network, strict=False), networks):
+        for address in network.hosts():
+            value = int(address)
+            if not any(
+                version == address.version and first <= value <= last
+                for version, first, last in scanned
+            ):
+                yield str(address)
+        scanned.append(_host_range(network))
+
+
+def _host_range(
+    network: ipaddress.IPv4Network | ipaddress.IPv6Network,
+) -> tuple[int, int, int]:
+    """Return the IP version and the first and last address of hosts()."""
+    first, last = int(network.network_address), int(network.broadcast_address)
+    if network.prefixlen < network.max_prefixlen - 1:
+        # Like hosts(), leave out the network address, and the broadcast
+        # address of IPv4 networks
+        first += 1
+        if network.version == 4:
+            last -= 1
+    return network.version, first, last
+
+
+def _host(ip: str, port: int, default_port: int) -> str:
+    """Return the host of an address, with the port when it is not the default."""
+    host = f"[{ip}]" if ":" in ip else ip
+    return host if port == default_port else f"{host}:{port}"
+
+
+async def _probe_v1(
+    session: ClientSession, host: str, timeout: ClientTimeout
+) -> Device | None:
+    """Return the device object when the host has the v1 API."""
+    try:
+        async with session.get(f"http://{host}/api", timeout=timeout) as resp:
+            if resp.status != HTTPStatus.OK:
+                return None
+            return Device.from_json(await resp.read())
+    except (ClientError, TimeoutError, ValueError, InvalidFieldValue, MissingField):
+        return None
+
+
+async def _probe_v2(session: ClientSession, host: str, timeout: ClientTimeout) -> bool:
+    """Return if the host has the v2 API."""
+    try:
+        async with session.get(
+            f"https://{host}/api", ssl=False, timeout=timeout
+        ) as resp:
+            return resp.status == HTTPStatus.UNAUTHORIZED
+    except (ClientError, TimeoutError):
+        return False
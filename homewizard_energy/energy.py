@@ -0,0 +1,178 @@
+"""Integrate power samples and reconcile them with the energy counters.
+
+NumPy is an optional dependency, install it with the 'numpy' extra to use this module.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+try:
+    import numpy as np
+except ImportError as exception:  # pragma: no cover
+    raise ImportError(
+        "homewizard_energy.energy requires NumPy, "
+        "install it with 'pip install python-homewizard-energy[numpy]'"
+    ) from exception
+
+from .arrays import MONOTONIC
+
+TARIFFS = (1, 2, 3, 4)
+
+# Counter resolution of most meters is 1 Wh
+DEFAULT_TOLERANCE_KWH = 0.002
+DEFAULT_RELATIVE_TOLERANCE = 0.05
+
+
+def integrate_power(timestamps: np.ndarray, power_w: np.ndarray) -> np.ndarray:
+    """Integrate power over irregular timestamps using the trapezoidal rule.
+
+    Args:
+        timestamps: Sample times in seconds.
+        power_w: Power in W for each sample.
+
+    Returns:
+        Energy in kWh for each interval between two samples, NaN when a power
+        sample of the interval is missing.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    power_w = np.asarray(power_w, dtype=np.float64)
+
+    return (power_w[1:] + power_w[:-1]) * np.diff(timestamps) / (2 * 3_600_000)
+
+
+def _net_delta(arrays: dict[str, np.ndarray], suffix: str) -> np.ndarray:
+    """Return import minus export counter delta per interval, NaN when unknown."""
+    imported = np.diff(arrays[f"energy_import{suffix}_kwh"])
+
+    exported = arrays.get(f"energy_export{suffix}_kwh")
+    if exported is None:
+        return imported
+
+    # Not every meter reports export, treat a missing export counter as no export
+    return imported - np.nan_to_num(np.diff(exported))
+
+
+@dataclass(kw_only=True)
+class EnergyReconciliation:
+    """Integrated power compared with the energy counters, per sample interval.
+
+    All energy arrays are in kWh and have one value per interval, positive for
+    import and negative for export.
+    """
+
+    start: np.ndarray
+    end: np.ndarray
+    integrated_kwh: np.ndarray
+    counter_kwh: np.ndarray
+    tariff_integrated_kwh: dict[int, np.ndarray]
+    tariff_counter_kwh: dict[int, np.ndarray]
+    gaps: np.ndarray
+
+    @property
+    def missing_kwh(self) -> np.ndarray:
+        """Return the energy counted by the meter but not seen in the samples."""
+        return self.counter_kwh - self.integrated_kwh
+
+    def gap_intervals(self) -> list[tuple[float, float, float]]:
+        """Return (start, end, missing kWh) of every interval flagged as gap."""
+        return list(
+            zip(
+                self.start[self.gaps].tolist(),
+                self.end[self.gaps].tolist(),
+                self.missing_kwh[self.gaps].tolist(),
+                strict=True,
+            )
+        )
+
+
+def reconcile(
+    arrays: dict[str, np.ndarray],
+    timestamps: np.ndarray | None = None,
+    tolerance_kwh: float = DEFAULT_TOLERANCE_KWH,
+    relative_tolerance: float = DEFAULT_RELATIVE_TOLERANCE,
+) -> EnergyReconciliation:
+    """Reconcile integrated power_w with the energy counter deltas.
+
+    Args:
+        arrays: Arrays per field, as returned by `homewizard_energy.arrays.to_arrays`.
+            Requires 'power_w' and 'energy_import_kwh', uses the export and
+            t1..t4 counters and 'tariff' when present.
+        timestamps: Sample times in seconds, defaults to the history timestamps.
+        tolerance_kwh: Absolute difference that is still accepted per interval.
+        relative_tolerance: Difference relative to the counter delta that is still
+            accepted per interval.
+
+    Returns:
+        The reconciliation, where an interval is flagged as gap when the total
+        counter disagrees with the samples, when a tariff counter changed more
+        than the samples explain, or when a power sample or counter is missing.
+    """
+    if timestamps is None:
+        timestamps = arrays[MONOTONIC]
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+
+    integrated = integrate_power(timestamps, arrays["power_w"])
+    counter = _net_delta(arrays, "")
+
+    # Tariffs that the meter does not have are exported as NaN only, skip them
+    tariff_counter = {
+        tariff: _net_delta(arrays, f"_t{tariff}")
+        for tariff in TARIFFS
+        if f"energy_import_t{tariff}_kwh" in arrays
+        and not np.isnan(arrays[f"energy_import_t{tariff}_kwh"]).all()
+    }
+
+    # Attribute each interval to the tariff that was active at its start, or to
+    # the tariff whose counter changed most when the tariff is not reported
+    active = np.full(len(integrated), np.nan)
+    if "tariff" in arrays:
+        active = np.asarray(arrays["tariff"], dtype=np.float64)[:-1]
+    if tariff_counter:
+        deltas = np.abs(np.nan_to_num(np.column_stack(list(tariff_counter.values()))))
+        changed = np.array(list(tariff_counter))[np.argmax(deltas, axis=1)]
+        fallback = np.where(deltas.max(axis=1) > 0, changed, np.nan)
+        active = np.where(np.isnan(active), fallback, active)
+
+    tariff_integrated = {
+        tariff: np.where(active == tariff, integrated, 0.0) for tariff in tariff_counter
+    }
+
+    return EnergyReconciliation(
+        start=timestamps[:-1],
+        end=timestamps[1:],
+        integrated_kwh=integrated,
+        counter_kwh=counter,
+        tariff_integrated_kwh=tariff_integrated,
+        tariff_counter_kwh=tariff_counter,
+        gaps=_gaps(
+            integrated,
+            counter,
+            tariff_counter.values(),
+            tolerance_kwh,
+            relative_tolerance,
+        ),
+    )
+
+
+def _gaps(
+    integrated: np.ndarray,
+    counter: np.ndarray,
+    tariff_counters: Iterable[np.ndarray],
+    tolerance_kwh: float,
+    relative_tolerance: float,
+) -> np.ndarray:
+    """Return which intervals the counters disagree with the samples."""
+    difference = np.abs(counter - integrated)
+    allowed = tolerance_kwh + relative_tolerance * np.abs(counter)
+    gaps = np.isnan(integrated) | np.isnan(counter) | (difference > allowed)
+
+    # The tariff of a sample is not exact when the tariff changes within an
+    # interval, so a tariff register only flags a gap when it changed more than
+    # all energy that was seen in the interval
+    for delta in tariff_counters:
+        allowed = tolerance_kwh + relative_tolerance * np.abs(delta)
+        gaps |= np.isnan(delta) | (np.abs(delta) - np.abs(integrated) > allowed)
+
+    return gaps
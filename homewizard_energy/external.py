@@ -0,0 +1,114 @@
+"""Derive flow rates from the readings of external devices, like gas meters."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+from .models import ExternalDevice, Measurement
+
+ExternalDeviceKey = tuple[ExternalDevice.DeviceType | None, str]
+
+
+@dataclass(kw_only=True, frozen=True)
+class ExternalRate:
+    """Average rate of an external device between its last two readings."""
+
+    type: ExternalDevice.DeviceType | None
+    unique_id: str
+    rate: float
+    unit: str
+    start: datetime
+    end: datetime
+    value: float
+
+    def estimate(self, moment: datetime) -> float:
+        """Return the expected reading at a moment, continuing the rate."""
+        return self.value + self.rate * (moment - self.end).total_seconds() / 3600
+
+
+class _Reading:
+    """Last reading of an external device and the rate derived from it."""
+
+    __slots__ = ("rate", "timestamp", "value")
+
+    def __init__(self, timestamp: datetime, value: float):
+        self.timestamp = timestamp
+        self.value = value
+        self.rate: ExternalRate | None = None
+
+
+class ExternalRateEstimator:
+    """Keep the current rate of every external device of a P1 meter.
+
+    External devices report a new reading every 5 minutes up to once an hour,
+    while the meter is polled much more often. The rate, in unit per hour, is
+    only computed when a reading with a new timestamp arrives and is cached
+    until the next one.
+    """
+
+    def __init__(self, on_rate: Callable[[ExternalRate], None] | None = None):
+        """Create an estimator.
+
+        Args:
+            on_rate: Called with every newly computed rate.
+        """
+        self._on_rate = on_rate
+        self._readings: dict[ExternalDeviceKey, _Reading] = {}
+
+    def update(self, measurement: Measurement) -> None:
+        """Add the external devices of a Measurement, usable as measurement listener."""
+        if measurement.external_devices:
+            for device in measurement.external_devices.values():
+                self.update_device(device)
+
+    def update_device(self, device: ExternalDevice) -> ExternalRate | None:
+        """Add a reading and return the current rate of the device."""
+        key = (device.type, device.unique_id)
+        if (reading := self._readings.get(key)) is None:
+            self._readings[key] = _Reading(device.timestamp, device.value)
+            return None
+
+        if device.timestamp == reading.timestamp:
+            return reading.rate
+
+        if device.timestamp < reading.timestamp or device.value < reading.value:
+            # Clock set back or meter replaced, start again from this reading
+            self._readings[key] = _Reading(device.timestamp, device.value)
+            return None
+
+        hours = (device.timestamp - reading.timestamp).total_seconds() / 3600
+        reading.rate = ExternalRate(
+            type=device.type,
+            unique_id=device.unique_id,
+            rate=(device.value - reading.value) / hours,
+            unit=f"{device.unit}/h",
+            start=reading.timestamp,
+            end=device.timestamp,
+            value=device.value,
+        )
+        reading.timestamp = device.timestamp
+        reading.value = device.value
+
+        if self._on_rate is not None:
+            self._on_rate(reading.rate)
+
+        return reading.rate
+
+    def rate(
+        self, device_type: ExternalDevice.DeviceType | None, unique_id: str
+    ) -> ExternalRate | None:
+        """Return the cached rate of a device, None until two readings are known."""
+        if (reading := self._readings.get((device_type, unique_id))) is None:
+            return None
+
+        return reading.rate
+
+    def rates(self) -> dict[ExternalDeviceKey, ExternalRate]:
+        """Return the cached rate of every device that has one."""
+        return {
+            key: reading.rate
+            for key, reading in self._readings.items()
+            if reading.rate is not None
+        }
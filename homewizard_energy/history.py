@@ -0,0 +1,100 @@
+"""Fixed-size history of measurements for HomeWizard Energy."""
+
+from __future__ import annotations
+
+import math
+import time
+from array import array
+from collections.abc import Iterable
+
+from .columnar import field_getter
+from .models import Measurement
+
+
+class MeasurementHistory:
+    """Ring buffer that keeps the last samples of numeric Measurement fields.
+
+    Every field is stored in its own preallocated float array, missing values are
+    stored as NaN. Each sample is written twice, at its slot and at the mirrored
+    slot in the second half of the array, so the last samples are always available
+    as one contiguous, zero-copy memoryview in chronological order.
+    """
+
+    def __init__(self, size: int, fields: Iterable[str] | None = None):
+        """Create a history.
+
+        Args:
+            size: Maximum number of samples to keep.
+            fields: Numeric Measurement fields to keep, defaults to all of them.
+        """
+        if size < 1:
+            raise ValueError("History size must be at least 1")
+
+        fields, self._values = field_getter(fields)
+
+        self._size = size
+        self._fields = fields
+        self._head = 0
+        self._count = 0
+
+        self._timestamps = array("d", [math.nan]) * (2 * size)
+        self._columns = {name: array("d", [math.nan]) * (2 * size) for name in fields}
+
+    @property
+    def size(self) -> int:
+        """Return the maximum number of samples."""
+        return self._size
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        """Return the fields that are kept."""
+        return self._fields
+
+    def __len__(self) -> int:
+        """Return the number of samples currently kept."""
+        return self._count
+
+    def append(self, measurement: Measurement, timestamp: float | None = None) -> None:
+        """Add a sample, replacing the oldest sample when the history is full.
+
+        Args:
+            measurement: Measurement to add.
+            timestamp: Monotonic timestamp of the sample, defaults to now.
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        index = self._head
+        mirror = index + self._size
+
+        self._timestamps[index] = self._timestamps[mirror] = timestamp
+        values = self._values(measurement)
+        for column, value in zip(self._columns.values(), values, strict=True):
+            column[index] = column[mirror] = math.nan if value is None else value
+
+        self._head = (index + 1) % self._size
+        self._count = min(self._count + 1, self._size)
+
+    def clear(self) -> None:
+        """Remove all samples."""
+        self._head = 0
+        self._count = 0
+
+    def _window(self, values: array) -> memoryview:
+        """Return a view on the kept samples of an array, oldest first."""
+        if self._count < self._size:
+            return memoryview(values)[: self._count]
+
+        return memoryview(values)[self._head : self._head + self._size]
+
+    def timestamps(self) -> memoryview:
+        """Return the monotonic timestamps of the kept samples, oldest first."""
+        return self._window(self._timestamps)
+
+    def column(self, name: str) -> memoryview:
+        """Return the values of a field for the kept samples, oldest first.
+
+        The view shares memory with the history and is only valid until the next
+        append, copy it to keep the values.
+        """
+        return self._window(self._columns[name])
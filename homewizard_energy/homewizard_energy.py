@@ -3,13 +3,44 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from typing import TYPE_CHECKING, Any, TypeVar, overload
 
 from aiohttp.client import ClientSession, ClientTimeout, TCPConnector
 
+from .blocking import DEFAULT_THRESHOLD, BlockingSection, detect_blocking
 from .const import LOGGER
 from .errors import UnsupportedError
-from .models import Batteries, CombinedModels, Device, Measurement, State, System
+from .models import (
+    Batteries,
+    CombinedModels,
+    Device,
+    Measurement,
+    State,
+    StateUpdate,
+    System,
+)
+from .stats import BLOCKING, DECODE, RequestStats
+
+if TYPE_CHECKING:
+    # Optional features are imported when used, to keep importing a client fast
+    from .history import MeasurementHistory
+    from .offload import OffloadDecoder
+    from .tracing import ConnectionTrace
+
+T = TypeVar("T")
+
+
+async def _fetch_data(coroutine: Awaitable[T] | None) -> T | None:
+    """Await coroutine, return None when not given or not supported by the device."""
+    if coroutine is None:
+        return None
+
+    try:
+        return await coroutine
+    except (UnsupportedError, NotImplementedError):
+        return None
 
 
 class HomeWizardEnergy:
@@ -21,6 +52,7 @@ class HomeWizardEnergy:
     _host: str
 
     _device: Device | None = None
+    _history: MeasurementHistory | None = None
 
     _lock: asyncio.Lock
 
@@ -29,6 +61,8 @@ class HomeWizardEnergy:
         host: str,
         clientsession: ClientSession = None,
         timeout: int = 10,
+        history_size: int | None = None,
+        decoder: OffloadDecoder | None = None,
     ):
         """Create a HomeWizard Energy object.
 
@@ -36,11 +70,26 @@ class HomeWizardEnergy:
             host: IP or URL for device.
             clientsession: The clientsession.
             timeout: Request timeout in seconds.
+            history_size: Number of measurements to keep in history, disabled when not set.
+            decoder: Decoder for large responses, decoded inline when not set.
         """
         self._host = host
         self._session = clientsession
         self._close_session = clientsession is None
         self._request_timeout = timeout
+        self._decoder = decoder
+
+        if history_size is not None:
+            # pylint: disable-next=import-outside-toplevel
+            from .history import MeasurementHistory
+
+            self._history = MeasurementHistory(history_size)
+        self._measurement_listeners: list[Callable[[Measurement], None]] = []
+        self._connection_listeners: list[Callable[[ConnectionTrace], None]] = []
+        self._blocking_listeners: list[
+            tuple[Callable[[BlockingSection], None], float]
+        ] = []
+        self._stats = RequestStats()
 
         self._lock = asyncio.Lock()
 
@@ -54,21 +103,152 @@ class HomeWizardEnergy:
         """
         return self._host
 
-    async def combined(self) -> CombinedModels:
-        """Get all information."""
+    @property
+    def history(self) -> MeasurementHistory | None:
+        """Return the history of received measurements, when enabled.
 
-        async def fetch_data(coroutine):
-            try:
-                return await coroutine
-            except (UnsupportedError, NotImplementedError):
-                return None
+        Returns:
+            history: The measurement history or None
+        """
+        return self._history
+
+    @property
+    def stats(self) -> RequestStats:
+        """Return the timing and error statistics of the requests to the device.
+
+        Returns:
+            stats: The request statistics
+        """
+        return self._stats
+
+    def add_measurement_listener(
+        self, listener: Callable[[Measurement], None]
+    ) -> Callable[[], None]:
+        """Call listener with every Measurement received by measurement().
+
+        Args:
+            listener: Callback, called from the event loop.
+
+        Returns:
+            A function that removes the listener.
+        """
+        self._measurement_listeners.append(listener)
+        return lambda: self._measurement_listeners.remove(listener)
+
+    def add_connection_listener(
+        self, listener: Callable[[ConnectionTrace], None]
+    ) -> Callable[[], None]:
+        """Call listener with the connection phase timing of every request.
+
+        Only available when the client creates its own session.
+
+        Args:
+            listener: Callback, called from the event loop.
+
+        Returns:
+            A function that removes the listener.
+        """
+        self._connection_listeners.append(listener)
+        return lambda: self._connection_listeners.remove(listener)
+
+    def add_blocking_listener(
+        self,
+        listener: Callable[[BlockingSection], None],
+        threshold: float = DEFAULT_THRESHOLD,
+    ) -> Callable[[], None]:
+        """Call listener with synchronous sections that block the event loop.
+
+        While a listener is added, the client times all code it runs between
+        two awaits, and adds the durations to the "blocking" phase of stats.
+        This adds some overhead to every await, only use it to investigate.
+
+        Args:
+            listener: Callback, called from the event loop.
+            threshold: Only sections that took at least this long are passed to
+                the listener, in seconds.
+
+        Returns:
+            A function that removes the listener.
+        """
+        entry = (listener, threshold)
+        self._blocking_listeners.append(entry)
+        return lambda: self._blocking_listeners.remove(entry)
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def _on_section(
+        self, method: str, endpoint: str, duration: float, start: str, end: str
+    ) -> None:
+        """Handle the duration of a synchronous section."""
+        self._stats.observe(endpoint, BLOCKING, duration)
+
+        section = None
+        for listener, threshold in tuple(self._blocking_listeners):
+            if duration >= threshold:
+                if section is None:
+                    section = BlockingSection(
+                        host=self._host,
+                        endpoint=endpoint,
+                        method=method,
+                        duration=duration,
+                        start=start,
+                        end=end,
+                    )
+                listener(section)
+
+    def _on_connection_trace(self, trace: ConnectionTrace) -> None:
+        """Handle the connection phase timing of a request."""
+        for listener in tuple(self._connection_listeners):
+            listener(trace)
+
+    async def _decode(
+        self, endpoint: str, func: Callable[..., T], response: str, *args: Any
+    ) -> T:
+        """Decode a response, in the executor of the decoder when it is large.
+
+        The decode phase of offloaded responses includes waiting for the executor.
+        """
+        if self._decoder is None or len(response) < self._decoder.threshold:
+            return self._stats.timed(endpoint, DECODE, func, response, *args)
+
+        start = time.perf_counter()
+        try:
+            return await self._decoder.decode(func, response, *args)
+        finally:
+            self._stats.observe(endpoint, DECODE, time.perf_counter() - start)
+
+    def _on_measurement(self, measurement: Measurement) -> None:
+        """Handle a newly received measurement."""
+        if self._history is not None:
+            self._history.append(measurement)
+
+        for listener in tuple(self._measurement_listeners):
+            listener(measurement)
+
+    @overload
+    async def combined(self, fields: None = None) -> CombinedModels: ...
+
+    @overload
+    async def combined(self, fields: Iterable[str]) -> dict[str, Any]: ...
+
+    @detect_blocking
+    async def combined(
+        self, fields: Iterable[str] | None = None
+    ) -> CombinedModels | dict[str, Any]:
+        """Get all information, or a dict with only the given fields.
+
+        Fields are taken from System when it has a field with that name, otherwise
+        from Measurement. Only the endpoints holding requested fields are fetched.
+        """
+
+        if fields is not None:
+            return await self._combined_fields(tuple(fields))
 
         device, measurement, system, state, batteries = await asyncio.gather(
-            fetch_data(self.device()),
-            fetch_data(self.measurement()),
-            fetch_data(self.system()),
-            fetch_data(self.state()),
-            fetch_data(self.batteries()),
+            _fetch_data(self.device()),
+            _fetch_data(self.measurement()),
+            _fetch_data(self.system()),
+            _fetch_data(self.state()),
+            _fetch_data(self.batteries()),
         )
 
         return CombinedModels(
@@ -79,25 +259,104 @@ class HomeWizardEnergy:
             batteries=batteries,
         )
 
+    async def _combined_fields(self, fields: tuple[str, ...]) -> dict[str, Any]:
+        """Get the given fields from System and Measurement."""
+        # pylint: disable-next=import-outside-toplevel
+        from .projection import MEASUREMENT_FIELDS, SYSTEM_FIELDS, validate_fields
+
+        system_fields = [name for name in fields if name in SYSTEM_FIELDS]
+        measurement_fields = list(
+            validate_fields(
+                (name for name in fields if name not in SYSTEM_FIELDS),
+                MEASUREMENT_FIELDS,
+            )
+        )
+
+        # Legacy values that CombinedModels moves from Measurement and State to System
+        if "wifi_ssid" in system_fields:
+            measurement_fields.append("wifi_ssid")
+        if "wifi_strength_pct" in system_fields:
+            measurement_fields.append("wifi_strength")
+        fetch_state = "status_led_brightness_pct" in system_fields
+
+        measurement, system, state = await asyncio.gather(
+            _fetch_data(
+                self.measurement(fields=measurement_fields)
+                if measurement_fields
+                else None
+            ),
+            _fetch_data(self.system(fields=system_fields) if system_fields else None),
+            _fetch_data(self.state() if fetch_state else None),
+        )
+
+        measurement = measurement or {}
+        system = system or {}
+
+        record = {}
+        for name in fields:
+            record[name] = (
+                system.get(name) if name in SYSTEM_FIELDS else measurement.get(name)
+            )
+
+        if measurement.get("wifi_ssid") is not None and "wifi_ssid" in system_fields:
+            record["wifi_ssid"] = measurement["wifi_ssid"]
+        if (
+            measurement.get("wifi_strength") is not None
+            and "wifi_strength_pct" in system_fields
+        ):
+            record["wifi_strength_pct"] = measurement["wifi_strength"]
+        if state is not None and state.brightness is not None:
+            record["status_led_brightness_pct"] = (state.brightness / 255) * 100
+
+        return record
+
     async def device(self, reset_cache: bool = False) -> Device:
         """Get the device information."""
         raise NotImplementedError
 
-    async def measurement(self) -> Measurement:
-        """Get the current measurement."""
+    @overload
+    async def measurement(self, fields: None = None) -> Measurement: ...
+
+    @overload
+    async def measurement(self, fields: Iterable[str]) -> dict[str, Any]: ...
+
+    async def measurement(
+        self, fields: Iterable[str] | None = None
+    ) -> Measurement | dict[str, Any]:
+        """Get the current measurement, or a dict with only the given fields."""
         raise NotImplementedError
 
     async def telegram(self) -> str:
         """Get the latest telegram."""
         raise NotImplementedError
 
+    @overload
+    async def system(
+        self,
+        cloud_enabled: bool | None = None,
+        status_led_brightness_pct: int | None = None,
+        api_v1_enabled: bool | None = None,
+        fields: None = None,
+    ) -> System: ...
+
+    @overload
     async def system(
         self,
         cloud_enabled: bool | None = None,
         status_led_brightness_pct: int | None = None,
         api_v1_enabled: bool | None = None,
-    ) -> System:
-        """Get/set the system."""
+        *,
+        fields: Iterable[str],
+    ) -> dict[str, Any]: ...
+
+    async def system(
+        self,
+        cloud_enabled: bool | None = None,
+        status_led_brightness_pct: int | None = None,
+        api_v1_enabled: bool | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> System | dict[str, Any]:
+        """Get/set the system, or get a dict with only the given fields."""
         raise NotImplementedError
 
     async def state(
@@ -109,7 +368,13 @@ class HomeWizardEnergy:
         """Get/set the state."""
         raise UnsupportedError("State is not supported")
 
-    async def batteries(self, mode: Batteries.Mode | None = None) -> Batteries:
+    async def update_state(self, update: StateUpdate | bytes) -> State:
+        """Set the state, with a StateUpdate or one that is encoded already."""
+        raise UnsupportedError("State is not supported")
+
+    async def batteries(
+        self, mode: Batteries.Mode | None = None, max_age: float | None = None
+    ) -> Batteries:
         """Get the batteries."""
         raise UnsupportedError("Batteries are not supported")
 
@@ -139,6 +404,9 @@ class HomeWizardEnergy:
         if self._session is not None:
             raise RuntimeError("Session already exists")  # pragma: no cover
 
+        # pylint: disable-next=import-outside-toplevel
+        from .tracing import create_trace_config
+
         connector = TCPConnector(
             enable_cleanup_closed=True,
             limit_per_host=1,
@@ -147,7 +415,11 @@ class HomeWizardEnergy:
         self._close_session = True
 
         self._session = ClientSession(
-            connector=connector, timeout=ClientTimeout(total=self._request_timeout)
+            connector=connector,
+            timeout=ClientTimeout(total=self._request_timeout),
+            trace_configs=[
+                create_trace_config(self._host, self._stats, self._on_connection_trace)
+            ],
         )
 
     async def __aenter__(self) -> HomeWizardEnergy:
@@ -0,0 +1,277 @@
+"""Append-only binary log of measurements, written and replayed through mmap.
+
+A log starts with a header that holds the field names, followed by fixed-width
+records of a float64 timestamp, a uint64 presence mask and a float64 per field.
+Missing values are stored as NaN with their bit in the mask cleared. The highest
+bit of the mask marks a record as complete, it is written last, so a record that
+was interrupted by a crash is not replayed.
+"""
+
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import struct
+import time
+from collections.abc import Iterable, Iterator
+from os import PathLike
+from typing import Any
+
+from .columnar import MEASUREMENT_DECODERS, field_getter
+from .models import Measurement
+
+MAGIC = b"HWEMLOG1"
+
+# Header: magic, length of the encoded field names
+_HEADER = struct.Struct("<8sI")
+_ALIGNMENT = 8
+
+# Highest bit of the presence mask, set when the record is complete
+COMPLETE = 1 << 63
+MAX_FIELDS = 63
+
+# Number of records the file grows by when it is full
+DEFAULT_GROW_RECORDS = 4096
+
+
+def _record_struct(fields: tuple[str, ...]) -> struct.Struct:
+    """Return the struct of a record with a value for each field."""
+    return struct.Struct(f"<dQ{len(fields)}d")
+
+
+def _encode_header(fields: tuple[str, ...]) -> bytes:
+    """Encode the header, padded so records are aligned."""
+    names = "\n".join(fields).encode()
+    header = _HEADER.pack(MAGIC, len(names)) + names
+    return header + bytes(-len(header) % _ALIGNMENT)
+
+
+def _decode_header(buffer: Any) -> tuple[tuple[str, ...], int]:
+    """Decode the header, returning the fields and the offset of the first record."""
+    if len(buffer) < _HEADER.size:
+        raise ValueError("Not a measurement log: file too short")
+
+    magic, length = _HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("Not a measurement log: unknown format")
+
+    end = _HEADER.size + length
+    fields = tuple(bytes(buffer[_HEADER.size : end]).decode().split("\n"))
+    return fields, end + (-end % _ALIGNMENT)
+
+
+def _count_records(buffer: Any, offset: int, record: struct.Struct) -> int:
+    """Return the number of complete records, found by binary search.
+
+    This assumes the complete records form a prefix of the file, followed only
+    by incomplete or unused records. The writer guarantees this in normal
+    operation: records are appended in order, each is marked complete after it
+    was written, and appending resumes at the first incomplete record. After a
+    system crash, the OS may have written the pages of the mapping out of order,
+    which can leave an incomplete record between complete ones. The search then
+    stops at one of the boundaries between complete and incomplete records:
+    complete records after it are dropped, and an incomplete record before it
+    is counted.
+    """
+    # The mask is the second value of a record
+    low, high = 0, (len(buffer) - offset) // record.size
+    while low < high:
+        middle = (low + high) // 2
+        (mask,) = struct.unpack_from("<Q", buffer, offset + middle * record.size + 8)
+        if mask & COMPLETE:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+class MeasurementLog:
+    """Writer that appends measurements to a log file through mmap.
+
+    The file is grown in steps of grow_records records and trimmed to the records
+    that were written on close. Appending to an existing log continues after its
+    last complete record.
+    """
+
+    def __init__(
+        self,
+        path: str | PathLike[str],
+        fields: Iterable[str] | None = None,
+        grow_records: int = DEFAULT_GROW_RECORDS,
+    ):
+        """Open a log, creating it when it does not exist.
+
+        Args:
+            path: Location of the log file.
+            fields: Numeric Measurement fields to store, defaults to all of them.
+                Must match the fields of an existing log.
+            grow_records: Number of records to allocate at a time.
+        """
+        fields, self._values = field_getter(fields)
+        if len(fields) > MAX_FIELDS:
+            raise ValueError(f"A log holds at most {MAX_FIELDS} fields")
+        if grow_records < 1:
+            raise ValueError("Grow records must be at least 1")
+
+        self._fields = fields
+        self._record = _record_struct(fields)
+        self._grow = grow_records * self._record.size
+        self._all_present = (1 << len(fields)) - 1
+
+        # The file stays open while the log is mapped, close() closes it
+        # pylint: disable-next=consider-using-with
+        self._file = open(path, "a+b")  # noqa: SIM115
+        try:
+            self._open()
+        except BaseException:
+            self._file.close()
+            raise
+
+    def _open(self) -> None:
+        """Write or verify the header and find where to append."""
+        size = os.fstat(self._file.fileno()).st_size
+        if not size:
+            header = _encode_header(self._fields)
+            self._file.write(header)
+            self._file.flush()
+            size = len(header)
+
+        self._map = mmap.mmap(self._file.fileno(), size)
+        fields, self._offset = _decode_header(self._map)
+        if fields != self._fields:
+            self._map.close()
+            raise ValueError(f"Log holds other fields: {fields}")
+
+        self._count = _count_records(self._map, self._offset, self._record)
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        """Return the fields that are stored."""
+        return self._fields
+
+    def __len__(self) -> int:
+        """Return the number of records."""
+        return self._count
+
+    def append(self, measurement: Measurement, timestamp: float | None = None) -> None:
+        """Add a record.
+
+        Args:
+            measurement: Measurement to add.
+            timestamp: Time of the sample in seconds since epoch, defaults to now.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        position = self._offset + self._count * self._record.size
+        if position + self._record.size > len(self._map):
+            self._file.truncate(position + self._grow)
+            self._map.resize(position + self._grow)
+
+        values = self._values(measurement)
+        mask = 0
+        for bit, value in enumerate(values):
+            if value is not None:
+                mask |= 1 << bit
+        if mask != self._all_present:
+            values = [math.nan if value is None else value for value in values]
+
+        # Write the record without the complete bit, then mark it complete
+        self._record.pack_into(self._map, position, timestamp, mask, *values)
+        struct.pack_into("<Q", self._map, position + 8, mask | COMPLETE)
+        self._count += 1
+
+    def flush(self) -> None:
+        """Write the records to disk."""
+        self._map.flush()
+
+    def close(self) -> None:
+        """Write the records to disk and trim the unused space."""
+        if self._map.closed:
+            return
+
+        self._map.flush()
+        self._map.close()
+        self._file.truncate(self._offset + self._count * self._record.size)
+        self._file.close()
+
+    def __enter__(self) -> MeasurementLog:
+        """Enter context manager."""
+        return self
+
+    def __exit__(self, *_exc_info: object) -> None:
+        """Exit context manager."""
+        self.close()
+
+
+class MeasurementLogReader:
+    """Read-only view on a log file through mmap.
+
+    Records are unpacked straight from the mapped file, without parsing.
+    Records that are appended after the reader was opened are not seen, and
+    iterators must be exhausted or deleted before the reader is closed.
+    """
+
+    def __init__(self, path: str | PathLike[str]):
+        """Open a log for reading."""
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._fields, self._offset = _decode_header(self._map)
+        except BaseException:
+            self._map.close()
+            raise
+
+        self._record = _record_struct(self._fields)
+        self._count = _count_records(self._map, self._offset, self._record)
+        self._converters = [MEASUREMENT_DECODERS[name][2] for name in self._fields]
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        """Return the fields that are stored."""
+        return self._fields
+
+    def __len__(self) -> int:
+        """Return the number of complete records."""
+        return self._count
+
+    def records(self) -> Iterator[tuple[float, ...]]:
+        """Iterate over the raw records.
+
+        Yields:
+            Tuples of the timestamp, the presence mask (including the complete bit)
+            and a value per field, NaN when missing.
+        """
+        end = self._offset + self._count * self._record.size
+        with memoryview(self._map) as view:
+            yield from self._record.iter_unpack(view[self._offset : end])
+
+    def measurements(self) -> Iterator[tuple[float, Measurement]]:
+        """Iterate over the records as (timestamp, Measurement)."""
+        named = list(enumerate(zip(self._fields, self._converters, strict=True)))
+
+        for timestamp, mask, *values in self.records():
+            yield (
+                timestamp,
+                Measurement(
+                    **{
+                        name: converter(values[bit])
+                        for bit, (name, converter) in named
+                        if mask >> bit & 1
+                    }
+                ),
+            )
+
+    def close(self) -> None:
+        """Close the file."""
+        self._map.close()
+
+    def __enter__(self) -> MeasurementLogReader:
+        """Enter context manager."""
+        return self
+
+    def __exit__(self, *_exc_info: object) -> None:
+        """Exit context manager."""
+        self.close()
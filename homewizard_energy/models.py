@@ -16,6 +16,51 @@ from mashumaro.types import SerializationStrategy
 from .const import LOGGER, MODEL_TO_ID, MODEL_TO_NAME, Model
 from .utils import get_awesome_version
 
+# Measurement fields that are renamed in the v1 API, mapped to the v1 key(s) that
+# hold their value. When multiple keys are given, the first key present is used.
+V1_MEASUREMENT_KEYS: dict[str, tuple[str, ...]] = {
+    "protocol_version": ("smr_version",),
+    "tariff": ("active_tariff",),
+    "energy_import_kwh": ("total_power_import_kwh", "total_power_import_t1_kwh"),
+    "energy_import_t1_kwh": ("total_power_import_t1_kwh",),
+    "energy_import_t2_kwh": ("total_power_import_t2_kwh",),
+    "energy_import_t3_kwh": ("total_power_import_t3_kwh",),
+    "energy_import_t4_kwh": ("total_power_import_t4_kwh",),
+    "energy_export_kwh": ("total_power_export_kwh", "total_power_export_t1_kwh"),
+    "energy_export_t1_kwh": ("total_power_export_t1_kwh",),
+    "energy_export_t2_kwh": ("total_power_export_t2_kwh",),
+    "energy_export_t3_kwh": ("total_power_export_t3_kwh",),
+    "energy_export_t4_kwh": ("total_power_export_t4_kwh",),
+    "power_w": ("active_power_w",),
+    "power_l1_w": ("active_power_l1_w",),
+    "power_l2_w": ("active_power_l2_w",),
+    "power_l3_w": ("active_power_l3_w",),
+    "voltage_v": ("active_voltage_v",),
+    "voltage_l1_v": ("active_voltage_l1_v",),
+    "voltage_l2_v": ("active_voltage_l2_v",),
+    "voltage_l3_v": ("active_voltage_l3_v",),
+    "current_a": ("active_current_a",),
+    "current_l1_a": ("active_current_l1_a",),
+    "current_l2_a": ("active_current_l2_a",),
+    "current_l3_a": ("active_current_l3_a",),
+    "apparent_power_va": ("active_apparent_power_va",),
+    "apparent_power_l1_va": ("active_apparent_power_l1_va",),
+    "apparent_power_l2_va": ("active_apparent_power_l2_va",),
+    "apparent_power_l3_va": ("active_apparent_power_l3_va",),
+    "reactive_power_var": ("active_reactive_power_var",),
+    "reactive_power_l1_var": ("active_reactive_power_l1_var",),
+    "reactive_power_l2_var": ("active_reactive_power_l2_var",),
+    "reactive_power_l3_var": ("active_reactive_power_l3_var",),
+    "power_factor": ("active_power_factor",),
+    "power_factor_l1": ("active_power_factor_l1",),
+    "power_factor_l2": ("active_power_factor_l2",),
+    "power_factor_l3": ("active_power_factor_l3",),
+    "frequency_hz": ("active_frequency_hz",),
+    "average_power_15m_w": ("active_power_average_w",),
+    "monthly_power_peak_w": ("montly_power_peak_w",),
+    "monthly_power_peak_timestamp": ("montly_power_peak_timestamp",),
+}
+
 
 class AwesomeVersionSerializationStrategy(SerializationStrategy, use_annotations=True):
     """Serialization strategy for AwesomeVersion objects."""
@@ -42,6 +87,8 @@ class BaseModel(DataClassORJSONMixin):
             AwesomeVersion: AwesomeVersionSerializationStrategy()
         }
         omit_none = True
+        # Build the decoders on first use instead of at import
+        lazy_compilation = True
 
 
 class UpdateBaseModel(BaseModel):
@@ -464,7 +511,6 @@ class Measurement(BaseModel):
             return value
 
     @classmethod
-    # pylint: disable=too-many-statements
     def __pre_deserialize__(cls, d: dict[Any, Any]) -> dict[Any, Any]:
         _ = cls  # Unused
 
@@ -472,51 +518,13 @@ class Measurement(BaseModel):
             # This is a v2 API response, no need to remap
             return d
 
-        d["protocol_version"] = d.get("smr_version")
-        d["tariff"] = d.get("active_tariff")
-        d["energy_import_kwh"] = d.get(
-            "total_power_import_kwh", d.get("total_power_import_t1_kwh")
-        )
-        d["energy_import_t1_kwh"] = d.get("total_power_import_t1_kwh")
-        d["energy_import_t2_kwh"] = d.get("total_power_import_t2_kwh")
-        d["energy_import_t3_kwh"] = d.get("total_power_import_t3_kwh")
-        d["energy_import_t4_kwh"] = d.get("total_power_import_t4_kwh")
-        d["energy_export_kwh"] = d.get(
-            "total_power_export_kwh", d.get("total_power_export_t1_kwh")
-        )
-        d["energy_export_t1_kwh"] = d.get("total_power_export_t1_kwh")
-        d["energy_export_t2_kwh"] = d.get("total_power_export_t2_kwh")
-        d["energy_export_t3_kwh"] = d.get("total_power_export_t3_kwh")
-        d["energy_export_t4_kwh"] = d.get("total_power_export_t4_kwh")
-        d["power_w"] = d.get("active_power_w")
-        d["power_l1_w"] = d.get("active_power_l1_w")
-        d["power_l2_w"] = d.get("active_power_l2_w")
-        d["power_l3_w"] = d.get("active_power_l3_w")
-        d["voltage_v"] = d.get("active_voltage_v")
-        d["voltage_l1_v"] = d.get("active_voltage_l1_v")
-        d["voltage_l2_v"] = d.get("active_voltage_l2_v")
-        d["voltage_l3_v"] = d.get("active_voltage_l3_v")
-        d["current_a"] = d.get("active_current_a")
-        d["current_l1_a"] = d.get("active_current_l1_a")
-        d["current_l2_a"] = d.get("active_current_l2_a")
-        d["current_l3_a"] = d.get("active_current_l3_a")
-        d["apparent_power_va"] = d.get("active_apparent_power_va")
-        d["apparent_power_l1_va"] = d.get("active_apparent_power_l1_va")
-        d["apparent_power_l2_va"] = d.get("active_apparent_power_l2_va")
-        d["apparent_power_l3_va"] = d.get("active_apparent_power_l3_va")
-        d["reactive_power_var"] = d.get("active_reactive_power_var")
-        d["reactive_power_l1_var"] = d.get("active_reactive_power_l1_var")
-        d["reactive_power_l2_var"] = d.get("active_reactive_power_l2_var")
-        d["reactive_power_l3_var"] = d.get("active_reactive_power_l3_var")
-        d["power_factor"] = d.get("active_power_factor")
-        d["power_factor_l1"] = d.get("active_power_factor_l1")
-        d["power_factor_l2"] = d.get("active_power_factor_l2")
-        d["power_factor_l3"] = d.get("active_power_factor_l3")
-        d["frequency_hz"] = d.get("active_frequency_hz")
-        d["average_power_15m_w"] = d.get("active_power_average_w")
-        d["monthly_power_peak_w"] = d.get("montly_power_peak_w")
-        d["monthly_power_peak_timestamp"] = d.get("montly_power_peak_timestamp")
-        d["external_devices"] = d.get("external_devices")
+        # Only add values that are present, so the dict does not grow by every
+        # field a v1 device may report. Missing fields keep their default.
+        for name, keys in V1_MEASUREMENT_KEYS.items():
+            for key in keys:
+                if key in d:
+                    d[name] = d[key]
+                    break
 
         return d
 
@@ -610,18 +618,30 @@ class System(BaseModel):
     status_led_brightness_pct: int | None = field(default=None)
     api_v1_enabled: bool | None = field(default=None)
 
+    @staticmethod
+    def rssi_to_strength_pct(rssi_db: int) -> int:
+        """Convert Wi-Fi RSSI to signal strength percentage.
+
+        Args:
+            rssi_db: RSSI in dB, as reported by the device.
+
+        Returns:
+            Signal strength in percent.
+        """
+        return (
+            0
+            if rssi_db <= -100 or rssi_db == 0
+            else 100
+            if rssi_db >= -50
+            else 2 * (rssi_db + 100)
+        )
+
     @classmethod
     def __post_deserialize__(cls, obj: System) -> System:
         _ = cls  # Unused
 
         if obj.wifi_rssi_db is not None:
-            obj.wifi_strength_pct = (
-                0
-                if obj.wifi_rssi_db <= -100 or obj.wifi_rssi_db == 0
-                else 100
-                if obj.wifi_rssi_db >= -50
-                else 2 * (obj.wifi_rssi_db + 100)
-            )
+            obj.wifi_strength_pct = System.rssi_to_strength_pct(obj.wifi_rssi_db)
 
         return obj
 
@@ -764,3 +784,17 @@ class Token(BaseModel):
     """Represent Token."""
 
     token: str = field()
+
+
+@dataclass(kw_only=True)
+class Credentials(BaseModel):
+    """Represent the stored credentials of a v2 device.
+
+    The id is the Device.id of the device, which is also the identifier that is
+    used to verify its certificate.
+    """
+
+    id: str = field()
+    host: str = field()
+    token: str = field()
+    device: Device | None = None
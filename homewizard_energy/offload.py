@@ -0,0 +1,110 @@
+"""Decode large responses in an executor, off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Executor
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+# Decode responses of at least this many characters in the executor
+DEFAULT_THRESHOLD = 4096
+# Decode at most this many responses in one executor job
+DEFAULT_MAX_BATCH = 64
+
+
+def _decode_batch(
+    jobs: list[tuple[Callable[..., Any], tuple[Any, ...]]],
+) -> list[tuple[bool, Any]]:
+    """Decode a batch of responses, returning (True, result) or (False, error)."""
+    results: list[tuple[bool, Any]] = []
+    for func, args in jobs:
+        try:
+            results.append((True, func(*args)))
+        except Exception as exception:  # noqa: BLE001 pylint: disable=broad-except
+            results.append((False, exception))
+    return results
+
+
+class OffloadDecoder:
+    """Decode responses above a size threshold in an executor.
+
+    Responses that are submitted in the same iteration of the event loop are
+    decoded in one executor job, up to max_batch responses per job, so decoding
+    many small payloads costs one hop to the executor instead of one each.
+
+    A decoder can be shared by many clients. With a ProcessPoolExecutor, the
+    decoded models are pickled back to the event loop, which only pays off for
+    large payloads.
+    """
+
+    def __init__(
+        self,
+        executor: Executor | None = None,
+        threshold: int = DEFAULT_THRESHOLD,
+        max_batch: int = DEFAULT_MAX_BATCH,
+    ):
+        """Create a decoder.
+
+        Args:
+            executor: Executor to decode in, the default executor of the event
+                loop when not given.
+            threshold: Responses shorter than this many characters are decoded
+                inline, 0 to decode all responses in the executor.
+            max_batch: Maximum number of responses decoded in one executor job.
+        """
+        self.threshold = threshold
+        self._executor = executor
+        self._max_batch = max_batch
+        self._pending: list[
+            tuple[Callable[..., Any], tuple[Any, ...], asyncio.Future]
+        ] = []
+        self._flush_handle: asyncio.Handle | None = None
+
+    async def decode(self, func: Callable[..., T], *args: Any) -> T:
+        """Call func with args in the executor, batched with other calls."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((func, args, future))
+
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_soon(self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Submit the pending calls as one executor job."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        job = asyncio.get_running_loop().run_in_executor(
+            self._executor, _decode_batch, [(func, args) for func, args, _ in batch]
+        )
+        job.add_done_callback(
+            lambda job: self._resolve([future for *_, future in batch], job)
+        )
+
+    @staticmethod
+    def _resolve(futures: list[asyncio.Future], job: asyncio.Future) -> None:
+        """Pass the results of an executor job to the waiting calls."""
+        if (exception := None if job.cancelled() else job.exception()) is not None:
+            results = [(False, exception)] * len(futures)
+        elif job.cancelled():
+            results = [(False, asyncio.CancelledError())] * len(futures)
+        else:
+            results = job.result()
+
+        for future, (success, value) in zip(futures, results, strict=True):
+            if future.done():
+                # The caller was cancelled
+                continue
+            if success:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
@@ -0,0 +1,172 @@
+"""Track quarter-hour average power and monthly peak from power samples."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+
+from .models import Measurement
+
+QUARTER_HOUR_S = 900
+
+
+@dataclass(kw_only=True, frozen=True)
+class Peak:
+    """Highest quarter-hour average power."""
+
+    power_w: float
+    timestamp: datetime
+
+
+class PeakTracker:
+    """Compute the quarter-hour average and monthly peak like a P1 meter does.
+
+    Power is integrated between samples, so every sample costs the same amount
+    of work and only the energy of the current quarter-hour is kept. Quarter-hours
+    are aligned to the clock and only imported power counts, exported power is
+    counted as zero. Only quarter-hours that were observed from start to end
+    can become the monthly peak, so starting halfway or a gap in the samples
+    never turns a short burst into a peak. Works for any device that reports
+    power_w.
+    """
+
+    def __init__(self) -> None:
+        """Create a peak tracker."""
+        self._last_time: float | None = None
+        self._last_power = 0.0
+        self._quarter: int | None = None
+        self._quarter_start = 0.0
+        self._quarter_end = 0.0
+        # The current quarter-hour was observed since its start
+        self._complete = False
+        self._energy_ws = 0.0
+        self._average_w: float | None = None
+        self._peak: Peak | None = None
+
+    @property
+    def average_power_15m_w(self) -> float | None:
+        """Return the average power of the current quarter-hour so far."""
+        return self._average_w
+
+    @property
+    def monthly_power_peak(self) -> Peak | None:
+        """Return the highest completed quarter-hour of the current month."""
+        return self._peak
+
+    def update(self, power_w: float, timestamp: datetime | None = None) -> None:
+        """Add a power sample.
+
+        Args:
+            power_w: Power in W, positive when importing.
+            timestamp: Time of the sample, defaults to now.
+        """
+        if timestamp is None:
+            timestamp = datetime.now().astimezone()
+
+        now = timestamp.timestamp()
+        power_w = max(power_w, 0.0)
+
+        if now == self._last_time:
+            # Same moment as the previous sample, like when polling faster than
+            # the timestamp resolution, only the latest power counts
+            self._last_power = power_w
+            return
+
+        if self._last_time is None or now < self._last_time:
+            # First sample, or clock went back: restart integration from here
+            self._start_quarter(now, timestamp)
+        elif now - self._last_time > QUARTER_HOUR_S:
+            # Do not guess the power over a long gap, close what is known
+            self._close_quarter(self._last_time, timestamp)
+            self._quarter = None
+            self._start_quarter(now, timestamp)
+        else:
+            # Close every quarter-hour that ended since the previous sample
+            while now >= (end := self._quarter_end):
+                self._integrate(end, self._interpolate(end, now, power_w))
+                self._close_quarter(end, timestamp)
+                self._quarter_start = end
+                self._quarter_end = end + QUARTER_HOUR_S
+                self._complete = True
+                self._quarter = int(end // QUARTER_HOUR_S)
+
+            self._integrate(now, power_w)
+
+        self._last_time = now
+        self._last_power = power_w
+
+        elapsed = now - self._quarter_start
+        self._average_w = self._energy_ws / elapsed if elapsed > 0 else power_w
+
+    def update_measurement(self, measurement: Measurement) -> None:
+        """Add the power of a Measurement, usable as measurement listener."""
+        if measurement.power_w is not None:
+            self.update(measurement.power_w)
+
+    def deviations(self, measurement: Measurement) -> dict[str, float]:
+        """Compare with the values reported by the device.
+
+        Returns:
+            Local value minus the reported value, for each value that both have.
+        """
+        result = {}
+        if measurement.average_power_15m_w is not None and self._average_w is not None:
+            result["average_power_15m_w"] = (
+                self._average_w - measurement.average_power_15m_w
+            )
+        if measurement.monthly_power_peak_w is not None and self._peak is not None:
+            result["monthly_power_peak_w"] = (
+                self._peak.power_w - measurement.monthly_power_peak_w
+            )
+        return result
+
+    def _start_quarter(self, now: float, timestamp: datetime) -> None:
+        """Start integrating in the quarter-hour of now."""
+        quarter = int(now // QUARTER_HOUR_S)
+        if quarter != self._quarter:
+            self._quarter = quarter
+            self._energy_ws = 0.0
+            # Starting halfway, average over the part that is known
+            self._quarter_start = now
+            self._quarter_end = (quarter + 1) * QUARTER_HOUR_S
+            self._complete = now == quarter * QUARTER_HOUR_S
+            self._last_time = None
+        else:
+            # The clock went back, the energy since the previous sample is lost
+            self._complete = False
+        self._check_month(timestamp)
+
+    def _interpolate(self, at: float, now: float, power_w: float) -> float:
+        """Return the power at a moment between the previous and current sample."""
+        span = now - self._last_time
+        return self._last_power + (power_w - self._last_power) * (
+            (at - self._last_time) / span
+        )
+
+    def _integrate(self, until: float, power_w: float) -> None:
+        """Add the energy from the previous sample until a moment."""
+        if self._last_time is not None:
+            start = max(self._last_time, self._quarter_start)
+            self._energy_ws += (self._last_power + power_w) / 2 * (until - start)
+        self._last_time = until
+        self._last_power = power_w
+
+    def _close_quarter(self, until: float, timestamp: datetime) -> None:
+        """Store the average of the quarter-hour as peak when complete and highest."""
+        energy_ws, self._energy_ws = self._energy_ws, 0.0
+        if not self._complete or until < self._quarter_end:
+            return
+        average = energy_ws / (until - self._quarter_start)
+
+        end_time = datetime.fromtimestamp(self._quarter_end, tz=timestamp.tzinfo)
+        self._check_month(end_time)
+        if self._peak is None or average > self._peak.power_w:
+            self._peak = Peak(power_w=average, timestamp=end_time)
+
+    def _check_month(self, timestamp: datetime) -> None:
+        """Reset the peak when timestamp is in another month than the peak."""
+        if self._peak is not None and (
+            self._peak.timestamp.year,
+            self._peak.timestamp.month,
+        ) != (timestamp.year, timestamp.month):
+            self._peak = None
@@ -0,0 +1,53 @@
+"""Decode a subset of fields from raw HomeWizard Energy responses."""
+
+from __future__ import annotations
+
+import typing
+from collections.abc import Iterable
+from dataclasses import fields as dataclass_fields
+from types import NoneType
+from typing import Any
+
+import orjson
+
+from .columnar import MEASUREMENT_DECODERS, decode_measurement_fields
+from .models import System
+
+MEASUREMENT_FIELDS = frozenset(MEASUREMENT_DECODERS)
+SYSTEM_FIELDS = frozenset(item.name for item in dataclass_fields(System))
+
+SYSTEM_CONVERTERS = {
+    name: next(arg for arg in typing.get_args(hint) if arg is not NoneType)
+    for name, hint in typing.get_type_hints(System).items()
+}
+
+
+def validate_fields(fields: Iterable[str], allowed: frozenset[str]) -> tuple[str, ...]:
+    """Return fields as tuple, raise ValueError when a field is not allowed."""
+    fields = tuple(fields)
+    if unknown := [name for name in fields if name not in allowed]:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+
+    return fields
+
+
+def project_measurement(response: str, fields: Iterable[str]) -> dict[str, Any]:
+    """Decode the given Measurement fields from a raw v1 or v2 response."""
+    return decode_measurement_fields(orjson.loads(response), fields)
+
+
+def project_system(response: str, fields: Iterable[str]) -> dict[str, Any]:
+    """Decode the given System fields from a raw v1 or v2 response."""
+    fields = validate_fields(fields, SYSTEM_FIELDS)
+    data = orjson.loads(response)
+    record = {}
+
+    for name in fields:
+        value = data.get(name)
+        record[name] = None if value is None else SYSTEM_CONVERTERS[name](value)
+
+    # Mirror System.__post_deserialize__
+    if "wifi_strength_pct" in record and (rssi := data.get("wifi_rssi_db")) is not None:
+        record["wifi_strength_pct"] = System.rssi_to_strength_pct(int(rssi))
+
+    return record
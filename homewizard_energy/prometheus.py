@@ -0,0 +1,238 @@
+"""Render the latest models of a fleet of devices in Prometheus text format."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from operator import attrgetter
+from typing import Any
+
+from .columnar import COUNTER_MEASUREMENT_FIELDS, NUMERIC_MEASUREMENT_FIELDS
+from .models import Batteries, CombinedModels, Device, Measurement, System
+
+DEFAULT_NAMESPACE = "homewizard"
+
+SYSTEM_METRICS = (
+    "wifi_strength_pct",
+    "wifi_rssi_db",
+    "uptime_s",
+    "status_led_brightness_pct",
+    "cloud_enabled",
+    "api_v1_enabled",
+)
+BATTERIES_METRICS = (
+    "power_w",
+    "target_power_w",
+    "max_consumption_w",
+    "max_production_w",
+    "battery_count",
+)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict[str, str]) -> str:
+    """Format labels, including the braces."""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _system_values(system: System) -> tuple:
+    """Return the system metrics, with booleans as numbers."""
+    return tuple(
+        int(value) if isinstance(value, bool) else value
+        for value in (getattr(system, name) for name in SYSTEM_METRICS)
+    )
+
+
+class _Family:
+    """Metrics that are read from the same kind of model."""
+
+    __slots__ = ("headers", "names", "values")
+
+    def __init__(
+        self,
+        names: list[str],
+        types: list[str],
+        values: Callable[[Any], tuple],
+    ):
+        self.names = names
+        self.headers = [
+            f"# TYPE {name} {kind}\n" for name, kind in zip(names, types, strict=True)
+        ]
+        self.values = values
+
+
+class _Entry:
+    """Latest models of a device, with the sample prefixes of every metric."""
+
+    __slots__ = (
+        "batteries",
+        "described",
+        "info",
+        "labels",
+        "measurement",
+        "prefixes",
+        "system",
+    )
+
+    def __init__(self) -> None:
+        self.described: tuple[str, ...] = ()
+        self.labels = ""
+        self.prefixes: dict[str, list[str]] = {}
+        self.info = ""
+        self.measurement: Measurement | None = None
+        self.system: System | None = None
+        self.batteries: Batteries | None = None
+
+
+class PrometheusExporter:
+    """Keep the latest models per device and render them in exposition format.
+
+    The metric name and labels of every sample are formatted once per device,
+    when the device is first seen or its device info changed, so a scrape only
+    formats the values. Output is collected in a buffer that is reused between
+    scrapes. Counters get the '_total' suffix.
+    """
+
+    def __init__(self, namespace: str = DEFAULT_NAMESPACE):
+        """Create an exporter.
+
+        Args:
+            namespace: Prefix of all metric names.
+        """
+        self._namespace = namespace
+        self._families = {
+            "measurement": _Family(
+                [
+                    f"{namespace}_{name}_total"
+                    if name in COUNTER_MEASUREMENT_FIELDS
+                    else f"{namespace}_{name}"
+                    for name in NUMERIC_MEASUREMENT_FIELDS
+                ],
+                [
+                    "counter" if name in COUNTER_MEASUREMENT_FIELDS else "gauge"
+                    for name in NUMERIC_MEASUREMENT_FIELDS
+                ],
+                attrgetter(*NUMERIC_MEASUREMENT_FIELDS),
+            ),
+            "system": _Family(
+                [f"{namespace}_{name}" for name in SYSTEM_METRICS],
+                ["gauge"] * len(SYSTEM_METRICS),
+                _system_values,
+            ),
+            "batteries": _Family(
+                [f"{namespace}_batteries_{name}" for name in BATTERIES_METRICS],
+                ["gauge"] * len(BATTERIES_METRICS),
+                attrgetter(*BATTERIES_METRICS),
+            ),
+        }
+        self._devices: dict[str, _Entry] = {}
+        self._buffer: list[str] = []
+
+    def __len__(self) -> int:
+        """Return the number of devices."""
+        return len(self._devices)
+
+    def update(
+        self,
+        device: Device,
+        measurement: Measurement | None = None,
+        system: System | None = None,
+        batteries: Batteries | None = None,
+    ) -> None:
+        """Store the latest models of a device, models that are None are kept."""
+        if (entry := self._devices.get(device.serial)) is None:
+            entry = self._devices[device.serial] = _Entry()
+        described = (device.product_type, device.product_name, device.firmware_version)
+        if entry.described != described:
+            # First seen, or the device info changed like after a firmware update
+            self._describe(entry, device)
+            entry.described = described
+
+        if measurement is not None:
+            entry.measurement = measurement
+        if system is not None:
+            entry.system = system
+        if batteries is not None:
+            entry.batteries = batteries
+
+    def _describe(self, entry: _Entry, device: Device) -> None:
+        """Format the labels of a device and the sample prefixes of its metrics."""
+        entry.labels = labels = _labels(
+            {"serial": device.serial, "product_type": device.product_type}
+        )
+        entry.prefixes = {
+            kind: [f"{name}{labels} " for name in family.names]
+            for kind, family in self._families.items()
+        }
+        info = _labels(
+            {
+                "serial": device.serial,
+                "product_type": device.product_type,
+                "product_name": device.product_name,
+                "firmware_version": device.firmware_version,
+            }
+        )
+        entry.info = f"{self._namespace}_device_info{info} 1\n"
+
+    def update_combined(self, combined: CombinedModels) -> None:
+        """Store the models of a CombinedModels."""
+        self.update(
+            combined.device,
+            measurement=combined.measurement,
+            system=combined.system,
+            batteries=combined.batteries,
+        )
+
+    def remove(self, serial: str) -> None:
+        """Remove a device."""
+        self._devices.pop(serial, None)
+
+    def render(self) -> str:
+        """Render all devices in Prometheus text format."""
+        parts = self._buffer
+        parts.clear()
+
+        if self._devices:
+            parts.append(f"# TYPE {self._namespace}_device_info gauge\n")
+            parts.extend(entry.info for entry in self._devices.values())
+
+        for kind, family in self._families.items():
+            self._render_family(parts, kind, family)
+
+        name = f"{self._namespace}_batteries_mode"
+        if modes := [
+            f'{name}{entry.labels[:-1]},mode="{entry.batteries.mode}"}} 1\n'
+            for entry in self._devices.values()
+            if entry.batteries is not None
+        ]:
+            parts.append(f"# TYPE {name} gauge\n")
+            parts.extend(modes)
+
+        text = "".join(parts)
+        parts.clear()
+        return text
+
+    def _render_family(self, parts: list[str], kind: str, family: _Family) -> None:
+        """Render the metrics of one kind of model, grouped per metric."""
+        values = family.values
+        rows = [
+            (entry.prefixes[kind], values(model))
+            for entry in self._devices.values()
+            if (model := getattr(entry, kind)) is not None
+        ]
+        if not rows:
+            return
+
+        append = parts.append
+        for index, header in enumerate(family.headers):
+            start = len(parts)
+            append(header)
+            for prefixes, row in rows:
+                if (value := row[index]) is not None:
+                    append(f"{prefixes[index]}{value}\n")
+            if len(parts) == start + 1:
+                # No device has a value for this metric
+                parts.pop()
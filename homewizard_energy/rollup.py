@@ -0,0 +1,265 @@
+"""Streaming multi-resolution rollups of measurements."""
+
+from __future__ import annotations
+
+import math
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+from .columnar import COUNTER_MEASUREMENT_FIELDS, field_getter
+from .models import Measurement
+
+DEFAULT_RESOLUTIONS = (60, 900, 3600)
+
+
+@dataclass(kw_only=True, frozen=True)
+class GaugeStats:
+    """Statistics of an instantaneous value over a window."""
+
+    min: float
+    max: float
+    mean: float
+    last: float
+
+
+@dataclass(kw_only=True, frozen=True)
+class CounterStats:
+    """Statistics of a counter over a window.
+
+    The delta is the increase since the last value of the previous window, or
+    since the first value when there is no previous window.
+    """
+
+    first: float
+    last: float
+    delta: float
+
+
+@dataclass(kw_only=True, frozen=True)
+class RollupWindow:
+    """Aggregated measurements of a closed window."""
+
+    resolution_s: int
+    start: float
+    samples: int
+    gauges: dict[str, GaugeStats]
+    counters: dict[str, CounterStats]
+
+    @property
+    def end(self) -> float:
+        """Return the end of the window."""
+        return self.start + self.resolution_s
+
+
+class _Level:
+    """Running aggregate of one resolution, one slot per field."""
+
+    __slots__ = (
+        "carry",
+        "counts",
+        "firsts",
+        "index",
+        "lasts",
+        "maxs",
+        "mins",
+        "resolution",
+        "samples",
+        "sums",
+    )
+
+    def __init__(self, resolution: int, size: int):
+        self.resolution = resolution
+        self.index: int | None = None
+        self.samples = 0
+        self.counts = [0] * size
+        self.sums = [0.0] * size
+        self.mins = [math.inf] * size
+        self.maxs = [-math.inf] * size
+        self.firsts = [math.nan] * size
+        self.lasts = [math.nan] * size
+        # Last values of the previous window, so counter deltas include the
+        # increase between two windows
+        self.carry = [math.nan] * size
+
+    def reset(self, index: int) -> None:
+        """Start aggregating a new window."""
+        size = len(self.counts)
+        self.index = index
+        self.samples = 0
+        self.counts[:] = [0] * size
+        self.sums[:] = [0.0] * size
+        self.mins[:] = [math.inf] * size
+        self.maxs[:] = [-math.inf] * size
+        self.firsts[:] = [math.nan] * size
+        self.lasts[:] = [math.nan] * size
+
+
+class RollupEngine:
+    """Aggregate a stream of measurements into windows of increasing resolution.
+
+    Every sample updates the running min/max/mean/last of the smallest window.
+    When a window closes, its aggregate is merged into the next resolution, so
+    work per sample stays constant and only one open window per resolution is
+    kept in memory. Windows are aligned to multiples of their resolution.
+    """
+
+    def __init__(
+        self,
+        resolutions: Iterable[int] = DEFAULT_RESOLUTIONS,
+        fields: Iterable[str] | None = None,
+        on_window: Callable[[RollupWindow], None] | None = None,
+    ):
+        """Create a rollup engine.
+
+        Args:
+            resolutions: Window sizes in seconds, each a multiple of the previous.
+            fields: Numeric Measurement fields to aggregate, defaults to all.
+            on_window: Called with every window that closes.
+        """
+        resolutions = tuple(resolutions)
+        if (
+            not resolutions
+            or resolutions[0] <= 0
+            or any(
+                larger <= smaller or larger % smaller
+                for smaller, larger in zip(resolutions, resolutions[1:])
+            )
+        ):
+            raise ValueError(
+                "Resolutions must be positive and a multiple of the previous"
+            )
+
+        fields, self._values = field_getter(fields)
+        self._fields = fields
+        self._counters = [name in COUNTER_MEASUREMENT_FIELDS for name in fields]
+        self._levels = [_Level(resolution, len(fields)) for resolution in resolutions]
+        self._on_window = on_window
+        self._latest: dict[int, RollupWindow] = {}
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        """Return the aggregated fields."""
+        return self._fields
+
+    def latest(self, resolution: int) -> RollupWindow | None:
+        """Return the most recently closed window of a resolution."""
+        return self._latest.get(resolution)
+
+    def update(self, measurement: Measurement, timestamp: float | None = None) -> None:
+        """Add a sample.
+
+        Args:
+            measurement: Measurement to add.
+            timestamp: Time of the sample in seconds since epoch, defaults to now.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        level = self._levels[0]
+        index = int(timestamp // level.resolution)
+        if level.index != index:
+            self._advance(index * level.resolution)
+
+        level.samples += 1
+        counts, sums, mins, maxs, firsts, lasts = (
+            level.counts,
+            level.sums,
+            level.mins,
+            level.maxs,
+            level.firsts,
+            level.lasts,
+        )
+
+        for slot, value in enumerate(self._values(measurement)):
+            if value is None:
+                continue
+            if not counts[slot]:
+                firsts[slot] = value
+            counts[slot] += 1
+            sums[slot] += value
+            lasts[slot] = value
+            if value < mins[slot]:
+                mins[slot] = value
+            if value > maxs[slot]:
+                maxs[slot] = value
+
+    def flush(self) -> None:
+        """Close all open windows."""
+        for position, level in enumerate(self._levels):
+            if level.index is not None:
+                self._close(position)
+                level.index = None
+
+    def _advance(self, timestamp: float) -> None:
+        """Close the windows that end before timestamp and open new ones."""
+        for position, level in enumerate(self._levels):
+            index = int(timestamp // level.resolution)
+            if level.index == index:
+                return
+
+            if level.index is not None:
+                self._close(position)
+            level.reset(index)
+
+    def _close(self, position: int) -> None:
+        """Emit the window of a level and merge it into the next level."""
+        level = self._levels[position]
+        if not level.samples:
+            return
+
+        gauges = {}
+        counters = {}
+        for slot, name in enumerate(self._fields):
+            if not level.counts[slot]:
+                continue
+            if self._counters[slot]:
+                previous = level.carry[slot]
+                if math.isnan(previous):
+                    previous = level.firsts[slot]
+                counters[name] = CounterStats(
+                    first=level.firsts[slot],
+                    last=level.lasts[slot],
+                    delta=level.lasts[slot] - previous,
+                )
+                level.carry[slot] = level.lasts[slot]
+            else:
+                gauges[name] = GaugeStats(
+                    min=level.mins[slot],
+                    max=level.maxs[slot],
+                    mean=level.sums[slot] / level.counts[slot],
+                    last=level.lasts[slot],
+                )
+
+        window = RollupWindow(
+            resolution_s=level.resolution,
+            start=level.index * level.resolution,
+            samples=level.samples,
+            gauges=gauges,
+            counters=counters,
+        )
+        self._latest[level.resolution] = window
+
+        if position + 1 < len(self._levels):
+            self._merge(level, self._levels[position + 1])
+
+        if self._on_window is not None:
+            self._on_window(window)
+
+    @staticmethod
+    def _merge(source: _Level, target: _Level) -> None:
+        """Merge the aggregate of a closed window into a larger window."""
+        if target.index is None:
+            target.reset(int(source.index * source.resolution // target.resolution))
+
+        target.samples += source.samples
+        for slot, count in enumerate(source.counts):
+            if not count:
+                continue
+            if not target.counts[slot]:
+                target.firsts[slot] = source.firsts[slot]
+            target.counts[slot] += count
+            target.sums[slot] += source.sums[slot]
+            target.lasts[slot] = source.lasts[slot]
+            target.mins[slot] = min(target.mins[slot], source.mins[slot])
+            target.maxs[slot] = max(target.maxs[slot], source.maxs[slot])
@@ -0,0 +1,182 @@
+"""Request timing and error statistics of a HomeWizard Energy client."""
+
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Callable, Coroutine
+from functools import wraps
+from typing import Any, TypeVar
+
+from .errors import HomeWizardEnergyException
+
+T = TypeVar("T")
+
+# Upper bounds of the histogram buckets, in seconds
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Phases of a request
+LOCK_WAIT = "lock_wait"  # Waiting for the request lock of the client
+REQUEST = "request"  # Sending the request until the response headers arrived
+BODY_READ = "body_read"  # Reading the response body
+DECODE = "decode"  # Decoding the response into a model
+
+# Connection phases, only recorded when the client created its own session
+QUEUED = "queued"  # Waiting for a free connection to the device
+DNS = "dns"  # Resolving the host name
+CONNECT = "connect"  # Opening a new connection, including DNS and TLS
+TTFB = "ttfb"  # From sending the request headers until the response headers
+
+# Code that ran between two awaits, only recorded while blocking is detected
+BLOCKING = "blocking"
+
+
+class Histogram:
+    """Count of observed durations per fixed bucket.
+
+    The last bucket counts everything above the highest bound.
+    """
+
+    __slots__ = ("bounds", "count", "counts", "max", "sum")
+
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_BUCKETS):
+        """Create an empty histogram with ascending bucket bounds."""
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add an observation."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean of all observations."""
+        return self.sum / self.count if self.count else None
+
+    def quantile(self, quantile: float) -> float | None:
+        """Return the upper bound of the bucket that holds the quantile.
+
+        Observations above the highest bound are reported as the maximum.
+        """
+        if not self.count:
+            return None
+
+        rank = quantile * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts, strict=False):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class RequestStats:
+    """Histograms per endpoint and phase, and counters per endpoint.
+
+    Counted are retries, timeouts, errors, new and reused connections, and
+    writes that were skipped because they would not change anything.
+
+    Endpoints are the API paths. Memory only grows with the number of endpoints
+    and phases, not with the number of requests.
+    """
+
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_BUCKETS):
+        """Create empty statistics.
+
+        Args:
+            bounds: Ascending upper bounds of the histogram buckets, in seconds.
+        """
+        self._bounds = bounds
+        self._histograms: dict[str, dict[str, Histogram]] = {}
+        self.retries: Counter[str] = Counter()
+        self.timeouts: Counter[str] = Counter()
+        self.errors: Counter[tuple[str, str]] = Counter()
+        self.connections_created: Counter[str] = Counter()
+        self.connections_reused: Counter[str] = Counter()
+        self.writes_avoided: Counter[str] = Counter()
+
+    def observe(self, endpoint: str, phase: str, seconds: float) -> None:
+        """Add the duration of a phase of a request."""
+        if (phases := self._histograms.get(endpoint)) is None:
+            phases = self._histograms[endpoint] = {}
+        if (histogram := phases.get(phase)) is None:
+            histogram = phases[phase] = Histogram(self._bounds)
+        histogram.observe(seconds)
+
+    def timed(self, endpoint: str, phase: str, func: Callable[..., T], *args: Any) -> T:
+        """Call func with args and add its duration."""
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.observe(endpoint, phase, time.perf_counter() - start)
+
+    def histogram(self, endpoint: str, phase: str) -> Histogram | None:
+        """Return the histogram of a phase of an endpoint."""
+        return self._histograms.get(endpoint, {}).get(phase)
+
+    def histograms(self) -> dict[str, dict[str, Histogram]]:
+        """Return the histograms per endpoint and phase."""
+        return self._histograms
+
+    def count_error(self, endpoint: str, exception: BaseException) -> None:
+        """Count a failed request by the class of the raised exception."""
+        self.errors[(endpoint, type(exception).__name__)] += 1
+
+    def reset(self) -> None:
+        """Remove all statistics."""
+        self._histograms.clear()
+        self.retries.clear()
+        self.timeouts.clear()
+        self.errors.clear()
+        self.connections_created.clear()
+        self.connections_reused.clear()
+        self.writes_avoided.clear()
+
+
+def _endpoint(args: tuple, kwargs: dict[str, Any]) -> str:
+    """Return the path argument of a call to _request(self, path, ...)."""
+    return args[1] if len(args) > 1 else kwargs["path"]
+
+
+def count_retry(details: dict[str, Any]) -> None:
+    """Count a retry of a request, as on_backoff handler of _request."""
+    client, endpoint = details["args"][0], _endpoint(details["args"], details["kwargs"])
+    client.stats.retries[endpoint] += 1
+
+
+def count_errors(
+    func: Callable[..., Coroutine[Any, Any, T]],
+) -> Callable[..., Coroutine[Any, Any, T]]:
+    """Count errors raised by a _request method of a client."""
+
+    @wraps(func)
+    async def wrapper(self, *args, **kwargs) -> T:
+        try:
+            return await func(self, *args, **kwargs)
+        except HomeWizardEnergyException as exception:
+            self.stats.count_error(_endpoint((self, *args), kwargs), exception)
+            raise
+
+    return wrapper
@@ -0,0 +1,135 @@
+"""Connection phase timing of requests, using aiohttp tracing."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any
+
+from aiohttp import ClientSession, TraceConfig
+
+from .stats import CONNECT, DNS, QUEUED, TTFB, RequestStats
+
+
+@dataclass(kw_only=True, frozen=True)
+class ConnectionTrace:
+    """Timing of the connection phases of a request, in seconds.
+
+    Connect covers opening a new connection including DNS and TLS. Phases that
+    did not happen, like DNS for an IP address or connect for a reused
+    connection, are None.
+    """
+
+    host: str
+    endpoint: str
+    method: str
+    reused: bool
+    queued: float | None
+    dns: float | None
+    connect: float | None
+    ttfb: float | None
+    total: float
+    error: str | None = None
+
+
+def create_trace_config(
+    host: str,
+    stats: RequestStats | None = None,
+    listener: Callable[[ConnectionTrace], None] | None = None,
+) -> TraceConfig:
+    """Create a trace config that times the connection phases of requests.
+
+    Args:
+        host: Host of the device, the traces are attributed to.
+        stats: Statistics to add the phase durations and connection counts to.
+        listener: Called with a ConnectionTrace after every request.
+
+    Returns:
+        A TraceConfig to pass to a ClientSession. The endpoint of a request is
+        taken from its trace_request_ctx, or the path of the URL when not given.
+    """
+
+    def _start(name: str) -> Callable[..., Any]:
+        async def handler(_session: ClientSession, ctx: SimpleNamespace, _params):
+            setattr(ctx, name, time.perf_counter())
+
+        return handler
+
+    def _end(name: str) -> Callable[..., Any]:
+        async def handler(_session: ClientSession, ctx: SimpleNamespace, _params):
+            setattr(ctx, name, time.perf_counter() - getattr(ctx, name))
+            ctx.done.add(name)
+
+        return handler
+
+    async def on_request_start(_session: ClientSession, ctx: SimpleNamespace, _params):
+        ctx.start = time.perf_counter()
+        ctx.done = set()
+        ctx.reused = False
+
+    async def on_connection_reuseconn(
+        _session: ClientSession, ctx: SimpleNamespace, _params
+    ):
+        ctx.reused = True
+
+    async def on_request_headers_sent(
+        _session: ClientSession, ctx: SimpleNamespace, _params
+    ):
+        ctx.ttfb = time.perf_counter()
+
+    def _finish(ctx: SimpleNamespace, params: Any, error: str | None) -> None:
+        now = time.perf_counter()
+        endpoint = ctx.trace_request_ctx or params.url.path
+        trace = ConnectionTrace(
+            host=host,
+            endpoint=endpoint,
+            method=params.method,
+            reused=ctx.reused,
+            queued=ctx.queued if "queued" in ctx.done else None,
+            dns=ctx.dns if "dns" in ctx.done else None,
+            connect=ctx.connect if "connect" in ctx.done else None,
+            ttfb=now - ctx.ttfb if error is None and hasattr(ctx, "ttfb") else None,
+            total=now - ctx.start,
+            error=error,
+        )
+
+        if stats is not None:
+            for phase, value in (
+                (QUEUED, trace.queued),
+                (DNS, trace.dns),
+                (CONNECT, trace.connect),
+                (TTFB, trace.ttfb),
+            ):
+                if value is not None:
+                    stats.observe(endpoint, phase, value)
+            if trace.reused:
+                stats.connections_reused[endpoint] += 1
+            elif trace.connect is not None:
+                stats.connections_created[endpoint] += 1
+
+        if listener is not None:
+            listener(trace)
+
+    async def on_request_end(_session: ClientSession, ctx: SimpleNamespace, params):
+        _finish(ctx, params, None)
+
+    async def on_request_exception(
+        _session: ClientSession, ctx: SimpleNamespace, params
+    ):
+        _finish(ctx, params, type(params.exception).__name__)
+
+    trace_config = TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_connection_queued_start.append(_start("queued"))
+    trace_config.on_connection_queued_end.append(_end("queued"))
+    trace_config.on_dns_resolvehost_start.append(_start("dns"))
+    trace_config.on_dns_resolvehost_end.append(_end("dns"))
+    trace_config.on_connection_create_start.append(_start("connect"))
+    trace_config.on_connection_create_end.append(_end("connect"))
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    trace_config.on_request_headers_sent.append(on_request_headers_sent)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    return trace_config
@@ -3,18 +3,23 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import Callable, Coroutine
+import logging
+import time
+from collections.abc import Callable, Coroutine, Iterable
+from functools import wraps
 from http import HTTPStatus
-from typing import Any, TypeVar
+from typing import Any, TypeVar, overload
 
 import backoff
 from aiohttp.client import ClientError, ClientResponseError
 from aiohttp.hdrs import METH_GET, METH_PUT
 
+from ..blocking import detect_blocking, set_endpoint
 from ..const import LOGGER
 from ..errors import DisabledError, NotFoundError, RequestError, UnsupportedError
 from ..homewizard_energy import HomeWizardEnergy
 from ..models import Device, Measurement, State, StateUpdate, System, SystemUpdate
+from ..stats import BODY_READ, REQUEST, count_errors, count_retry
 
 T = TypeVar("T")
 
@@ -24,6 +29,7 @@ def optional_method(
 ) -> Callable[..., Coroutine[Any, Any, T]]:
     """Check if method is supported."""
 
+    @wraps(func)
     async def wrapper(self, *args, **kwargs) -> T:
         try:
             return await func(self, *args, **kwargs)
@@ -37,6 +43,7 @@ def optional_method(
 class HomeWizardEnergyV1(HomeWizardEnergy):
     """Communicate with a HomeWizard Energy device."""
 
+    @detect_blocking
     async def device(self, reset_cache: bool = False) -> Device:
         """Return the device object."""
 
@@ -44,17 +51,38 @@ class HomeWizardEnergyV1(HomeWizardEnergy):
             return self._device
 
         _, response = await self._request("api")
-        device = Device.from_json(response)
+        device = await self._decode("api", Device.from_json, response)
 
         # Cache device object
         self._device = device
         return device
 
-    async def measurement(self) -> Measurement:
-        """Return the data object."""
+    @overload
+    async def measurement(self, fields: None = None) -> Measurement: ...
+
+    @overload
+    async def measurement(self, fields: Iterable[str]) -> dict[str, Any]: ...
+
+    @detect_blocking
+    async def measurement(
+        self, fields: Iterable[str] | None = None
+    ) -> Measurement | dict[str, Any]:
+        """Return the data object, or a dict with only the given fields."""
         _, response = await self._request("api/v1/data")
-        return Measurement.from_json(response)
 
+        if fields is not None:
+            # pylint: disable-next=import-outside-toplevel
+            from ..projection import project_measurement
+
+            return await self._decode(
+                "api/v1/data", project_measurement, response, fields
+            )
+
+        measurement = await self._decode("api/v1/data", Measurement.from_json, response)
+        self._on_measurement(measurement)
+        return measurement
+
+    @detect_blocking
     @optional_method
     async def telegram(self) -> str:
         """Return the most recent, valid telegram that was given by the device.
@@ -67,14 +95,35 @@ class HomeWizardEnergyV1(HomeWizardEnergy):
         _, telegram = await self._request("api/v1/telegram")
         return telegram
 
+    @overload
+    async def system(
+        self,
+        cloud_enabled: bool | None = None,
+        status_led_brightness_pct: int | None = None,
+        api_v1_enabled: bool | None = None,
+        fields: None = None,
+    ) -> System: ...
+
+    @overload
+    async def system(
+        self,
+        cloud_enabled: bool | None = None,
+        status_led_brightness_pct: int | None = None,
+        api_v1_enabled: bool | None = None,
+        *,
+        fields: Iterable[str],
+    ) -> dict[str, Any]: ...
+
+    @detect_blocking
     @optional_method
     async def system(
         self,
         cloud_enabled: bool | None = None,
         status_led_brightness_pct: int | None = None,
         api_v1_enabled: bool | None = None,
-    ) -> System:
-        """Return the system object."""
+        fields: Iterable[str] | None = None,
+    ) -> System | dict[str, Any]:
+        """Return the system object, or a dict with only the given fields."""
 
         # Legacy: raise on unsupported field
         if api_v1_enabled is not None:
@@ -83,7 +132,16 @@ class HomeWizardEnergyV1(HomeWizardEnergy):
         # Legacy: route 'status_led_brightness_pct' to state
         if status_led_brightness_pct is not None:
             state = await self.state(brightness=status_led_brightness_pct * 2.55)
-            return System(status_led_brightness_pct=state.brightness / 2.55)
+            system = System(status_led_brightness_pct=state.brightness / 2.55)
+
+            if fields is not None:
+                # pylint: disable-next=import-outside-toplevel
+                from ..projection import SYSTEM_FIELDS, validate_fields
+
+                fields = validate_fields(fields, SYSTEM_FIELDS)
+                return {name: getattr(system, name) for name in fields}
+
+            return system
 
         if cloud_enabled is not None:
             # Executing the update
@@ -95,9 +153,16 @@ class HomeWizardEnergyV1(HomeWizardEnergy):
         else:
             _, response = await self._request("api/v1/system")
 
-        system = System.from_json(response)
+        if fields is not None:
+            # pylint: disable-next=import-outside-toplevel
+            from ..projection import project_system
+
+            return await self._decode("api/v1/system", project_system, response, fields)
+
+        system = await self._decode("api/v1/system", System.from_json, response)
         return system
 
+    @detect_blocking
     @optional_method
     async def state(
         self,
@@ -111,19 +176,33 @@ class HomeWizardEnergyV1(HomeWizardEnergy):
             raise UnsupportedError("State is not supported")
 
         if power_on is not None or switch_lock is not None or brightness is not None:
-            data = StateUpdate(
-                power_on=power_on, switch_lock=switch_lock, brightness=brightness
-            ).to_dict()
-            _, response = await self._request(
-                "api/v1/state", method=METH_PUT, data=data
+            return await self.update_state(
+                StateUpdate(
+                    power_on=power_on, switch_lock=switch_lock, brightness=brightness
+                )
             )
 
-        else:
-            _, response = await self._request("api/v1/state")
-
-        state = State.from_json(response)
+        _, response = await self._request("api/v1/state")
+        state = await self._decode("api/v1/state", State.from_json, response)
         return state
 
+    @detect_blocking
+    @optional_method
+    async def update_state(self, update: StateUpdate | bytes) -> State:
+        """Update the state object.
+
+        Args:
+            update: Update to apply, or an update that is encoded as JSON
+                already, to send the same update to many devices.
+        """
+        if self._device is not None and self._device.supports_state() is False:
+            raise UnsupportedError("State is not supported")
+
+        data = update if isinstance(update, bytes) else update.to_dict()
+        _, response = await self._request("api/v1/state", method=METH_PUT, data=data)
+        return await self._decode("api/v1/state", State.from_json, response)
+
+    @detect_blocking
     @optional_method
     async def identify(
         self,
@@ -136,11 +215,19 @@ class HomeWizardEnergyV1(HomeWizardEnergy):
         await self._request("api/v1/identify", method=METH_PUT)
         return True
 
-    @backoff.on_exception(backoff.expo, RequestError, max_tries=3, logger=None)
+    @backoff.on_exception(
+        backoff.expo,
+        RequestError,
+        max_tries=3,
+        logger=None,
+        on_backoff=count_retry,
+    )
+    @count_errors
     async def _request(
         self, path: str, method: str = METH_GET, data: object = None
     ) -> tuple[HTTPStatus, dict[str, Any] | None]:
         """Make a request to the API."""
+        set_endpoint(path)
 
         if self._session is None:
             await self._create_clientsession()
@@ -149,18 +236,31 @@ class HomeWizardEnergyV1(HomeWizardEnergy):
         url = f"http://{self.host}/{path}"
         headers = {"Content-Type": "application/json"}
 
-        LOGGER.debug("%s, %s, %s", method, url, data)
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug("%s, %s, %s", method, url, data)
 
         try:
             async with asyncio.timeout(self._request_timeout):
+                started = time.perf_counter()
+                # Bodies that are already encoded are sent as they are
+                encoded = isinstance(data, bytes)
                 resp = await self._session.request(
                     method,
                     url,
-                    json=data,
+                    data=data if encoded else None,
+                    json=None if encoded else data,
                     headers=headers,
+                    trace_request_ctx=path,
                 )
-                LOGGER.debug("%s, %s", resp.status, await resp.text("utf-8"))
+                responded = time.perf_counter()
+                await resp.read()
+                self._stats.observe(path, REQUEST, responded - started)
+                self._stats.observe(path, BODY_READ, time.perf_counter() - responded)
+                text = await resp.text()
+                if LOGGER.isEnabledFor(logging.DEBUG):
+                    LOGGER.debug("%s, %s", resp.status, text)
         except TimeoutError as exception:
+            self._stats.timeouts[path] += 1
             raise RequestError(
                 f"Timeout occurred while connecting to the HomeWizard Energy device at {self.host}"
             ) from exception
@@ -183,7 +283,7 @@ class HomeWizardEnergyV1(HomeWizardEnergy):
             # Something else went wrong
             raise RequestError(f"API request error ({resp.status})")
 
-        return (resp.status, await resp.text())
+        return (resp.status, text)
 
     async def __aenter__(self) -> HomeWizardEnergyV1:
         """Async enter.
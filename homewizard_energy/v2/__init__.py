@@ -4,16 +4,20 @@ from __future__ import annotations
 
 import asyncio
 import json
+import logging
 import ssl
-from collections.abc import Callable, Coroutine
+import time
+from collections.abc import Callable, Coroutine, Iterable
+from functools import wraps
 from http import HTTPStatus
-from typing import Any, TypeVar
+from typing import TYPE_CHECKING, Any, TypeVar, overload
 
 import backoff
 from aiohttp.client import ClientError, ClientResponseError, ClientSession
 from aiohttp.hdrs import METH_DELETE, METH_GET, METH_POST, METH_PUT
 from mashumaro.exceptions import InvalidFieldValue, MissingField
 
+from ..blocking import detect_blocking, set_endpoint
 from ..const import LOGGER
 from ..errors import (
     DisabledError,
@@ -28,14 +32,19 @@ from ..homewizard_energy import HomeWizardEnergy
 from ..models import (
     Batteries,
     BatteriesUpdate,
+    Credentials,
     Device,
     Measurement,
     System,
     SystemUpdate,
     Token,
 )
+from ..stats import BODY_READ, LOCK_WAIT, REQUEST, count_errors, count_retry
 from .cacert import CACERT
 
+if TYPE_CHECKING:
+    from ..offload import OffloadDecoder
+
 T = TypeVar("T")
 
 
@@ -44,6 +53,7 @@ def authorized_method(
 ) -> Callable[..., Coroutine[Any, Any, T]]:
     """Decorator method to check if token is set."""
 
+    @wraps(func)
     async def wrapper(self, *args, **kwargs) -> T:
         # pylint: disable=protected-access
         if self._token is None:
@@ -60,6 +70,9 @@ class HomeWizardEnergyV2(HomeWizardEnergy):
 
     _ssl: ssl.SSLContext | bool = False
     _identifier: str | None = None
+    # Last known batteries object, to skip setting a mode it already has
+    _batteries: Batteries | None = None
+    _batteries_updated: float = 0.0
 
     # pylint: disable=too-many-arguments
     # pylint: disable=too-many-positional-arguments
@@ -70,6 +83,9 @@ class HomeWizardEnergyV2(HomeWizardEnergy):
         token: str | None = None,
         clientsession: ClientSession = None,
         timeout: int = 10,
+        history_size: int | None = None,
+        decoder: OffloadDecoder | None = None,
+        cacert: str = CACERT,
     ):
         """Create a HomeWizard Energy object.
 
@@ -78,11 +94,36 @@ class HomeWizardEnergyV2(HomeWizardEnergy):
             id: ID for device.
             token: Token for device.
             timeout: Request timeout in seconds.
+            history_size: Number of measurements to keep in history.
+            decoder: Decoder for large responses, decoded inline when not set.
+            cacert: PEM certificate of the authority the device certificate must
+                be signed by, defaults to the HomeWizard authority.
         """
-        super().__init__(host, clientsession, timeout)
+        super().__init__(host, clientsession, timeout, history_size, decoder)
         self._identifier = identifier
         self._token = token
+        self._cacert = cacert
+
+    @property
+    def credentials(self) -> Credentials | None:
+        """Return the credentials to store, None until token and device are known."""
+        if self._token is None or self._device is None or self._device.id is None:
+            return None
+
+        return Credentials(
+            id=self._device.id,
+            host=self.host,
+            token=self._token,
+            device=self._device,
+        )
 
+    def restore(self, credentials: Credentials) -> None:
+        """Restore the token, identifier and device from stored credentials."""
+        self._token = credentials.token
+        self._identifier = credentials.id
+        self._device = credentials.device
+
+    @detect_blocking
     @authorized_method
     async def device(self, reset_cache: bool = False) -> Device:
         """Return the device object."""
@@ -90,20 +131,42 @@ class HomeWizardEnergyV2(HomeWizardEnergy):
             return self._device
 
         _, response = await self._request("/api")
-        device = Device.from_json(response)
+        device = await self._decode("/api", Device.from_json, response)
 
         # Cache device object
         self._device = device
         return device
 
+    @overload
+    async def measurement(self, fields: None = None) -> Measurement: ...
+
+    @overload
+    async def measurement(self, fields: Iterable[str]) -> dict[str, Any]: ...
+
+    @detect_blocking
     @authorized_method
-    async def measurement(self) -> Measurement:
-        """Return the measurement object."""
+    async def measurement(
+        self, fields: Iterable[str] | None = None
+    ) -> Measurement | dict[str, Any]:
+        """Return the measurement object, or a dict with only the given fields."""
         _, response = await self._request("/api/measurement")
-        measurement = Measurement.from_json(response)
+
+        if fields is not None:
+            # pylint: disable-next=import-outside-toplevel
+            from ..projection import project_measurement
+
+            return await self._decode(
+                "/api/measurement", project_measurement, response, fields
+            )
+
+        measurement = await self._decode(
+            "/api/measurement", Measurement.from_json, response
+        )
+        self._on_measurement(measurement)
 
         return measurement
 
+    @detect_blocking
     @authorized_method
     async def telegram(self) -> str:
         """Return the most recent, valid telegram that was given by the device.
@@ -113,14 +176,35 @@ class HomeWizardEnergyV2(HomeWizardEnergy):
         _, telegram = await self._request("/api/telegram")
         return telegram
 
+    @overload
+    async def system(
+        self,
+        cloud_enabled: bool | None = None,
+        status_led_brightness_pct: int | None = None,
+        api_v1_enabled: bool | None = None,
+        fields: None = None,
+    ) -> System: ...
+
+    @overload
+    async def system(
+        self,
+        cloud_enabled: bool | None = None,
+        status_led_brightness_pct: int | None = None,
+        api_v1_enabled: bool | None = None,
+        *,
+        fields: Iterable[str],
+    ) -> dict[str, Any]: ...
+
+    @detect_blocking
     @authorized_method
     async def system(
         self,
         cloud_enabled: bool | None = None,
         status_led_brightness_pct: int | None = None,
         api_v1_enabled: bool | None = None,
-    ) -> System:
-        """Return the system object."""
+        fields: Iterable[str] | None = None,
+    ) -> System | dict[str, Any]:
+        """Return the system object, or a dict with only the given fields."""
 
         if (
             cloud_enabled is not None
@@ -143,21 +227,49 @@ class HomeWizardEnergyV2(HomeWizardEnergy):
             error = json.loads(response).get("error", response)
             raise RequestError(f"Failed to get system: {error}")
 
-        system = System.from_json(response)
+        if fields is not None:
+            # pylint: disable-next=import-outside-toplevel
+            from ..projection import project_system
+
+            return await self._decode("/api/system", project_system, response, fields)
+
+        system = await self._decode("/api/system", System.from_json, response)
         return system
 
+    @detect_blocking
     @authorized_method
     async def batteries(
         self,
         mode: Batteries.Mode | None = None,
+        max_age: float | None = None,
     ) -> Batteries:
-        """Return the batteries object."""
+        """Return the batteries object, or set the mode and return the result.
+
+        Args:
+            mode: Mode to set.
+            max_age: Skip setting the mode when the last known batteries object
+                is at most this many seconds old and already has the mode. The
+                last known object is returned instead, and the skipped write is
+                counted in stats.writes_avoided.
+        """
 
         if self._device is not None and self._device.supports_batteries() is False:
             raise UnsupportedError("Batteries is not supported")
 
+        if (
+            mode is not None
+            and max_age is not None
+            and self._batteries is not None
+            and self._batteries.mode == mode
+            and time.monotonic() - self._batteries_updated <= max_age
+        ):
+            self._stats.writes_avoided["/api/batteries"] += 1
+            return self._batteries
+
         try:
             if mode is not None:
+                # The mode is unknown until the device answered
+                self._batteries = None
                 data = BatteriesUpdate.from_mode(mode).to_dict()
                 status, response = await self._request(
                     "/api/batteries", method=METH_PUT, data=data
@@ -172,8 +284,12 @@ class HomeWizardEnergyV2(HomeWizardEnergy):
             # The batteries endpoint is not available on the device
             raise UnsupportedError("Batteries is not supported") from exception
 
-        return Batteries.from_json(response)
+        batteries = await self._decode("/api/batteries", Batteries.from_json, response)
+        self._batteries = batteries
+        self._batteries_updated = time.monotonic()
+        return batteries
 
+    @detect_blocking
     @authorized_method
     async def identify(
         self,
@@ -181,6 +297,7 @@ class HomeWizardEnergyV2(HomeWizardEnergy):
         """Send identify request."""
         await self._request("/api/system/identify", method=METH_PUT)
 
+    @detect_blocking
     @authorized_method
     async def reboot(
         self,
@@ -196,6 +313,7 @@ class HomeWizardEnergyV2(HomeWizardEnergy):
         """
         await self._request("/api/system/reboot", method=METH_PUT)
 
+    @detect_blocking
     async def get_token(
         self,
         name: str,
@@ -222,6 +340,7 @@ class HomeWizardEnergyV2(HomeWizardEnergy):
         self._token = token
         return token
 
+    @detect_blocking
     @authorized_method
     async def delete_token(
         self,
@@ -248,7 +367,7 @@ class HomeWizardEnergyV2(HomeWizardEnergy):
         """
 
         def _build_ssl_context() -> ssl.SSLContext:
-            context = ssl.create_default_context(cadata=CACERT)
+            context = ssl.create_default_context(cadata=self._cacert)
             context.verify_flags = ssl.VERIFY_X509_PARTIAL_CHAIN  # pylint: disable=no-member
             if self._identifier is not None:
                 context.hostname_checks_common_name = True
@@ -261,11 +380,19 @@ class HomeWizardEnergyV2(HomeWizardEnergy):
         loop = asyncio.get_running_loop()
         return await loop.run_in_executor(None, _build_ssl_context)
 
-    @backoff.on_exception(backoff.expo, RequestError, max_tries=3, logger=None)
+    @backoff.on_exception(
+        backoff.expo,
+        RequestError,
+        max_tries=3,
+        logger=None,
+        on_backoff=count_retry,
+    )
+    @count_errors
     async def _request(
         self, path: str, method: str = METH_GET, data: object = None
     ) -> tuple[HTTPStatus, dict[str, Any] | None]:
         """Make a request to the API."""
+        set_endpoint(path)
 
         async with self._lock:
             if self._session is None:
@@ -283,11 +410,14 @@ class HomeWizardEnergyV2(HomeWizardEnergy):
         if self._token is not None:
             headers["Authorization"] = f"Bearer {self._token}"
 
-        LOGGER.debug("%s, %s, %s", method, url, data)
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug("%s, %s, %s", method, url, data)
 
         try:
             async with asyncio.timeout(self._request_timeout):
+                waited = time.perf_counter()
                 async with self._lock:
+                    started = time.perf_counter()
                     resp = await self._session.request(
                         method,
                         url,
@@ -295,9 +425,18 @@ class HomeWizardEnergyV2(HomeWizardEnergy):
                         headers=headers,
                         ssl=self._ssl,
                         server_hostname=self._identifier,
+                        trace_request_ctx=path,
                     )
-                LOGGER.debug("%s, %s", resp.status, await resp.text("utf-8"))
+                responded = time.perf_counter()
+                await resp.read()
+                self._stats.observe(path, LOCK_WAIT, started - waited)
+                self._stats.observe(path, REQUEST, responded - started)
+                self._stats.observe(path, BODY_READ, time.perf_counter() - responded)
+                text = await resp.text()
+                if LOGGER.isEnabledFor(logging.DEBUG):
+                    LOGGER.debug("%s, %s", resp.status, text)
         except TimeoutError as exception:
+            self._stats.timeouts[path] += 1
             raise RequestError(
                 f"Timeout occurred while connecting to the HomeWizard Energy device at {self.host}"
             ) from exception
@@ -317,7 +456,7 @@ class HomeWizardEnergyV2(HomeWizardEnergy):
             case HTTPStatus.OK:
                 pass
 
-        return (resp.status, await resp.text())
+        return (resp.status, text)
 
     async def __aenter__(self) -> HomeWizardEnergyV2:
         """Async enter.
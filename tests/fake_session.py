@@ -0,0 +1,39 @@
+"""Client session that answers from fixtures without any IO, for memory tests."""
+
+from pathlib import Path
+
+FIXTURES = Path(__file__).parent
+
+
+class FakeResponse:
+    """Response that is read from a fixture."""
+
+    def __init__(self, status: int, body: bytes):
+        self.status = status
+        self._body = body
+
+    async def read(self) -> bytes:
+        """Return the body."""
+        return self._body
+
+    async def text(self, encoding: str = "utf-8") -> str:
+        """Return the decoded body."""
+        return self._body.decode(encoding)
+
+
+class FakeSession:
+    """Session that answers requests from fixtures, by the path of the URL."""
+
+    def __init__(self, fixtures: dict[str, str]):
+        """Read the fixtures, given relative to the tests directory by path."""
+        self._bodies = {
+            path: (FIXTURES / fixture).read_bytes()
+            for path, fixture in fixtures.items()
+        }
+
+    async def request(self, _method: str, url: str, **_kwargs) -> FakeResponse:
+        """Answer a request, with 404 for paths without fixture."""
+        path = url[url.index("/", url.index("//") + 2) :]
+        if (body := self._bodies.get(path)) is None:
+            return FakeResponse(404, b"")
+        return FakeResponse(200, body)
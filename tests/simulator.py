@@ -0,0 +1,641 @@
+"""Simulate HomeWizard Energy devices on the local machine, for tests and load tests.
+
+Every simulated device listens on its own address, so thousands of devices can
+run on loopback addresses (127.0.0.0/8 on Linux). Devices with API v1 serve
+plain HTTP, devices with API v2 serve HTTPS with a certificate signed by a
+certificate authority that is generated for the simulator.
+
+This is test tooling and not part of the library, it requires cryptography.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import math
+import random
+import secrets
+import ssl
+import tempfile
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import orjson
+from aiohttp import web
+from aiohttp.client import ClientSession
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from homewizard_energy.const import MODEL_TO_NAME, Model
+from homewizard_energy.models import V1_MEASUREMENT_KEYS, get_verification_hostname
+from homewizard_energy.peak import PeakTracker
+from homewizard_energy.v1 import HomeWizardEnergyV1
+from homewizard_energy.v2 import HomeWizardEnergyV2
+
+# Spreads the simulated latency, it is no secret
+_JITTER = random.Random()  # nosec B311
+
+Handler = Callable[["SimulatedDevice", web.Request], Awaitable[web.Response]]
+
+THREE_PHASE = (Model.P1_METER, Model.ENERGY_METER_3_PHASE)
+BATTERY_GROUPS = (
+    Model.P1_METER,
+    Model.ENERGY_METER_1_PHASE,
+    Model.ENERGY_METER_3_PHASE,
+)
+
+
+class _Meter:
+    """Time-varying readings of a device, deterministic per serial."""
+
+    def __init__(self, serial: str, product_type: str):
+        # Readings only need to be reproducible, not unpredictable
+        self._random = random.Random(serial)  # nosec B311
+        self._product_type = product_type
+        # Household load with a solar-like swing, so P1 and kWh meters export
+        self._base_w = self._random.uniform(100, 800)
+        self._amplitude_w = self._random.uniform(200, 1500)
+        self._period_s = self._random.uniform(60, 900)
+        self._phase = self._random.uniform(0, 2 * math.pi)
+        self._gas_rate = self._random.uniform(0.05, 0.5)
+
+        self._time: float | None = None
+        self.energy_import_kwh = self._random.uniform(1000, 20000)
+        self.energy_export_kwh = self._random.uniform(0, 5000)
+        self.energy_import_tariff = [0.0, 0.0]
+        self.energy_export_tariff = [0.0, 0.0]
+        self.total_liter_m3 = self._random.uniform(100, 5000)
+        self.gas_m3 = self._random.uniform(100, 5000)
+        self.state_of_charge_pct = self._random.uniform(20, 80)
+        self.cycles = self._random.randint(0, 500)
+        self.peak = PeakTracker()
+
+    def power(self, now: float) -> float:
+        """Return the power at a moment."""
+        swing = math.sin(2 * math.pi * now / self._period_s + self._phase)
+        power = self._base_w - self._amplitude_w * max(swing, 0) / 2
+        if self._product_type == Model.BATTERY:
+            power = self._amplitude_w * swing
+        return round(power + self._random.gauss(0, 10), 1)
+
+    def advance(self, now: float, power_w: float, tariff: int) -> None:
+        """Integrate power and volumes since the previous reading."""
+        hours = 0 if self._time is None else (now - self._time) / 3600
+        self._time = now
+
+        imported = max(power_w, 0) * hours / 1000
+        exported = max(-power_w, 0) * hours / 1000
+        self.energy_import_kwh += imported
+        self.energy_export_kwh += exported
+        self.energy_import_tariff[tariff - 1] += imported
+        self.energy_export_tariff[tariff - 1] += exported
+        self.gas_m3 += self._gas_rate * hours
+        self.total_liter_m3 += self.liter_per_minute(now) * hours * 60 / 1000
+        self.state_of_charge_pct = min(
+            100, max(0, self.state_of_charge_pct + power_w * hours / 50)
+        )
+        self.peak.update(power_w, datetime.datetime.fromtimestamp(now).astimezone())
+
+    def liter_per_minute(self, now: float) -> float:
+        """Return the water flow at a moment, tapping now and then."""
+        return 8.5 if math.sin(now / 97 + self._phase) > 0.8 else 0.0
+
+    def voltage(self) -> float:
+        """Return a voltage."""
+        return round(230 + self._random.gauss(0, 1.5), 1)
+
+    def frequency(self) -> float:
+        """Return a frequency."""
+        return round(50 + self._random.gauss(0, 0.02), 3)
+
+
+@dataclass(kw_only=True)
+class SimulatedDevice:
+    """A virtual device and the state it keeps.
+
+    Attributes:
+        serial: Serial number, also seeds the generated readings.
+        product_type: Model of the device, like 'HWE-P1'.
+        api_version: 1 for the v1 HTTP API, 2 for the v2 HTTPS API.
+        host: Address to listen on, like '127.0.0.2'.
+        port: Port to listen on, a free port is picked when 0.
+        latency_s: Delay before every response.
+        jitter_s: Maximum random delay added to latency_s.
+        tokens: Tokens accepted by the v2 API.
+        user_creation_enabled: Accept new v2 users, like after a button press.
+        api_enabled: Serve the v1 API, answer with 403 when disabled.
+    """
+
+    serial: str
+    product_type: str = Model.P1_METER
+    api_version: int = 2
+    host: str = "127.0.0.1"
+    port: int = 0
+    latency_s: float = 0.0
+    jitter_s: float = 0.0
+    tokens: set[str] = field(default_factory=set)
+    user_creation_enabled: bool = False
+    api_enabled: bool = True
+
+    power_on: bool = True
+    switch_lock: bool = False
+    brightness: int = 255
+    cloud_enabled: bool = True
+    api_v1_enabled: bool = False
+    battery_mode: str = "zero"
+    battery_permissions: list[str] = field(
+        default_factory=lambda: ["charge_allowed", "discharge_allowed"]
+    )
+    identify_count: int = 0
+    reboot_count: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self) -> None:
+        """Set up the generated readings."""
+        self._meter = _Meter(self.serial, self.product_type)
+
+    @property
+    def identifier(self) -> str:
+        """Return the identifier the v2 certificate is issued to."""
+        return get_verification_hostname(self.product_type, self.serial)
+
+    @property
+    def address(self) -> str:
+        """Return the host and port, to pass as host to a client."""
+        return f"{self.host}:{self.port}"
+
+    def device(self) -> dict[str, Any]:
+        """Return the device payload."""
+        return {
+            "product_name": MODEL_TO_NAME.get(self.product_type, self.product_type),
+            "product_type": self.product_type,
+            "serial": self.serial,
+            "firmware_version": "6.00" if self.api_version == 2 else "4.19",
+            "api_version": "2.0.0" if self.api_version == 2 else "v1",
+        }
+
+    def system(self) -> dict[str, Any]:
+        """Return the system payload."""
+        payload: dict[str, Any] = {"cloud_enabled": self.cloud_enabled}
+        if self.api_version == 2:
+            payload |= {
+                "wifi_ssid": "Simulated Wi-Fi",
+                "wifi_rssi_db": -60,
+                "uptime_s": int(time.monotonic() - self.started),
+                "status_led_brightness_pct": round(self.brightness / 2.55),
+                "api_v1_enabled": self.api_v1_enabled,
+            }
+        return payload
+
+    def state(self) -> dict[str, Any]:
+        """Return the state payload of a socket."""
+        return {
+            "power_on": self.power_on,
+            "switch_lock": self.switch_lock,
+            "brightness": self.brightness,
+        }
+
+    def batteries(self) -> dict[str, Any]:
+        """Return the batteries payload."""
+        power_w = self._meter.power(time.time())
+        return {
+            "mode": self.battery_mode,
+            "permissions": self.battery_permissions,
+            "battery_count": 2,
+            "power_w": power_w,
+            "target_power_w": round(power_w, -1),
+            "max_consumption_w": 1600,
+            "max_production_w": 800,
+        }
+
+    def measurement(self, now: float | None = None) -> dict[str, Any]:
+        """Return the measurement payload of the v2 API at a moment."""
+        if now is None:
+            now = time.time()
+        meter = self._meter
+
+        if self.product_type == Model.WATER_METER:
+            return {
+                "active_liter_lpm": meter.liter_per_minute(now),
+                "total_liter_m3": round(meter.total_liter_m3, 3),
+            }
+
+        power_w = meter.power(now)
+        if self.product_type == Model.ENERGY_SOCKET and not self.power_on:
+            power_w = 0.0
+        moment = datetime.datetime.fromtimestamp(now).replace(microsecond=0)
+        tariff = 1 if moment.hour >= 23 or moment.hour < 7 else 2
+        meter.advance(now, power_w, tariff)
+
+        payload: dict[str, Any] = {
+            "energy_import_kwh": round(meter.energy_import_kwh, 3),
+            "energy_export_kwh": round(meter.energy_export_kwh, 3),
+            "power_w": power_w,
+            "frequency_hz": meter.frequency(),
+        }
+
+        if self.product_type in THREE_PHASE:
+            shares = (0.5, 0.3, 0.2)
+            for phase, share in enumerate(shares, start=1):
+                voltage = meter.voltage()
+                payload[f"power_l{phase}_w"] = round(power_w * share, 1)
+                payload[f"voltage_l{phase}_v"] = voltage
+                payload[f"current_l{phase}_a"] = round(power_w * share / voltage, 3)
+            payload["current_a"] = round(
+                sum(payload[f"current_l{phase}_a"] for phase in (1, 2, 3)), 3
+            )
+        else:
+            voltage = meter.voltage()
+            payload["voltage_v"] = voltage
+            payload["current_a"] = round(power_w / voltage, 3)
+
+        if self.product_type == Model.BATTERY:
+            payload["state_of_charge_pct"] = round(meter.state_of_charge_pct, 1)
+            payload["cycles"] = meter.cycles
+
+        if self.product_type == Model.P1_METER:
+            payload |= self._p1_measurement(moment, tariff)
+
+        return payload
+
+    def _p1_measurement(self, moment: datetime.datetime, tariff: int) -> dict[str, Any]:
+        """Return the values only a P1 meter reports."""
+        meter = self._meter
+        gas_time = moment.replace(minute=moment.minute // 5 * 5, second=0)
+        peak = meter.peak.monthly_power_peak
+
+        payload: dict[str, Any] = {
+            "protocol_version": 50,
+            "meter_model": "ISKRA 2M550T-1012",
+            "unique_id": self.serial.encode().hex().upper(),
+            "timestamp": moment.isoformat(),
+            "tariff": tariff,
+            "average_power_15m_w": round(meter.peak.average_power_15m_w or 0, 1),
+            "monthly_power_peak_w": round(peak.power_w, 1) if peak else 0.0,
+            "monthly_power_peak_timestamp": (
+                peak.timestamp.replace(tzinfo=None).isoformat()
+                if peak
+                else moment.replace(day=1, hour=0, minute=0, second=0).isoformat()
+            ),
+            "voltage_sag_l1_count": 1,
+            "voltage_sag_l2_count": 0,
+            "voltage_sag_l3_count": 0,
+            "voltage_swell_l1_count": 0,
+            "voltage_swell_l2_count": 0,
+            "voltage_swell_l3_count": 0,
+            "any_power_fail_count": 3,
+            "long_power_fail_count": 1,
+            "external": [
+                {
+                    "unique_id": f"G{self.serial}".encode().hex().upper(),
+                    "type": "gas_meter",
+                    "timestamp": gas_time.isoformat(),
+                    "value": round(meter.gas_m3, 3),
+                    "unit": "m3",
+                }
+            ],
+        }
+        for index, name in enumerate(("t1", "t2")):
+            payload[f"energy_import_{name}_kwh"] = round(
+                meter.energy_import_tariff[index], 3
+            )
+            payload[f"energy_export_{name}_kwh"] = round(
+                meter.energy_export_tariff[index], 3
+            )
+        return payload
+
+    def measurement_v1(self, now: float | None = None) -> dict[str, Any]:
+        """Return the measurement payload of the v1 API at a moment."""
+        payload = {"wifi_ssid": "Simulated Wi-Fi", "wifi_strength": 80}
+        for name, value in self.measurement(now).items():
+            if name in ("monthly_power_peak_timestamp", "timestamp"):
+                value = _v1_timestamp(value)
+            elif name == "external":
+                value = [
+                    item | {"timestamp": _v1_timestamp(item["timestamp"])}
+                    for item in value
+                ]
+            keys = V1_MEASUREMENT_KEYS.get(name)
+            payload[keys[0] if keys else name] = value
+        return payload
+
+    def telegram(self) -> str:
+        """Return a DSMR telegram with the current counters."""
+        data = self.measurement()
+        return (
+            "/ISK5\\2M550T-1012\r\n\r\n"
+            f"1-0:1.8.1({data['energy_import_t1_kwh']:010.3f}*kWh)\r\n"
+            f"1-0:1.8.2({data['energy_import_t2_kwh']:010.3f}*kWh)\r\n"
+            f"0-0:96.14.0({data['tariff']:04d})\r\n"
+            f"1-0:1.7.0({max(data['power_w'], 0) / 1000:06.3f}*kW)\r\n"
+            f"1-0:2.7.0({max(-data['power_w'], 0) / 1000:06.3f}*kW)\r\n"
+            "!0000\r\n"
+        )
+
+
+def _v1_timestamp(value: str) -> int:
+    """Convert an ISO timestamp to the YYMMDDhhmmss number of the v1 API."""
+    return int(datetime.datetime.fromisoformat(value).strftime("%y%m%d%H%M%S"))
+
+
+class CertificateAuthority:
+    """Self-signed certificate authority that issues device certificates."""
+
+    def __init__(self) -> None:
+        """Generate the certificate authority."""
+        self._key = ec.generate_private_key(ec.SECP256R1())
+        name = x509.Name(
+            [x509.NameAttribute(NameOID.COMMON_NAME, "Simulated HomeWizard CA")]
+        )
+        self._name = name
+        self._certificate = (
+            self._builder(name, self._key.public_key())
+            .add_extension(x509.BasicConstraints(ca=True, path_length=0), True)
+            .sign(self._key, hashes.SHA256())
+        )
+        self.pem = self._certificate.public_bytes(serialization.Encoding.PEM).decode()
+
+    def _builder(
+        self, subject: x509.Name, public_key: ec.EllipticCurvePublicKey
+    ) -> x509.CertificateBuilder:
+        """Return a builder for a certificate that is valid for a year."""
+        now = datetime.datetime.now(datetime.UTC)
+        return (
+            x509.CertificateBuilder()
+            .subject_name(subject)
+            .issuer_name(self._name)
+            .public_key(public_key)
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(days=1))
+            .not_valid_after(now + datetime.timedelta(days=365))
+        )
+
+    def issue(self, common_name: str, directory: Path) -> ssl.SSLContext:
+        """Issue a certificate and return a server context that uses it.
+
+        The name is only set as common name, like the certificates of devices.
+        """
+        key = ec.generate_private_key(ec.SECP256R1())
+        certificate = self._builder(
+            x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, common_name)]),
+            key.public_key(),
+        ).sign(self._key, hashes.SHA256())
+
+        path = directory / f"{secrets.token_hex(8)}.pem"
+        path.write_bytes(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+            + certificate.public_bytes(serialization.Encoding.PEM)
+        )
+
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(path)
+        path.unlink()
+        return context
+
+
+def _json(payload: Any, status: int = 200) -> web.Response:
+    """Return a JSON response."""
+    return web.Response(
+        body=orjson.dumps(payload), status=status, content_type="application/json"
+    )
+
+
+def _error(status: int, error: str) -> web.Response:
+    """Return an error response of the v2 API."""
+    return _json({"error": error}, status)
+
+
+async def _v1_device(device: SimulatedDevice, _request: web.Request) -> web.Response:
+    return _json(device.device())
+
+
+async def _v1_data(device: SimulatedDevice, _request: web.Request) -> web.Response:
+    return _json(device.measurement_v1())
+
+
+async def _v1_system(device: SimulatedDevice, request: web.Request) -> web.Response:
+    if request.method == "PUT":
+        data = await request.json()
+        device.cloud_enabled = data.get("cloud_enabled", device.cloud_enabled)
+    return _json(device.system())
+
+
+async def _v1_state(device: SimulatedDevice, request: web.Request) -> web.Response:
+    if device.product_type != Model.ENERGY_SOCKET:
+        raise web.HTTPNotFound
+    if request.method == "PUT":
+        data = await request.json()
+        device.power_on = data.get("power_on", device.power_on)
+        device.switch_lock = data.get("switch_lock", device.switch_lock)
+        device.brightness = int(data.get("brightness", device.brightness))
+    return _json(device.state())
+
+
+async def _v1_telegram(device: SimulatedDevice, _request: web.Request) -> web.Response:
+    if device.product_type != Model.P1_METER:
+        raise web.HTTPNotFound
+    return web.Response(text=device.telegram())
+
+
+async def _v1_identify(device: SimulatedDevice, _request: web.Request) -> web.Response:
+    device.identify_count += 1
+    return _json({"identify": "ok"})
+
+
+async def _v2_device(device: SimulatedDevice, _request: web.Request) -> web.Response:
+    return _json(device.device())
+
+
+async def _v2_measurement(
+    device: SimulatedDevice, _request: web.Request
+) -> web.Response:
+    return _json(device.measurement())
+
+
+async def _v2_system(device: SimulatedDevice, request: web.Request) -> web.Response:
+    if request.method == "PUT":
+        data = await request.json()
+        device.cloud_enabled = data.get("cloud_enabled", device.cloud_enabled)
+        device.api_v1_enabled = data.get("api_v1_enabled", device.api_v1_enabled)
+        if (brightness := data.get("status_led_brightness_pct")) is not None:
+            device.brightness = round(brightness * 2.55)
+    return _json(device.system())
+
+
+async def _v2_batteries(device: SimulatedDevice, request: web.Request) -> web.Response:
+    if device.product_type not in BATTERY_GROUPS:
+        return _error(404, "request:not-found")
+    if request.method == "PUT":
+        data = await request.json()
+        device.battery_mode = data.get("mode", device.battery_mode)
+        device.battery_permissions = data.get("permissions", device.battery_permissions)
+    return _json(device.batteries())
+
+
+async def _v2_telegram(device: SimulatedDevice, _request: web.Request) -> web.Response:
+    if device.product_type != Model.P1_METER:
+        return _error(404, "request:not-found")
+    return web.Response(text=device.telegram())
+
+
+async def _v2_identify(device: SimulatedDevice, _request: web.Request) -> web.Response:
+    device.identify_count += 1
+    return web.Response(status=204)
+
+
+async def _v2_reboot(device: SimulatedDevice, _request: web.Request) -> web.Response:
+    device.reboot_count += 1
+    return web.Response(status=204)
+
+
+async def _v2_user(device: SimulatedDevice, request: web.Request) -> web.Response:
+    if request.method == "POST":
+        data = await request.json()
+        if not device.user_creation_enabled:
+            return _error(403, "user:creation-not-enabled")
+        token = secrets.token_hex(16)
+        device.tokens.add(token)
+        return _json({"token": token, "name": data.get("name")})
+
+    # Deleting other users is accepted, only the own token is revoked
+    data = await request.json() if request.can_read_body else None
+    if not data:
+        device.tokens.discard(request.headers["Authorization"].removeprefix("Bearer "))
+    return web.Response(status=204)
+
+
+V1_ROUTES: dict[str, Handler] = {
+    "/api": _v1_device,
+    "/api/v1/data": _v1_data,
+    "/api/v1/system": _v1_system,
+    "/api/v1/state": _v1_state,
+    "/api/v1/telegram": _v1_telegram,
+    "/api/v1/identify": _v1_identify,
+}
+
+V2_ROUTES: dict[str, Handler] = {
+    "/api": _v2_device,
+    "/api/measurement": _v2_measurement,
+    "/api/system": _v2_system,
+    "/api/batteries": _v2_batteries,
+    "/api/telegram": _v2_telegram,
+    "/api/system/identify": _v2_identify,
+    "/api/system/reboot": _v2_reboot,
+    "/api/user": _v2_user,
+}
+
+
+class DeviceSimulator:
+    """Serve a set of simulated devices.
+
+    Use as async context manager, or call start() and stop(). Devices without
+    a port get a free port when the simulator starts.
+    """
+
+    def __init__(self, devices: Iterable[SimulatedDevice] = ()):
+        """Create a simulator for devices."""
+        self.devices = list(devices)
+        self.ca = CertificateAuthority()
+        self._by_address: dict[tuple[str, int], SimulatedDevice] = {}
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def cacert(self) -> str:
+        """Return the PEM certificate of the authority that signs the devices."""
+        return self.ca.pem
+
+    async def start(self) -> None:
+        """Start listening for all devices."""
+        app = web.Application()
+        app.router.add_route("*", "/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+
+        with tempfile.TemporaryDirectory() as directory:
+            for device in self.devices:
+                ssl_context = None
+                if device.api_version == 2:
+                    ssl_context = self.ca.issue(device.identifier, Path(directory))
+                site = web.TCPSite(
+                    self._runner, device.host, device.port, ssl_context=ssl_context
+                )
+                await site.start()
+                # pylint: disable-next=protected-access
+                device.port = site._server.sockets[0].getsockname()[1]
+                self._by_address[(device.host, device.port)] = device
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        self._by_address.clear()
+
+    async def __aenter__(self) -> DeviceSimulator:
+        """Start the simulator."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_exc_info: object) -> None:
+        """Stop the simulator."""
+        await self.stop()
+
+    def client(
+        self, device: SimulatedDevice, clientsession: ClientSession | None = None
+    ) -> HomeWizardEnergyV1 | HomeWizardEnergyV2:
+        """Return a client for a device, with its token and the simulator CA."""
+        if device.api_version == 1:
+            return HomeWizardEnergyV1(device.address, clientsession=clientsession)
+
+        if not device.tokens:
+            device.tokens.add(secrets.token_hex(16))
+        return HomeWizardEnergyV2(
+            device.address,
+            identifier=device.identifier,
+            token=next(iter(device.tokens)),
+            clientsession=clientsession,
+            cacert=self.cacert,
+        )
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Route a request to the handler of the device it was sent to."""
+        host, port = request.transport.get_extra_info("sockname")[:2]
+        device = self._by_address[(host, port)]
+
+        if device.latency_s or device.jitter_s:
+            await asyncio.sleep(device.latency_s + _JITTER.uniform(0, device.jitter_s))
+
+        if device.api_version == 1:
+            return await self._handle_v1(device, request)
+        return await self._handle_v2(device, request)
+
+    @staticmethod
+    async def _handle_v1(device: SimulatedDevice, request: web.Request) -> web.Response:
+        """Handle a request to the v1 API."""
+        if (handler := V1_ROUTES.get(request.path)) is None:
+            raise web.HTTPNotFound
+        if request.path != "/api" and not device.api_enabled:
+            raise web.HTTPForbidden
+        return await handler(device, request)
+
+    @staticmethod
+    async def _handle_v2(device: SimulatedDevice, request: web.Request) -> web.Response:
+        """Handle a request to the v2 API, checking the token."""
+        if (handler := V2_ROUTES.get(request.path)) is None:
+            return _error(404, "request:not-found")
+
+        if not (request.path == "/api/user" and request.method == "POST"):
+            authorization = request.headers.get("Authorization", "")
+            if authorization.removeprefix("Bearer ") not in device.tokens:
+                return _error(401, "user:unauthorized")
+
+        return await handler(device, request)
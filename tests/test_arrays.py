@@ -0,0 +1,91 @@
+"""Test the NumPy export of measurements."""
+
+import numpy as np
+import pytest
+
+from homewizard_energy.arrays import to_arrays, to_structured_array
+from homewizard_energy.history import MeasurementHistory
+from homewizard_energy.models import Measurement
+
+pytestmark = [pytest.mark.asyncio]
+
+MEASUREMENTS = [
+    Measurement(power_w=100.0, power_l1_w=50.0, power_l2_w=25.0, power_l3_w=25.0),
+    Measurement(power_w=200.0, power_l1_w=100.0, power_l2_w=None, power_l3_w=100.0),
+    Measurement(tariff=2),
+]
+
+
+async def test_to_arrays_converts_none_to_nan():
+    """Test measurements are exported per field with NaN for None."""
+    arrays = to_arrays(MEASUREMENTS, fields=["power_w", "tariff"])
+
+    assert list(arrays) == ["power_w", "tariff"]
+    assert arrays["power_w"].dtype == np.float64
+    np.testing.assert_array_equal(arrays["power_w"], [100.0, 200.0, np.nan])
+    np.testing.assert_array_equal(arrays["tariff"], [np.nan, np.nan, 2.0])
+
+    arrays = to_arrays(MEASUREMENTS, fields=["power_w"])
+    np.testing.assert_array_equal(arrays["power_w"], [100.0, 200.0, np.nan])
+
+
+async def test_to_arrays_stacks_phases():
+    """Test l1/l2/l3 fields are stacked in a (n, 3) array."""
+    arrays = to_arrays(
+        MEASUREMENTS,
+        fields=["power_w", "power_l1_w", "power_l2_w", "power_l3_w", "voltage_l1_v"],
+        phases=True,
+    )
+
+    assert set(arrays) == {"power_w", "power_phases_w", "voltage_l1_v"}
+    np.testing.assert_array_equal(
+        arrays["power_phases_w"],
+        [[50.0, 25.0, 25.0], [100.0, np.nan, 100.0], [np.nan, np.nan, np.nan]],
+    )
+
+
+async def test_to_arrays_defaults_to_all_numeric_fields():
+    """Test all numeric fields are exported by default."""
+    arrays = to_arrays(MEASUREMENTS)
+
+    assert "energy_import_t4_kwh" in arrays
+    assert "meter_model" not in arrays
+    assert all(len(values) == 3 for values in arrays.values())
+
+
+async def test_to_arrays_from_history_shares_memory():
+    """Test arrays of a history are views on the history."""
+    history = MeasurementHistory(2, fields=["power_w"])
+    for value, measurement in enumerate(MEASUREMENTS):
+        history.append(measurement, timestamp=value)
+
+    arrays = to_arrays(history)
+
+    np.testing.assert_array_equal(arrays["monotonic"], [1.0, 2.0])
+    np.testing.assert_array_equal(arrays["power_w"], [200.0, np.nan])
+    assert not arrays["power_w"].flags.owndata
+
+
+async def test_to_structured_array():
+    """Test measurements are exported as structured array."""
+    records = to_structured_array(
+        MEASUREMENTS,
+        fields=["power_w", "power_l1_w", "power_l2_w", "power_l3_w"],
+        phases=True,
+    )
+
+    assert records.dtype.names == ("power_w", "power_phases_w")
+    assert records["power_phases_w"].shape == (3, 3)
+    assert records[0]["power_w"] == 100.0
+
+
+async def test_to_arrays_rejects_unknown_fields():
+    """Test unknown or non-numeric fields are rejected."""
+    with pytest.raises(ValueError):
+        to_arrays(MEASUREMENTS, fields=["meter_model"])
+
+
+async def test_to_arrays_rejects_empty_fields():
+    """Test an empty list of fields is rejected."""
+    with pytest.raises(ValueError, match="No fields given"):
+        to_arrays(MEASUREMENTS, fields=[])
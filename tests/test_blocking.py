@@ -0,0 +1,96 @@
+"""Test detection of synchronous sections that block the event loop."""
+
+import asyncio
+import time
+
+import pytest
+
+from homewizard_energy.blocking import BlockingSection, detect_blocking, set_endpoint
+from homewizard_energy.homewizard_energy import HomeWizardEnergy
+
+pytestmark = [pytest.mark.asyncio]
+
+
+class Client(HomeWizardEnergy):
+    """Client with methods that block between awaits."""
+
+    @detect_blocking
+    async def measurement(self, fields=None):
+        """Block before and after a request."""
+        set_endpoint("/api/measurement")
+        time.sleep(0.02)
+        await asyncio.sleep(0)
+        time.sleep(0.001)
+        return await self.device()
+
+    @detect_blocking
+    async def device(self, reset_cache: bool = False):
+        """Block without awaiting."""
+        time.sleep(0.015)
+        return "device"
+
+    @detect_blocking
+    async def system(self, **_kwargs):
+        """Raise after an await."""
+        await asyncio.sleep(0)
+        raise ValueError
+
+
+async def test_sections_are_timed_per_await():
+    """Test every section between awaits is timed and outliers are reported."""
+    client = Client("example.com")
+    sections: list[BlockingSection] = []
+    client.add_blocking_listener(sections.append, threshold=0.01)
+
+    assert await client.measurement() == "device"
+
+    # The nested device() call is part of the second section of measurement()
+    first, second = sections
+    assert first.host == "example.com"
+    assert first.endpoint == "/api/measurement"
+    assert first.method == "measurement"
+    assert first.duration >= 0.02
+    # Only lines of the library are reported as start and end
+    assert first.start == first.end == "-"
+    assert second.duration >= 0.016
+    assert second.end == "return"
+
+    histogram = client.stats.histogram("/api/measurement", "blocking")
+    assert histogram.count == 2
+
+
+async def test_sections_of_concurrent_calls_are_separate():
+    """Test calls gathered by another call are timed in their own task."""
+    client = Client("example.com")
+    sections: list[BlockingSection] = []
+    client.add_blocking_listener(sections.append, threshold=0.01)
+
+    await asyncio.gather(client.device(), client.device())
+
+    assert [section.method for section in sections] == ["device", "device"]
+    assert client.stats.histogram("device", "blocking").count == 2
+
+
+async def test_sections_of_failing_calls_are_timed():
+    """Test the section that raised is timed and the exception propagates."""
+    client = Client("example.com")
+    sections: list[BlockingSection] = []
+    client.add_blocking_listener(sections.append, threshold=0)
+
+    with pytest.raises(ValueError):
+        await client.system()
+
+    assert sections[-1].end == "raise"
+
+
+async def test_removed_listener_disables_detection():
+    """Test sections are not timed without listeners."""
+    client = Client("example.com")
+    sections: list[BlockingSection] = []
+    remove_listener = client.add_blocking_listener(sections.append, threshold=0)
+    remove_listener()
+
+    await client.measurement()
+
+    assert not sections
+    assert not client.stats.histograms()
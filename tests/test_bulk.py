@@ -0,0 +1,105 @@
+"""Test applying an update to many devices."""
+
+import asyncio
+
+import pytest
+
+from homewizard_energy.bulk import update_states
+from homewizard_energy.errors import RequestError, UnauthorizedError
+from homewizard_energy.homewizard_energy import HomeWizardEnergy
+from homewizard_energy.models import State, StateUpdate
+
+pytestmark = [pytest.mark.asyncio]
+
+
+class Client(HomeWizardEnergy):
+    """Client that fails a number of times before updating the state."""
+
+    def __init__(self, host: str, failures: int = 0, error=RequestError, delay=0.0):
+        super().__init__(host)
+        self.failures = failures
+        self.error = error
+        self.delay = delay
+        self.bodies: list[bytes] = []
+
+    async def update_state(self, update: StateUpdate | bytes) -> State:
+        self.bodies.append(update)
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise self.error("Failed")
+        return State.from_json(update)
+
+
+async def test_update_states():
+    """Test every device gets the same encoded update."""
+    clients = [Client(f"10.0.0.{index}") for index in range(5)]
+
+    results = await update_states(clients, StateUpdate(power_on=False))
+
+    assert list(results) == [client.host for client in clients]
+    assert all(result.success for result in results.values())
+    assert results["10.0.0.1"].state == State(power_on=False)
+    assert results["10.0.0.1"].attempts == 1
+    assert clients[0].bodies == [b'{"power_on":false}']
+    assert clients[0].bodies[0] is clients[1].bodies[0]
+
+
+async def test_update_states_retries_request_errors():
+    """Test request errors are retried, other errors are not."""
+    clients = [
+        Client("retried", failures=1),
+        Client("failing", failures=5),
+        Client("unauthorized", failures=1, error=UnauthorizedError),
+    ]
+
+    results = await update_states(clients, StateUpdate(power_on=True), retries=2)
+
+    assert results["retried"].success
+    assert results["retried"].attempts == 2
+    assert isinstance(results["failing"].error, RequestError)
+    assert results["failing"].attempts == 3
+    assert isinstance(results["unauthorized"].error, UnauthorizedError)
+    assert results["unauthorized"].attempts == 1
+
+
+async def test_update_states_limits_concurrency():
+    """Test no more devices than the concurrency are updated at once."""
+    running = peak = 0
+
+    class CountingClient(Client):
+        async def update_state(self, update: StateUpdate | bytes) -> State:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            try:
+                return await super().update_state(update)
+            finally:
+                running -= 1
+
+    clients = [CountingClient(f"10.0.0.{index}", delay=0.01) for index in range(10)]
+
+    await update_states(clients, StateUpdate(power_on=True), concurrency=3)
+
+    assert peak == 3
+
+
+async def test_update_states_timeout():
+    """Test devices that are not updated before the timeout fail."""
+    clients = [Client("fast"), Client("slow", delay=10)]
+
+    results = await update_states(clients, StateUpdate(power_on=True), timeout=0.1)
+
+    assert results["fast"].success
+    assert isinstance(results["slow"].error, RequestError)
+    assert results["slow"].attempts == 0
+
+
+async def test_update_states_of_devices_without_state():
+    """Test devices without state fail with UnsupportedError."""
+    results = await update_states(
+        [HomeWizardEnergy("example.com")], StateUpdate(power_on=True)
+    )
+
+    assert type(results["example.com"].error).__name__ == "UnsupportedError"
+    assert await update_states([], StateUpdate(power_on=True)) == {}
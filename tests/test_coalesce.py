@@ -0,0 +1,141 @@
+"""Test coalescing of state and system updates."""
+
+import asyncio
+
+import pytest
+
+from homewizard_energy.coalesce import WriteCoalescer
+from homewizard_energy.errors import RequestError
+from homewizard_energy.models import State, System
+from homewizard_energy.v1 import HomeWizardEnergyV1
+
+pytestmark = [pytest.mark.asyncio]
+
+
+class Client(HomeWizardEnergyV1):
+    """Client that records writes instead of sending them."""
+
+    def __init__(self):
+        super().__init__("example.com")
+        self.writes: list[tuple[str, dict]] = []
+        self.fail = False
+
+    async def state(self, **kwargs) -> State:
+        """Record a state write."""
+        self.writes.append(("state", kwargs))
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RequestError("Failed")
+        return State(**kwargs)
+
+    async def system(self, **kwargs) -> System:
+        """Record a system write."""
+        self.writes.append(("system", kwargs))
+        return System(**kwargs)
+
+
+async def test_updates_in_window_are_merged():
+    """Test rapid updates result in one write with the latest values."""
+    client = Client()
+    coalescer = WriteCoalescer(client, delay=0.01)
+
+    results = await asyncio.gather(
+        coalescer.state(brightness=10),
+        coalescer.state(power_on=True),
+        coalescer.state(brightness=200),
+    )
+
+    assert client.writes == [("state", {"brightness": 200, "power_on": True})]
+    assert coalescer.writes == 1
+    # Every caller gets the result of the combined write
+    assert all(result is results[0] for result in results)
+    assert results[0].brightness == 200
+
+
+async def test_updates_while_writing_are_written_next():
+    """Test updates that arrive during a write are combined into the next."""
+    client = Client()
+    coalescer = WriteCoalescer(client, delay=0.01)
+
+    first = asyncio.create_task(coalescer.state(brightness=1))
+    await asyncio.sleep(0.015)
+    for brightness in range(2, 50):
+        asyncio.create_task(coalescer.state(brightness=brightness))
+        await asyncio.sleep(0)
+    await first
+    await coalescer.flush()
+
+    assert client.writes == [
+        ("state", {"brightness": 1}),
+        ("state", {"brightness": 49}),
+    ]
+
+
+async def test_v1_status_led_is_merged_with_state():
+    """Test the v1 status LED brightness is written as part of the state."""
+    client = Client()
+    coalescer = WriteCoalescer(client, delay=0.01)
+
+    state, system = await asyncio.gather(
+        coalescer.state(power_on=False),
+        coalescer.system(status_led_brightness_pct=40),
+    )
+
+    assert client.writes == [("state", {"power_on": False, "brightness": 102})]
+    assert state.power_on is False
+    assert system.status_led_brightness_pct == 40
+
+
+async def test_system_updates_are_merged():
+    """Test rapid system updates result in one write."""
+    client = Client()
+    coalescer = WriteCoalescer(client, delay=0.01)
+
+    await asyncio.gather(
+        coalescer.system(cloud_enabled=False),
+        coalescer.system(cloud_enabled=True, status_led_brightness_pct=50),
+    )
+
+    assert client.writes == [
+        ("system", {"cloud_enabled": True, "status_led_brightness_pct": 50})
+    ]
+
+
+async def test_failed_write_is_raised_to_all_callers():
+    """Test every caller of a failed write gets the error."""
+    client = Client()
+    client.fail = True
+    coalescer = WriteCoalescer(client, delay=0.01)
+
+    results = await asyncio.gather(
+        coalescer.state(power_on=True),
+        coalescer.state(switch_lock=True),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, RequestError) for result in results)
+    assert len(client.writes) == 1
+
+    # A new update is written again
+    client.fail = False
+    assert (await coalescer.state(power_on=True)).power_on is True
+
+
+async def test_cancelled_writes_cancel_waiting_updates():
+    """Test callers do not wait forever when the writes are cancelled."""
+    client = Client()
+    coalescer = WriteCoalescer(client, delay=0.01)
+
+    writing = asyncio.create_task(coalescer.state(power_on=True))
+    await asyncio.sleep(0.015)
+    waiting = asyncio.create_task(coalescer.state(brightness=1))
+    await asyncio.sleep(0)
+    coalescer._state._task.cancel()  # pylint: disable=protected-access
+
+    for task in (writing, waiting):
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(task, 1)
+
+    # Updates are written again, without the cancelled update
+    assert (await coalescer.state(power_on=False)) == State(power_on=False)
+    assert client.writes[-1] == ("state", {"power_on": False})
@@ -0,0 +1,138 @@
+"""Test columnar decoding of measurement payloads."""
+
+import os
+from dataclasses import fields
+
+import pytest
+
+from homewizard_energy.columnar import (
+    decode_measurement_fields,
+    decode_measurement_file,
+    decode_measurements,
+    field_getter,
+)
+from homewizard_energy.models import Measurement
+
+pytestmark = [pytest.mark.asyncio]
+
+
+def load_fixtures(version: str, filename: str) -> str:
+    """Load a fixture of the given API version."""
+    path = os.path.join(os.path.dirname(__file__), version, "fixtures", filename)
+    with open(path, encoding="utf-8") as fptr:
+        return fptr.read()
+
+
+PAYLOADS = [
+    load_fixtures("v1", "HWE-P1/data.json"),
+    load_fixtures("v1", "HWE-P1/data_minimal.json"),
+    load_fixtures("v1", "HWE-P1/data_single_phase.json"),
+    load_fixtures("v1", "HWE-SKT/data.json"),
+    load_fixtures("v1", "HWE-WTR/data.json"),
+    load_fixtures("v1", "HWE-KWH3/data.json"),
+    load_fixtures("v1", "SDM230-wifi/data.json"),
+    load_fixtures("v2", "HWE-P1/measurement_3_phase_with_gas_with_watermeter.json"),
+    load_fixtures("v2", "HWE-P1/measurement_invalid_ean.json"),
+    load_fixtures("v2", "HWE-KWH1/measurement.json"),
+    load_fixtures("v2", "HWE-BAT/measurement.json"),
+]
+
+
+def assert_columns_match_measurements(columns: dict, payloads: list[str]):
+    """Assert columns contain the same values as Measurement.from_json."""
+    for row, payload in enumerate(payloads):
+        measurement = Measurement.from_json(payload)
+        for field in fields(Measurement):
+            assert columns[field.name][row] == getattr(measurement, field.name)
+
+
+async def test_decode_measurements_matches_measurement():
+    """Test columns are decoded identically to Measurement objects."""
+    columns = decode_measurements(PAYLOADS)
+
+    assert len(columns) == len(fields(Measurement))
+    assert_columns_match_measurements(columns, PAYLOADS)
+
+
+async def test_decode_measurements_in_chunks_with_workers():
+    """Test decoding in multiple chunks and worker processes keeps order."""
+    columns = decode_measurements(PAYLOADS, workers=2, chunk_size=3)
+
+    assert_columns_match_measurements(columns, PAYLOADS)
+
+
+async def test_decode_measurements_selected_fields():
+    """Test only the requested fields are decoded."""
+    columns = decode_measurements(PAYLOADS, fields=["power_w", "energy_import_kwh"])
+
+    assert list(columns) == ["power_w", "energy_import_kwh"]
+    assert columns["power_w"][0] == -543.0
+    assert columns["energy_import_kwh"][0] == 13779.338
+
+
+async def test_decode_measurements_v1_fallback_to_t1():
+    """Test total import falls back to the T1 counter for v1 payloads."""
+    columns = decode_measurements(
+        [
+            '{"wifi_ssid": "x", "total_power_import_t1_kwh": 1.5}',
+            '{"wifi_ssid": "x", "total_power_import_kwh": 2, '
+            '"total_power_import_t1_kwh": 1.5}',
+            '{"energy_import_kwh": 3, "tariff": 5}',
+        ],
+        fields=["energy_import_kwh", "energy_import_t1_kwh", "tariff"],
+    )
+
+    assert columns == {
+        "energy_import_kwh": [1.5, 2.0, 3.0],
+        "energy_import_t1_kwh": [1.5, 1.5, None],
+        "tariff": [None, None, None],
+    }
+
+
+async def test_decode_measurements_unknown_field():
+    """Test unknown fields are rejected."""
+    with pytest.raises(ValueError):
+        decode_measurements(PAYLOADS, fields=["power_w", "unknown"])
+
+
+async def test_decode_measurement_file(tmp_path):
+    """Test decoding a file with one payload per line."""
+    path = tmp_path / "measurements.jsonl"
+    path.write_text(
+        "\n".join(payload.replace("\n", "") for payload in PAYLOADS) + "\n\n",
+        encoding="utf-8",
+    )
+
+    columns = decode_measurement_file(path)
+
+    assert_columns_match_measurements(columns, PAYLOADS)
+
+
+async def test_decode_measurement_fields():
+    """Test decoding a single parsed payload."""
+    data = {"wifi_ssid": "x", "active_power_w": 12, "power_w": 1}
+
+    assert decode_measurement_fields(data, ["power_w", "voltage_v"]) == {
+        "power_w": 12.0,
+        "voltage_v": None,
+    }
+    assert data == {"wifi_ssid": "x", "active_power_w": 12, "power_w": 1}
+
+
+async def test_field_getter_returns_tuples():
+    """Test the getter returns a tuple, also for a single field."""
+    measurement = Measurement(power_w=100.0, tariff=2)
+
+    fields, getter = field_getter(["power_w"])
+    assert fields == ("power_w",)
+    assert getter(measurement) == (100.0,)
+
+    _, getter = field_getter(["power_w", "tariff"])
+    assert getter(measurement) == (100.0, 2)
+
+
+@pytest.mark.parametrize("fields", [[], ["meter_model"], ["unknown"]])
+async def test_field_getter_rejects_invalid_fields(fields: list):
+    """Test empty, non-numeric and unknown fields are rejected."""
+    with pytest.raises(ValueError):
+        field_getter(fields)
@@ -0,0 +1,84 @@
+"""Test counter reset detection."""
+
+import pytest
+
+from homewizard_energy.counters import CounterReset, CounterResetDetector
+from homewizard_energy.models import Measurement
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_counter_reset_is_corrected():
+    """Test a counter that goes back is continued from its last value."""
+    resets = []
+    detector = CounterResetDetector(
+        fields=["energy_import_kwh", "any_power_fail_count"], on_reset=resets.append
+    )
+
+    first = Measurement(energy_import_kwh=100.0, any_power_fail_count=3, power_w=5)
+    assert detector.update(first, timestamp=1) is first
+    assert detector.update(Measurement(energy_import_kwh=101.0), timestamp=2) == (
+        Measurement(energy_import_kwh=101.0)
+    )
+
+    # Meter swapped, counters start again
+    corrected = detector.update(
+        Measurement(energy_import_kwh=0.5, any_power_fail_count=0, power_w=7),
+        timestamp=3,
+    )
+    assert corrected == Measurement(
+        energy_import_kwh=101.5, any_power_fail_count=3, power_w=7
+    )
+    assert isinstance(corrected.any_power_fail_count, int)
+    assert resets == [
+        CounterReset(
+            device=None,
+            field="energy_import_kwh",
+            timestamp=3,
+            previous=101.0,
+            value=0.5,
+            offset=101.0,
+        ),
+        CounterReset(
+            device=None,
+            field="any_power_fail_count",
+            timestamp=3,
+            previous=3,
+            value=0,
+            offset=3,
+        ),
+    ]
+
+    assert detector.update(Measurement(energy_import_kwh=2.0), timestamp=4) == (
+        Measurement(energy_import_kwh=103.0)
+    )
+    assert detector.offsets() == {"energy_import_kwh": 101.0, "any_power_fail_count": 3}
+
+
+async def test_counter_reset_per_device_and_noise():
+    """Test state is kept per device and small decreases are ignored."""
+    resets = []
+    detector = CounterResetDetector(fields=["total_liter_m3"], on_reset=resets.append)
+
+    detector.update(Measurement(total_liter_m3=10.0), device="a")
+    detector.update(Measurement(total_liter_m3=5.0), device="b")
+    assert detector.update(Measurement(total_liter_m3=9.9995), device="a") == (
+        Measurement(total_liter_m3=9.9995)
+    )
+    assert detector.update(Measurement(), device="a") == Measurement()
+    assert resets == []
+
+    assert detector.update(Measurement(total_liter_m3=1.0), device="a") == (
+        Measurement(total_liter_m3=11.0)
+    )
+    assert [reset.device for reset in resets] == ["a"]
+    assert detector.offsets("b") == {}
+
+    detector.forget("a")
+    assert detector.offsets("a") == {}
+
+
+async def test_counter_reset_rejects_unknown_fields():
+    """Test only counter fields are accepted."""
+    with pytest.raises(ValueError, match="Unknown counter Measurement field"):
+        CounterResetDetector(fields=["power_w"])
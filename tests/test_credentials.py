@@ -0,0 +1,104 @@
+"""Test the store of v2 credentials."""
+
+import stat
+
+import pytest
+
+from homewizard_energy.credentials import FileCredentialStore, restore_clients
+from homewizard_energy.models import Credentials, Device
+from homewizard_energy.v2 import HomeWizardEnergyV2
+
+pytestmark = [pytest.mark.asyncio]
+
+
+def credentials(serial: str) -> Credentials:
+    """Return credentials of a P1 Meter."""
+    device = Device.from_dict(
+        {
+            "product_name": "P1 Meter",
+            "product_type": "HWE-P1",
+            "serial": serial,
+            "api_version": "2.0.0",
+            "firmware_version": "4.19",
+        }
+    )
+    return Credentials(
+        id=device.id,
+        host=f"192.168.1.{int(serial) % 256}",
+        token="A" * 32,
+        device=device,
+    )
+
+
+async def test_saved_credentials_are_loaded(tmp_path):
+    """Test credentials survive a new store on the same file."""
+    path = tmp_path / "credentials.json"
+    first, second = credentials("1"), credentials("2")
+
+    await FileCredentialStore(path).save([first, second])
+    loaded = await FileCredentialStore(path).load()
+
+    assert loaded == {first.id: first, second.id: second}
+    assert loaded[first.id].device.api_version == "2.0.0"
+
+
+async def test_file_is_replaced_atomically(tmp_path):
+    """Test the file is private and no temporary files are left behind."""
+    path = tmp_path / "credentials.json"
+    store = FileCredentialStore(path)
+
+    await store.save([credentials("1")])
+    await store.save([credentials("2")])
+    await store.remove([credentials("1").id])
+
+    assert [file.name for file in tmp_path.iterdir()] == ["credentials.json"]
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    assert list(await FileCredentialStore(path).load()) == [credentials("2").id]
+
+
+async def test_failed_write_keeps_stored_credentials(tmp_path, monkeypatch):
+    """Test credentials are not changed when the file cannot be written."""
+    path = tmp_path / "credentials.json"
+    store = FileCredentialStore(path)
+    await store.save([credentials("1")])
+
+    def fail(_data: bytes) -> None:
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(store, "_replace", fail)
+    with pytest.raises(OSError):
+        await store.save([credentials("2")])
+    with pytest.raises(OSError):
+        await store.remove([credentials("1").id])
+
+    assert list(await store.load()) == [credentials("1").id]
+    assert list(await FileCredentialStore(path).load()) == [credentials("1").id]
+
+
+async def test_missing_file_is_empty(tmp_path):
+    """Test a store without a file has no credentials."""
+    assert await FileCredentialStore(tmp_path / "credentials.json").load() == {}
+
+
+async def test_clients_are_restored(tmp_path):
+    """Test clients are restored in bulk, without requests."""
+    store = FileCredentialStore(tmp_path / "credentials.json")
+    await store.save([credentials(str(serial)) for serial in range(1000)])
+
+    clients = await restore_clients(store)
+
+    assert len(clients) == 1000
+    client = clients["appliance/p1dongle/7"]
+    assert client.host == "192.168.1.7"
+    # The device is cached, so no request is made
+    assert (await client.device()).serial == "7"
+    assert client.credentials == credentials("7")
+
+
+async def test_credentials_unknown_before_device():
+    """Test a client without device has no credentials to store."""
+    client = HomeWizardEnergyV2("192.168.1.1", token="A" * 32)
+    assert client.credentials is None
+
+    client.restore(credentials("1"))
+    assert client.credentials == credentials("1")
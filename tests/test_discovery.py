@@ -0,0 +1,66 @@
+"""Test discovery of devices by scanning networks."""
+
+import pytest
+from simulator import DeviceSimulator, SimulatedDevice
+
+from homewizard_energy.discovery import scan
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_scan_finds_v1_and_v2_devices():
+    """Test devices on local addresses are found with their API version."""
+    socket = SimulatedDevice(
+        serial="3c39e7aabbcc", product_type="HWE-SKT", api_version=1, host="127.0.0.2"
+    )
+
+    async with DeviceSimulator([socket]):
+        meter = SimulatedDevice(
+            serial="5c2fafaabbcc", api_version=1, host="127.0.0.4", port=socket.port
+        )
+        p1 = SimulatedDevice(serial="5c2fafddeeff", api_version=2, host="127.0.0.3")
+
+        async with DeviceSimulator([meter, p1]):
+            found = await scan(
+                ["127.0.0.0/29", "127.0.0.2/32"],
+                concurrency=4,
+                v1_port=socket.port,
+                v2_port=p1.port,
+            )
+
+    assert [(item.ip, item.api_version) for item in found] == [
+        ("127.0.0.2", 1),
+        ("127.0.0.3", 2),
+        ("127.0.0.4", 1),
+    ]
+    assert found[0].host == socket.address
+    assert found[0].device.serial == "3c39e7aabbcc"
+    assert found[0].device.product_type == "HWE-SKT"
+    assert found[1].host == p1.address
+    assert found[1].device is None
+
+
+async def test_scan_without_devices():
+    """Test a scan of addresses without devices finds nothing."""
+    device = SimulatedDevice(serial="3c39e7aabbcc", api_version=1, host="127.0.0.2")
+
+    async with DeviceSimulator([device]):
+        found = await scan(
+            ["127.0.0.8/30"], v1_port=device.port, v2_port=None, connect_timeout=0.1
+        )
+
+    assert not found
+
+
+async def test_scan_probes_addresses_excluded_from_earlier_networks():
+    """Test the broadcast address of a network is probed when given separately."""
+    device = SimulatedDevice(serial="3c39e7aabbcc", api_version=1, host="127.0.0.7")
+
+    async with DeviceSimulator([device]):
+        found = await scan(
+            ["127.0.0.0/29", "127.0.0.7/32", "127.0.0.4/30"],
+            v1_port=device.port,
+            v2_port=None,
+        )
+
+    assert [item.ip for item in found] == ["127.0.0.7"]
@@ -0,0 +1,93 @@
+"""Test energy integration and counter reconciliation."""
+
+import numpy as np
+import pytest
+
+from homewizard_energy.energy import integrate_power, reconcile
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_integrate_power_irregular_timestamps():
+    """Test trapezoidal integration over irregular intervals."""
+    energy = integrate_power([0.0, 3600.0, 5400.0], [1000.0, 3000.0, 3000.0])
+
+    np.testing.assert_allclose(energy, [2.0, 1.5])
+
+
+async def test_reconcile_matches_counters():
+    """Test intervals match when samples cover all counted energy."""
+    arrays = {
+        "monotonic": np.array([0.0, 3600.0, 7200.0]),
+        "power_w": np.array([1000.0, 1000.0, -500.0]),
+        "energy_import_kwh": np.array([10.0, 11.0, 11.25]),
+        "energy_export_kwh": np.array([5.0, 5.0, 5.5]),
+    }
+
+    result = reconcile(arrays)
+
+    np.testing.assert_allclose(result.integrated_kwh, [1.0, 0.25])
+    np.testing.assert_allclose(result.counter_kwh, [1.0, -0.25])
+    assert result.gaps.tolist() == [False, True]
+    assert result.gap_intervals() == [(3600.0, 7200.0, -0.5)]
+
+
+async def test_reconcile_flags_missed_energy_per_tariff():
+    """Test energy missed between samples is flagged and attributed to a tariff."""
+    timestamps = np.array([0.0, 10.0, 20.0, 30.0])
+    arrays = {
+        "power_w": np.array([360.0, 360.0, 360.0, 360.0]),
+        "energy_import_kwh": np.array([1.0, 1.001, 1.5, 1.501]),
+        "energy_import_t1_kwh": np.array([1.0, 1.001, 1.001, 1.001]),
+        "energy_import_t2_kwh": np.array([0.0, 0.0, 0.499, 0.5]),
+        "tariff": np.array([np.nan, np.nan, 2.0, np.nan]),
+    }
+
+    result = reconcile(arrays, timestamps=timestamps)
+
+    assert result.gaps.tolist() == [False, True, False]
+    np.testing.assert_allclose(result.missing_kwh, [0.0, 0.498, 0.0], atol=1e-9)
+    np.testing.assert_allclose(result.tariff_integrated_kwh[1], [0.001, 0.0, 0.0])
+    np.testing.assert_allclose(result.tariff_integrated_kwh[2], [0.0, 0.001, 0.001])
+    np.testing.assert_allclose(result.tariff_counter_kwh[2], [0.0, 0.499, 0.001])
+
+
+async def test_reconcile_flags_missing_power_samples():
+    """Test intervals with a missing power sample are flagged as gap."""
+    arrays = {
+        "power_w": np.array([100.0, np.nan, 100.0]),
+        "energy_import_kwh": np.array([1.0, np.nan, 1.0]),
+    }
+
+    result = reconcile(arrays, timestamps=np.array([0.0, 1.0, 2.0]))
+
+    assert result.gaps.tolist() == [True, True]
+
+
+async def test_reconcile_flags_missing_counters():
+    """Test intervals with a missing counter are flagged as gap."""
+    arrays = {
+        "power_w": np.array([3600.0, 3600.0, 3600.0]),
+        "energy_import_kwh": np.array([1.0, np.nan, 1.002]),
+    }
+
+    result = reconcile(arrays, timestamps=np.array([0.0, 1.0, 2.0]))
+
+    assert result.gaps.tolist() == [True, True]
+
+
+async def test_reconcile_flags_tariff_register_jumps():
+    """Test a tariff register that jumps is flagged while the total matches."""
+    timestamps = np.array([0.0, 10.0, 20.0])
+    arrays = {
+        "power_w": np.array([360.0, 360.0, 360.0]),
+        "energy_import_kwh": np.array([1.0, 1.001, 1.002]),
+        "energy_import_t1_kwh": np.array([0.5, 0.5005, 1.0]),
+        "energy_import_t2_kwh": np.array([0.5, 0.5005, 0.002]),
+        "energy_import_t3_kwh": np.array([np.nan, np.nan, np.nan]),
+    }
+
+    result = reconcile(arrays, timestamps=timestamps)
+
+    assert result.gaps.tolist() == [False, True]
+    assert list(result.tariff_counter_kwh) == [1, 2]
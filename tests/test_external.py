@@ -0,0 +1,100 @@
+"""Test rates derived from external device readings."""
+
+from datetime import datetime
+
+import pytest
+
+from homewizard_energy.external import ExternalRate, ExternalRateEstimator
+from homewizard_energy.models import ExternalDevice, Measurement
+
+pytestmark = [pytest.mark.asyncio]
+
+GAS = ExternalDevice.DeviceType.GAS_METER
+HEAT = ExternalDevice.DeviceType.HEAT_METER
+
+
+def reading(
+    value: float,
+    hour: int,
+    minute: int = 0,
+    device_type: ExternalDevice.DeviceType = GAS,
+    unit: str = "m3",
+) -> ExternalDevice:
+    """Return a reading of an external device."""
+    return ExternalDevice(
+        unique_id="meter",
+        type=device_type,
+        value=value,
+        unit=unit,
+        timestamp=datetime(2024, 6, 28, hour, minute),
+    )
+
+
+async def test_rate_computed_on_new_reading_only():
+    """Test the rate is computed once per new timestamp and cached."""
+    rates = []
+    estimator = ExternalRateEstimator(on_rate=rates.append)
+
+    assert estimator.update_device(reading(100.0, 13)) is None
+    assert estimator.rate(GAS, "meter") is None
+
+    rate = estimator.update_device(reading(101.5, 14))
+    assert rate == ExternalRate(
+        type=GAS,
+        unique_id="meter",
+        rate=1.5,
+        unit="m3/h",
+        start=datetime(2024, 6, 28, 13),
+        end=datetime(2024, 6, 28, 14),
+        value=101.5,
+    )
+    assert rate.estimate(datetime(2024, 6, 28, 14, 30)) == 102.25
+
+    # Polling again returns the cached rate without computing a new one
+    assert estimator.update_device(reading(101.5, 14)) is rate
+    assert estimator.rate(GAS, "meter") is rate
+    assert rates == [rate]
+
+    assert estimator.update_device(reading(102.0, 14, 30)).rate == 1.0
+    assert len(rates) == 2
+
+
+async def test_rates_per_device_from_measurements():
+    """Test devices are kept apart by type and unique id."""
+    estimator = ExternalRateEstimator()
+
+    estimator.update(Measurement())
+    estimator.update(
+        Measurement(
+            external_devices={
+                "gas": reading(10.0, 12),
+                "heat": reading(5.0, 12, device_type=HEAT, unit="GJ"),
+            }
+        )
+    )
+    estimator.update(
+        Measurement(
+            external_devices={
+                "gas": reading(10.5, 12, 30),
+                "heat": reading(5.25, 13, device_type=HEAT, unit="GJ"),
+            }
+        )
+    )
+
+    rates = estimator.rates()
+    assert rates[(GAS, "meter")].rate == 1.0
+    assert rates[(HEAT, "meter")].rate == 0.25
+    assert rates[(HEAT, "meter")].unit == "GJ/h"
+
+
+async def test_rate_restarts_after_reset():
+    """Test a lower value or older timestamp starts again from that reading."""
+    estimator = ExternalRateEstimator()
+
+    estimator.update_device(reading(100.0, 12))
+    estimator.update_device(reading(101.0, 13))
+    assert estimator.update_device(reading(1.0, 14)) is None
+    assert estimator.rate(GAS, "meter") is None
+
+    assert estimator.update_device(reading(3.0, 15)).rate == 2.0
+    assert estimator.update_device(reading(4.0, 11)) is None
@@ -0,0 +1,87 @@
+"""Test the measurement history."""
+
+import math
+
+import pytest
+
+from homewizard_energy.history import MeasurementHistory
+from homewizard_energy.models import Measurement
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_history_keeps_samples_in_order():
+    """Test samples are returned oldest first before the history is full."""
+    history = MeasurementHistory(4, fields=["power_w", "voltage_v"])
+
+    history.append(Measurement(power_w=1.0, voltage_v=230.0), timestamp=10.0)
+    history.append(Measurement(power_w=2.0), timestamp=11.0)
+
+    assert len(history) == 2
+    assert list(history.timestamps()) == [10.0, 11.0]
+    assert list(history.column("power_w")) == [1.0, 2.0]
+
+    voltage = history.column("voltage_v")
+    assert voltage[0] == 230.0
+    assert math.isnan(voltage[1])
+
+
+async def test_history_wraps_around():
+    """Test the oldest samples are replaced when the history is full."""
+    history = MeasurementHistory(3, fields=["power_w"])
+
+    for value in range(7):
+        history.append(Measurement(power_w=value), timestamp=value)
+
+    assert len(history) == 3
+    assert list(history.column("power_w")) == [4.0, 5.0, 6.0]
+    assert list(history.timestamps()) == [4.0, 5.0, 6.0]
+
+
+async def test_history_column_is_zero_copy_view():
+    """Test columns are contiguous views on the preallocated storage."""
+    history = MeasurementHistory(2, fields=["power_w"])
+    history.append(Measurement(power_w=1.0))
+    history.append(Measurement(power_w=2.0))
+    history.append(Measurement(power_w=3.0))
+
+    view = history.column("power_w")
+
+    assert view.format == "d"
+    assert view.contiguous
+    assert view.nbytes == 2 * 8
+    assert list(view) == [2.0, 3.0]
+
+
+async def test_history_defaults_to_numeric_fields():
+    """Test all numeric fields are kept by default."""
+    history = MeasurementHistory(1)
+
+    assert "power_w" in history.fields
+    assert "tariff" in history.fields
+    assert "meter_model" not in history.fields
+
+
+async def test_history_clear():
+    """Test clearing the history."""
+    history = MeasurementHistory(2, fields=["power_w"])
+    history.append(Measurement(power_w=1.0))
+    history.clear()
+
+    assert len(history) == 0
+    assert list(history.column("power_w")) == []
+
+
+@pytest.mark.parametrize(
+    ("size", "fields"),
+    [
+        (0, None),
+        (1, ["meter_model"]),
+        (1, ["unknown"]),
+        (1, []),
+    ],
+)
+async def test_history_rejects_invalid_arguments(size: int, fields: list | None):
+    """Test invalid size and fields are rejected."""
+    with pytest.raises(ValueError):
+        MeasurementHistory(size, fields=fields)
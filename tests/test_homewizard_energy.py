@@ -1,7 +1,12 @@
 """Test the base class."""
 
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 
+import homewizard_energy
 from homewizard_energy.errors import UnsupportedError
 from homewizard_energy.homewizard_energy import HomeWizardEnergy
 
@@ -28,3 +33,24 @@ async def test_base_class_raises_notimplementederror(
     with pytest.raises(exception):
         async with HomeWizardEnergy("host") as api:
             await getattr(api, function)()
+
+
+async def test_import_is_lazy():
+    """Test importing the package does not load the clients and models."""
+    code = (
+        "import sys, homewizard_energy\n"
+        "assert 'aiohttp' not in sys.modules\n"
+        "assert 'homewizard_energy.models' not in sys.modules\n"
+        "assert 'HomeWizardEnergyV2' in dir(homewizard_energy)\n"
+        "from homewizard_energy import HomeWizardEnergyV2\n"
+        "assert 'homewizard_energy.v2' in sys.modules\n"
+    )
+    subprocess.run(
+        [sys.executable, "-c", code], check=True, cwd=Path(__file__).parent.parent
+    )
+
+
+async def test_unknown_attribute():
+    """Test accessing an unknown attribute of the package raises AttributeError."""
+    with pytest.raises(AttributeError):
+        _ = homewizard_energy.HomeWizardEnergyV3
@@ -0,0 +1,105 @@
+"""Test the append-only binary measurement log."""
+
+import math
+import struct
+
+import pytest
+
+from homewizard_energy.measurement_log import (
+    MeasurementLog,
+    MeasurementLogReader,
+)
+from homewizard_energy.models import Measurement
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_log_roundtrip(tmp_path):
+    """Test records are replayed as raw tuples and as measurements."""
+    path = tmp_path / "measurements.log"
+
+    with MeasurementLog(path, fields=["power_w", "tariff", "energy_import_kwh"]) as log:
+        assert len(log) == 0
+        log.append(Measurement(power_w=12.5, tariff=2), timestamp=1.0)
+        log.append(
+            Measurement(power_w=-3, tariff=1, energy_import_kwh=100.25),
+            timestamp=2.0,
+        )
+        assert len(log) == 2
+
+    with MeasurementLogReader(path) as reader:
+        assert reader.fields == ("power_w", "tariff", "energy_import_kwh")
+        assert len(reader) == 2
+
+        first, second = reader.records()
+        assert first[:4] == (1.0, (1 << 63) | 0b011, 12.5, 2.0)
+        assert math.isnan(first[4])
+        assert second == (2.0, (1 << 63) | 0b111, -3.0, 1.0, 100.25)
+
+        assert list(reader.measurements()) == [
+            (1.0, Measurement(power_w=12.5, tariff=2)),
+            (2.0, Measurement(power_w=-3.0, tariff=1, energy_import_kwh=100.25)),
+        ]
+        assert isinstance(next(reader.measurements())[1].tariff, int)
+
+
+async def test_log_grows_and_appends_to_existing(tmp_path):
+    """Test the file grows while appending and is trimmed on close."""
+    path = tmp_path / "measurements.log"
+
+    with MeasurementLog(path, fields=["power_w"], grow_records=2) as log:
+        for value in range(5):
+            log.append(Measurement(power_w=value), timestamp=value)
+    size = path.stat().st_size
+
+    with MeasurementLog(path, fields=["power_w"]) as log:
+        assert len(log) == 5
+        log.append(Measurement(power_w=5), timestamp=5)
+
+    assert path.stat().st_size == size + 24
+    with MeasurementLogReader(path) as reader:
+        assert [record[2] for record in reader.records()] == list(range(6))
+
+
+async def test_log_skips_incomplete_records(tmp_path):
+    """Test preallocated space and interrupted records are not replayed."""
+    path = tmp_path / "measurements.log"
+
+    log = MeasurementLog(path, fields=["power_w"])
+    log.append(Measurement(power_w=1), timestamp=1)
+    log.append(Measurement(power_w=2), timestamp=2)
+    log.flush()
+
+    # Simulate a crash while writing the second record, before the log is closed
+    with open(path, "r+b") as file:
+        offset = path.stat().st_size - 4096 * 24 + 24 + 8
+        file.seek(offset)
+        file.write(struct.pack("<Q", 1))
+
+    with MeasurementLogReader(path) as reader:
+        assert len(reader) == 1
+        assert list(reader.measurements()) == [(1.0, Measurement(power_w=1))]
+
+    log.close()
+
+
+async def test_log_rejects_invalid_files(tmp_path):
+    """Test invalid fields and files are rejected."""
+    path = tmp_path / "measurements.log"
+
+    with pytest.raises(ValueError, match="Unknown numeric Measurement field"):
+        MeasurementLog(path, fields=["wifi_ssid"])
+    with pytest.raises(ValueError, match="No fields given"):
+        MeasurementLog(path, fields=[])
+
+    with MeasurementLog(path, fields=["power_w"]):
+        pass
+    with pytest.raises(ValueError, match="Log holds other fields"):
+        MeasurementLog(path, fields=["voltage_v"])
+
+    other = tmp_path / "other.log"
+    other.write_bytes(b"not a measurement log")
+    with pytest.raises(ValueError, match="Not a measurement log"):
+        MeasurementLogReader(other)
+    with pytest.raises(ValueError, match="Not a measurement log"):
+        MeasurementLog(other)
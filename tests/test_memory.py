@@ -0,0 +1,79 @@
+"""Test polling does not leak memory."""
+
+import gc
+import tracemalloc
+
+import pytest
+from fake_session import FakeSession
+
+from homewizard_energy import HomeWizardEnergyV1, HomeWizardEnergyV2
+from homewizard_energy.models import Measurement
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def _growth(client, polls: int) -> int:
+    """Return how many bytes polling allocates and keeps, after a warm-up.
+
+    Memory is compared between two rounds of polls, so allocations that are
+    made once, like caches and histograms, are not counted.
+    """
+    for _ in range(100):
+        await client.measurement()
+        await client.combined()
+
+    tracemalloc.start()
+    usage = []
+    for _ in range(2):
+        for _ in range(polls):
+            await client.measurement()
+            await client.combined()
+        gc.collect()
+        usage.append(tracemalloc.get_traced_memory()[0])
+    tracemalloc.stop()
+    return usage[1] - usage[0]
+
+
+async def test_v1_polling_memory_is_flat():
+    """Test memory does not grow with the number of v1 polls."""
+    session = FakeSession(
+        {
+            "/api": "v1/fixtures/HWE-P1/device.json",
+            "/api/v1/data": "v1/fixtures/HWE-P1/data.json",
+            "/api/v1/system": "v1/fixtures/HWE-P1/system.json",
+        }
+    )
+    client = HomeWizardEnergyV1("127.0.0.1", clientsession=session)
+
+    assert await _growth(client, 300) < 16 * 1024
+
+
+async def test_v2_polling_memory_is_flat():
+    """Test memory does not grow with the number of v2 polls."""
+    session = FakeSession(
+        {
+            "/api": "v2/fixtures/HWE-P1/device.json",
+            "/api/measurement": (
+                "v2/fixtures/HWE-P1/measurement_3_phase_with_gas_with_watermeter.json"
+            ),
+            "/api/system": "v2/fixtures/HWE-P1/system.json",
+            "/api/batteries": "v2/fixtures/HWE-P1/batteries.json",
+        }
+    )
+    client = HomeWizardEnergyV2("127.0.0.1", token="token", clientsession=session)
+    client._ssl = True  # pylint: disable=protected-access
+
+    assert await _growth(client, 300) < 16 * 1024
+
+
+async def test_v1_measurement_adds_only_reported_fields():
+    """Test remapping v1 keys only adds the fields the device reported."""
+    payload = {"wifi_ssid": "My Wi-Fi", "active_power_w": 123.0}
+
+    remapped = Measurement.__pre_deserialize__(payload)
+
+    assert remapped == {
+        "wifi_ssid": "My Wi-Fi",
+        "active_power_w": 123.0,
+        "power_w": 123.0,
+    }
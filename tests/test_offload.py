@@ -0,0 +1,109 @@
+"""Test decoding responses in an executor."""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from homewizard_energy import HomeWizardEnergyV1
+from homewizard_energy.models import Measurement
+from homewizard_energy.offload import OffloadDecoder
+
+pytestmark = [pytest.mark.asyncio]
+
+FIXTURES = Path(__file__).parent
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Executor that counts the submitted jobs."""
+
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.jobs = 0
+
+    def submit(self, *args, **kwargs):
+        """Count and submit a job."""
+        self.jobs += 1
+        return super().submit(*args, **kwargs)
+
+
+async def test_concurrent_decodes_are_batched():
+    """Test decodes submitted together are decoded in one job."""
+    with CountingExecutor() as executor:
+        decoder = OffloadDecoder(executor, threshold=0)
+
+        results = await asyncio.gather(
+            *(decoder.decode(int, str(index)) for index in range(10))
+        )
+
+    assert results == list(range(10))
+    assert executor.jobs == 1
+
+
+async def test_batches_are_limited():
+    """Test a batch is submitted when it is full."""
+    with CountingExecutor() as executor:
+        decoder = OffloadDecoder(executor, threshold=0, max_batch=2)
+
+        results = await asyncio.gather(
+            *(decoder.decode(int, str(index)) for index in range(5))
+        )
+
+    assert results == list(range(5))
+    assert executor.jobs == 3
+
+
+async def test_errors_are_raised_per_decode():
+    """Test a failing decode does not fail the other decodes of its batch."""
+    decoder = OffloadDecoder(threshold=0)
+
+    results = await asyncio.gather(
+        decoder.decode(int, "1"),
+        decoder.decode(int, "invalid"),
+        return_exceptions=True,
+    )
+
+    assert results[0] == 1
+    assert isinstance(results[1], ValueError)
+
+
+async def test_decode_in_process_pool():
+    """Test models can be decoded in another process."""
+    payload = (FIXTURES / "v1/fixtures/HWE-P1/data.json").read_text()
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        decoder = OffloadDecoder(executor, threshold=0)
+        measurement = await decoder.decode(Measurement.from_json, payload)
+
+    assert measurement == Measurement.from_json(payload)
+
+
+async def test_client_decodes_large_responses_in_executor(aresponses):
+    """Test a client only offloads responses above the threshold."""
+    payload = (FIXTURES / "v1/fixtures/HWE-P1/data.json").read_text()
+    for _ in range(2):
+        aresponses.add(
+            "example.com",
+            "/api/v1/data",
+            "GET",
+            aresponses.Response(
+                text=payload,
+                status=200,
+                headers={"Content-Type": "application/json; charset=utf-8"},
+            ),
+        )
+
+    with CountingExecutor() as executor:
+        decoder = OffloadDecoder(executor, threshold=len(payload))
+        async with HomeWizardEnergyV1("example.com", decoder=decoder) as api:
+            measurement = await api.measurement()
+            assert executor.jobs == 1
+
+            decoder.threshold = len(payload) + 1
+            assert await api.measurement() == measurement
+            assert executor.jobs == 1
+
+            assert api.stats.histogram("api/v1/data", "decode").count == 2
+
+    assert measurement == Measurement.from_json(payload)
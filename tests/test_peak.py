@@ -0,0 +1,131 @@
+"""Test the quarter-hour average and monthly peak tracker."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from homewizard_energy.models import Measurement
+from homewizard_energy.peak import Peak, PeakTracker
+
+pytestmark = [pytest.mark.asyncio]
+
+START = datetime(2024, 1, 31, 23, 0, tzinfo=UTC)
+
+
+def at(seconds: float) -> datetime:
+    """Return the time seconds after START."""
+    return START + timedelta(seconds=seconds)
+
+
+async def test_peak_tracker_average_of_current_quarter():
+    """Test the average is time-weighted over the current quarter-hour."""
+    tracker = PeakTracker()
+    assert tracker.average_power_15m_w is None
+
+    tracker.update(1000, at(0))
+    assert tracker.average_power_15m_w == 1000
+
+    tracker.update(1000, at(300))
+    tracker.update(2000, at(300))
+    tracker.update(2000, at(600))
+
+    assert tracker.average_power_15m_w == pytest.approx(1500)
+    assert tracker.monthly_power_peak is None
+
+
+async def test_peak_tracker_closes_quarters_and_keeps_peak():
+    """Test completed quarter-hours become the peak, split at the boundary."""
+    tracker = PeakTracker()
+
+    tracker.update(4000, at(0))
+    tracker.update(4000, at(900))
+    assert tracker.monthly_power_peak == Peak(power_w=4000, timestamp=at(900))
+
+    # Ramp from 0 W to 2000 W over the boundary at 1800
+    tracker.update(0, at(1500))
+    tracker.update(2000, at(2100))
+
+    # 900..1500 ramps down from 4000 W, 1500..1800 ramps up from 0 to 1000 W
+    assert tracker.monthly_power_peak.power_w == 4000
+    assert tracker.average_power_15m_w == pytest.approx(1500)
+
+    tracker.update(10000, at(2700))
+    assert tracker.monthly_power_peak == Peak(
+        power_w=pytest.approx(4500), timestamp=at(2700)
+    )
+
+
+async def test_peak_tracker_repeated_timestamp_is_no_gap():
+    """Test a sample with the timestamp of the previous sample keeps the peak."""
+    tracker = PeakTracker()
+
+    for seconds in (0, 300, 300, 600, 900):
+        tracker.update(1000, at(seconds))
+
+    assert tracker.monthly_power_peak == Peak(power_w=1000, timestamp=at(900))
+
+
+async def test_peak_tracker_resets_peak_every_month():
+    """Test the peak only covers the month in which the quarter-hour ended."""
+    tracker = PeakTracker()
+
+    tracker.update(5000, at(0))
+    tracker.update(5000, at(900))
+    assert tracker.monthly_power_peak.power_w == 5000
+
+    # 2024-02-01 00:00 UTC closes the first quarter-hour of February
+    tracker.update(100, at(3600))
+    tracker.update(100, at(4500))
+    assert tracker.monthly_power_peak == Peak(power_w=100, timestamp=at(4500))
+
+
+async def test_peak_tracker_ignores_export_and_gaps():
+    """Test export counts as zero and long gaps are not interpolated."""
+    tracker = PeakTracker()
+
+    tracker.update(-3000, at(0))
+    tracker.update(1000, at(450))
+    tracker.update(1000, at(900))
+    assert tracker.monthly_power_peak.power_w == pytest.approx(750)
+
+    tracker.update(9000, at(2500))
+    assert tracker.monthly_power_peak.power_w == pytest.approx(750)
+    assert tracker.average_power_15m_w == 9000
+
+    # The quarter-hour after the gap was not observed from its start
+    tracker.update(100, at(2700))
+    assert tracker.monthly_power_peak.power_w == pytest.approx(750)
+
+
+async def test_peak_tracker_started_halfway_is_no_peak():
+    """Test a quarter-hour that was not observed from its start is no peak."""
+    tracker = PeakTracker()
+
+    tracker.update(3000, at(890))
+    tracker.update(100, at(900))
+    assert tracker.average_power_15m_w == 100
+    assert tracker.monthly_power_peak is None
+
+    tracker.update(100, at(1800))
+    assert tracker.monthly_power_peak == Peak(power_w=100, timestamp=at(1800))
+
+
+async def test_peak_tracker_measurements_and_deviations():
+    """Test measurements are tracked and compared with the reported values."""
+    tracker = PeakTracker()
+    tracker.update_measurement(Measurement())
+    assert tracker.average_power_15m_w is None
+
+    tracker.update_measurement(Measurement(power_w=500))
+    assert tracker.average_power_15m_w == 500
+
+    assert tracker.deviations(Measurement(power_w=500)) == {}
+    assert tracker.deviations(
+        Measurement(average_power_15m_w=450, monthly_power_peak_w=800)
+    ) == {"average_power_15m_w": 50}
+
+    tracker.update(500, at(0))
+    tracker.update(500, at(900))
+    assert tracker.deviations(
+        Measurement(average_power_15m_w=500, monthly_power_peak_w=800)
+    ) == {"average_power_15m_w": 0, "monthly_power_peak_w": -300}
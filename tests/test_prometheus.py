@@ -0,0 +1,103 @@
+"""Test the Prometheus exposition renderer."""
+
+import pytest
+
+from homewizard_energy.models import (
+    Batteries,
+    CombinedModels,
+    Device,
+    Measurement,
+    System,
+)
+from homewizard_energy.prometheus import PrometheusExporter
+
+pytestmark = [pytest.mark.asyncio]
+
+
+def device(
+    serial: str, product_type: str = "HWE-P1", firmware_version: str = "6.00"
+) -> Device:
+    """Return a device."""
+    return Device(
+        product_name="P1 meter",
+        product_type=product_type,
+        serial=serial,
+        api_version="v1",
+        firmware_version=firmware_version,
+    )
+
+
+async def test_render_groups_samples_per_metric():
+    """Test samples of all devices are grouped under one TYPE line per metric."""
+    exporter = PrometheusExporter()
+    assert exporter.render() == ""
+
+    exporter.update(
+        device("aa"),
+        measurement=Measurement(power_w=-543.0, energy_import_kwh=100.5),
+        system=System(wifi_rssi_db=-77, cloud_enabled=True),
+    )
+    exporter.update(device('b"b', "HWE-SKT"), measurement=Measurement(power_w=12))
+
+    assert exporter.render() == (
+        "# TYPE homewizard_device_info gauge\n"
+        'homewizard_device_info{serial="aa",product_type="HWE-P1",'
+        'product_name="P1 meter",firmware_version="6.00"} 1\n'
+        'homewizard_device_info{serial="b\\"b",product_type="HWE-SKT",'
+        'product_name="P1 meter",firmware_version="6.00"} 1\n'
+        "# TYPE homewizard_energy_import_kwh_total counter\n"
+        'homewizard_energy_import_kwh_total{serial="aa",product_type="HWE-P1"} 100.5\n'
+        "# TYPE homewizard_power_w gauge\n"
+        'homewizard_power_w{serial="aa",product_type="HWE-P1"} -543.0\n'
+        'homewizard_power_w{serial="b\\"b",product_type="HWE-SKT"} 12\n'
+        "# TYPE homewizard_wifi_rssi_db gauge\n"
+        'homewizard_wifi_rssi_db{serial="aa",product_type="HWE-P1"} -77\n'
+        "# TYPE homewizard_cloud_enabled gauge\n"
+        'homewizard_cloud_enabled{serial="aa",product_type="HWE-P1"} 1\n'
+    )
+
+
+async def test_render_latest_models_and_batteries():
+    """Test later updates replace models and batteries are rendered."""
+    exporter = PrometheusExporter(namespace="hwe")
+    exporter.update(device("aa"), measurement=Measurement(power_w=1))
+    exporter.update_combined(
+        CombinedModels(
+            device=device("aa"),
+            measurement=Measurement(power_w=2),
+            system=None,
+            state=None,
+            batteries=Batteries(
+                mode=Batteries.Mode.ZERO,
+                power_w=-10,
+                target_power_w=0,
+                max_consumption_w=800,
+                max_production_w=800,
+            ),
+        )
+    )
+    assert len(exporter) == 1
+
+    text = exporter.render()
+    assert 'hwe_power_w{serial="aa",product_type="HWE-P1"} 2\n' in text
+    assert 'hwe_batteries_power_w{serial="aa",product_type="HWE-P1"} -10\n' in text
+    assert "hwe_batteries_battery_count" not in text
+    assert text.endswith(
+        "# TYPE hwe_batteries_mode gauge\n"
+        'hwe_batteries_mode{serial="aa",product_type="HWE-P1",mode="zero"} 1\n'
+    )
+
+    exporter.remove("aa")
+    assert exporter.render() == ""
+
+
+async def test_render_changed_device_info():
+    """Test the device info is rendered again when the firmware changed."""
+    exporter = PrometheusExporter()
+    exporter.update(device("aa"), measurement=Measurement(power_w=1))
+    exporter.update(device("aa", firmware_version="6.01"))
+
+    text = exporter.render()
+    assert 'firmware_version="6.01"} 1\n' in text
+    assert 'firmware_version="6.00"' not in text
+    assert 'homewizard_power_w{serial="aa",product_type="HWE-P1"} 1\n' in text
@@ -0,0 +1,88 @@
+"""Test streaming rollups of measurements."""
+
+import pytest
+
+from homewizard_energy.models import Measurement
+from homewizard_energy.rollup import CounterStats, GaugeStats, RollupEngine
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_rollup_emits_closed_windows():
+    """Test windows are emitted with gauge and counter statistics."""
+    windows = []
+    engine = RollupEngine(
+        resolutions=(60, 120),
+        fields=["power_w", "energy_import_kwh"],
+        on_window=windows.append,
+    )
+
+    engine.update(Measurement(power_w=100, energy_import_kwh=1.0), timestamp=0)
+    engine.update(Measurement(power_w=300, energy_import_kwh=1.5), timestamp=30)
+    engine.update(Measurement(power_w=200, energy_import_kwh=2.0), timestamp=60)
+
+    assert len(windows) == 1
+    window = windows[0]
+    assert (window.resolution_s, window.start, window.end) == (60, 0, 60)
+    assert window.samples == 2
+    assert window.gauges == {
+        "power_w": GaugeStats(min=100.0, max=300.0, mean=200.0, last=300.0)
+    }
+    assert window.counters == {
+        "energy_import_kwh": CounterStats(first=1.0, last=1.5, delta=0.5)
+    }
+
+    engine.update(Measurement(power_w=400, energy_import_kwh=3.0), timestamp=120)
+
+    minute, two_minutes = windows[1:]
+    assert minute.counters["energy_import_kwh"].delta == 0.5
+    assert (two_minutes.resolution_s, two_minutes.samples) == (120, 3)
+    assert two_minutes.gauges["power_w"] == GaugeStats(
+        min=100.0, max=300.0, mean=200.0, last=200.0
+    )
+    assert two_minutes.counters["energy_import_kwh"].delta == 1.0
+    assert engine.latest(120) is two_minutes
+
+
+async def test_rollup_skips_missing_values_and_empty_windows():
+    """Test None values are ignored and windows without samples are not emitted."""
+    windows = []
+    engine = RollupEngine(resolutions=(10,), on_window=windows.append)
+
+    engine.update(Measurement(power_w=5), timestamp=1)
+    engine.update(Measurement(), timestamp=2)
+    engine.update(Measurement(power_w=7), timestamp=95)
+    engine.flush()
+
+    assert [window.start for window in windows] == [0, 90]
+    assert windows[0].samples == 2
+    assert windows[0].gauges["power_w"].mean == 5
+    assert "voltage_v" not in windows[0].gauges
+
+
+async def test_rollup_single_field():
+    """Test a single field can be aggregated."""
+    engine = RollupEngine(resolutions=(10,), fields=["power_w"])
+
+    engine.update(Measurement(power_w=1), timestamp=1)
+    engine.flush()
+
+    assert engine.latest(10).gauges["power_w"].last == 1
+    assert engine.latest(60) is None
+
+
+@pytest.mark.parametrize(
+    ("resolutions", "fields"),
+    [
+        ((), None),
+        ((0, 60), None),
+        ((60, 90), None),
+        ((60, 60), None),
+        ((60,), ["meter_model"]),
+        ((60,), []),
+    ],
+)
+async def test_rollup_rejects_invalid_arguments(resolutions: tuple, fields: list):
+    """Test invalid resolutions and fields are rejected."""
+    with pytest.raises(ValueError):
+        RollupEngine(resolutions=resolutions, fields=fields)
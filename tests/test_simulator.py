@@ -0,0 +1,172 @@
+"""Test the clients against simulated devices."""
+
+import pytest
+from simulator import DeviceSimulator, SimulatedDevice
+
+from homewizard_energy import HomeWizardEnergyV2
+from homewizard_energy.bulk import update_states
+from homewizard_energy.errors import (
+    DisabledError,
+    RequestError,
+    UnauthorizedError,
+    UnsupportedError,
+)
+from homewizard_energy.models import (
+    StateUpdate,
+    get_verification_hostname,
+)
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_v1_device():
+    """Test a v1 client reads and updates a simulated socket."""
+    device = SimulatedDevice(
+        serial="3c39e7aabbcc", product_type="HWE-SKT", api_version=1
+    )
+
+    async with DeviceSimulator([device]) as simulator:
+        async with simulator.client(device) as client:
+            assert (await client.device()).serial == "3c39e7aabbcc"
+
+            measurement = await client.measurement()
+            assert measurement.power_w is not None
+            assert measurement.energy_import_kwh > 0
+            assert measurement.wifi_ssid == "Simulated Wi-Fi"
+
+            state = await client.state(power_on=False)
+            assert state.power_on is False
+            assert device.power_on is False
+            assert (await client.measurement()).power_w == 0
+
+            await client.identify()
+            assert device.identify_count == 1
+
+            with pytest.raises(UnsupportedError):
+                await client.telegram()
+
+
+async def test_v1_disabled_api():
+    """Test a v1 device answers with 403 when the API is disabled."""
+    device = SimulatedDevice(serial="3c39e7aabbcc", api_version=1, api_enabled=False)
+
+    async with DeviceSimulator([device]) as simulator:
+        async with simulator.client(device) as client:
+            with pytest.raises(DisabledError):
+                await client.measurement()
+
+
+async def test_v2_device_over_tls():
+    """Test a v2 client verifies the device certificate by its identifier."""
+    device = SimulatedDevice(serial="5c2fafaabbcc", product_type="HWE-P1")
+
+    async with DeviceSimulator([device]) as simulator:
+        async with simulator.client(device) as client:
+            assert (await client.device()).id == device.identifier
+
+            measurement = await client.measurement()
+            assert measurement.tariff in (1, 2)
+            assert measurement.external_devices
+            assert (await client.telegram()).startswith("/ISK5")
+
+            system = await client.system(status_led_brightness_pct=50)
+            assert system.status_led_brightness_pct == 50
+
+            batteries = await client.batteries()
+            assert batteries.battery_count == 2
+
+            await client.identify()
+            assert device.identify_count == 1
+
+        # A certificate issued to another device is rejected
+        client = HomeWizardEnergyV2(
+            device.address,
+            identifier=get_verification_hostname("HWE-P1", "000000000000"),
+            token=next(iter(device.tokens)),
+            cacert=simulator.cacert,
+        )
+        async with client:
+            with pytest.raises(RequestError):
+                await client.device()
+
+
+async def test_v2_token_handling():
+    """Test tokens are checked, created after a button press and revoked."""
+    device = SimulatedDevice(serial="5c2fafaabbcc", product_type="HWE-KWH1")
+
+    async with DeviceSimulator([device]) as simulator:
+        client = HomeWizardEnergyV2(
+            device.address,
+            identifier=device.identifier,
+            token="invalid",
+            cacert=simulator.cacert,
+        )
+        async with client:
+            with pytest.raises(UnauthorizedError):
+                await client.measurement()
+
+            with pytest.raises(DisabledError):
+                await client.get_token("test")
+
+            device.user_creation_enabled = True
+            token = await client.get_token("test")
+            assert token in device.tokens
+
+            client._token = token  # pylint: disable=protected-access
+            assert (await client.measurement()).power_w is not None
+
+            await client.delete_token()
+            assert token not in device.tokens
+
+
+async def test_many_loopback_devices():
+    """Test devices on separate loopback addresses are told apart."""
+    devices = [
+        SimulatedDevice(serial=f"5c2faf{index:06x}", host=f"127.0.0.{index + 2}")
+        for index in range(5)
+    ]
+
+    async with DeviceSimulator(devices) as simulator:
+        for device in devices:
+            async with simulator.client(device) as client:
+                assert (await client.device()).serial == device.serial
+
+
+async def test_measurements_vary_over_time():
+    """Test counters increase and readings are reproducible per serial."""
+    device = SimulatedDevice(serial="5c2fafaabbcc", product_type="HWE-P1")
+    other = SimulatedDevice(serial="5c2fafaabbcc", product_type="HWE-P1")
+
+    first = device.measurement(1_000_000.0)
+    later = device.measurement(1_003_600.0)
+
+    assert (
+        other.measurement(1_000_000.0)["energy_import_kwh"]
+        == first["energy_import_kwh"]
+    )
+    assert later["energy_import_kwh"] >= first["energy_import_kwh"]
+    assert later["external"][0]["value"] > first["external"][0]["value"]
+
+
+async def test_bulk_state_update():
+    """Test a state update is applied to every simulated socket."""
+    sockets = [
+        SimulatedDevice(
+            serial=f"3c39e7{index:06x}",
+            product_type="HWE-SKT",
+            api_version=1,
+            host=f"127.0.0.{index + 2}",
+        )
+        for index in range(3)
+    ]
+    meter = SimulatedDevice(serial="5c2fafaabbcc", api_version=1, host="127.0.0.9")
+
+    async with DeviceSimulator([*sockets, meter]) as simulator:
+        clients = [simulator.client(device) for device in (*sockets, meter)]
+        results = await update_states(clients, StateUpdate(power_on=False))
+        for client in clients:
+            await client.close()
+
+    assert all(results[socket.address].success for socket in sockets)
+    assert not any(socket.power_on for socket in sockets)
+    assert isinstance(results[meter.address].error, UnsupportedError)
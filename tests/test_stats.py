@@ -0,0 +1,42 @@
+"""Test request statistics."""
+
+import pytest
+
+from homewizard_energy.stats import Histogram, RequestStats
+
+pytestmark = [pytest.mark.asyncio]
+
+
+async def test_histogram_buckets_and_quantiles():
+    """Test observations are counted per bucket with an overflow bucket."""
+    histogram = Histogram(bounds=(0.01, 0.1, 1.0))
+    assert histogram.mean is None
+    assert histogram.quantile(0.5) is None
+
+    for value in (0.005, 0.01, 0.05, 0.05, 3.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 2, 0, 1]
+    assert histogram.count == 5
+    assert histogram.mean == pytest.approx(0.623)
+    assert histogram.max == 3.0
+    assert histogram.quantile(0.4) == 0.01
+    assert histogram.quantile(0.8) == 0.1
+    assert histogram.quantile(0.99) == 3.0
+
+
+async def test_request_stats_timed_and_reset():
+    """Test durations are recorded even when the call raises."""
+    stats = RequestStats()
+
+    assert stats.timed("/api", "decode", int, "5") == 5
+    with pytest.raises(ValueError):
+        stats.timed("/api", "decode", int, "five")
+
+    assert stats.histogram("/api", "decode").count == 2
+    assert stats.histogram("/api", "request") is None
+
+    stats.errors[("/api", "RequestError")] += 1
+    stats.reset()
+    assert stats.histograms() == {}
+    assert not stats.errors
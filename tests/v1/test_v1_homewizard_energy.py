@@ -6,10 +6,14 @@ from unittest.mock import AsyncMock, patch
 
 import aiohttp
 import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 from syrupy.assertion import SnapshotAssertion
 
 from homewizard_energy import HomeWizardEnergyV1
+from homewizard_energy.blocking import BlockingSection
 from homewizard_energy.errors import DisabledError, RequestError, UnsupportedError
+from homewizard_energy.tracing import ConnectionTrace
 
 from . import load_fixtures
 
@@ -516,6 +520,147 @@ async def test_get_data_object_with_known_device(
             await api.close()
 
 
+async def test_get_data_fields(aresponses):
+    """Test fetches only the requested measurement fields."""
+
+    aresponses.add(
+        "example.com",
+        "/api/v1/data",
+        "GET",
+        aresponses.Response(
+            text=load_fixtures("HWE-P1/data.json"),
+            status=200,
+            headers={"Content-Type": "application/json; charset=utf-8"},
+        ),
+    )
+
+    async with HomeWizardEnergyV1("example.com") as api:
+        measurement = await api.measurement(fields=["power_w", "energy_import_kwh"])
+        assert measurement == {"power_w": -543.0, "energy_import_kwh": 13779.338}
+
+
+async def test_get_data_object_is_added_to_history(aresponses):
+    """Test measurements are added to the history when enabled."""
+
+    for _ in range(2):
+        aresponses.add(
+            "example.com",
+            "/api/v1/data",
+            "GET",
+            aresponses.Response(
+                text=load_fixtures("HWE-P1/data.json"),
+                status=200,
+                headers={"Content-Type": "application/json; charset=utf-8"},
+            ),
+        )
+
+    async with HomeWizardEnergyV1("example.com", history_size=10) as api:
+        await api.measurement()
+        await api.measurement(fields=["power_w"])
+
+        assert len(api.history) == 1
+        assert list(api.history.column("power_w")) == [-543.0]
+
+
+async def test_request_stats_per_endpoint_and_phase(aresponses):
+    """Test request phases and errors are recorded per endpoint."""
+
+    aresponses.add(
+        "example.com",
+        "/api/v1/data",
+        "GET",
+        aresponses.Response(
+            text=load_fixtures("HWE-P1/data.json"),
+            status=200,
+            headers={"Content-Type": "application/json; charset=utf-8"},
+        ),
+    )
+    aresponses.add(
+        "example.com",
+        "/api/v1/state",
+        "GET",
+        aresponses.Response(text="Not Found", status=404),
+    )
+
+    async with HomeWizardEnergyV1("example.com") as api:
+        await api.measurement()
+        with pytest.raises(UnsupportedError):
+            await api.state()
+
+        phases = api.stats.histograms()["api/v1/data"]
+        assert set(phases) == {"request", "body_read", "decode", "connect", "ttfb"}
+        assert all(histogram.count == 1 for histogram in phases.values())
+        assert api.stats.histogram("api/v1/data", "decode").sum > 0
+
+        assert api.stats.histogram("api/v1/state", "decode") is None
+        assert api.stats.errors == {("api/v1/state", "NotFoundError"): 1}
+        assert not api.stats.retries
+
+
+async def test_connection_reuse_is_traced():
+    """Test connections to a device are traced and reused between requests."""
+
+    async def data(_request: web.Request) -> web.Response:
+        return web.Response(
+            text=load_fixtures("HWE-P1/data.json"), content_type="application/json"
+        )
+
+    app = web.Application()
+    app.router.add_get("/api/v1/data", data)
+
+    async with TestServer(app, host="127.0.0.1") as server:
+        host = f"127.0.0.1:{server.port}"
+        traces: list[ConnectionTrace] = []
+
+        async with HomeWizardEnergyV1(host) as api:
+            remove_listener = api.add_connection_listener(traces.append)
+            await api.measurement()
+            await api.measurement()
+            remove_listener()
+            await api.measurement()
+
+            assert api.stats.connections_created == {"api/v1/data": 1}
+            assert api.stats.connections_reused == {"api/v1/data": 2}
+            assert api.stats.histogram("api/v1/data", "connect").count == 1
+            assert api.stats.histogram("api/v1/data", "ttfb").count == 3
+
+    first, second = traces
+    assert (first.host, first.endpoint, first.method) == (host, "api/v1/data", "GET")
+    assert not first.reused
+    assert first.connect is not None
+    assert first.dns is None
+    assert second.reused
+    assert second.connect is None
+    assert second.ttfb <= second.total
+    assert second.error is None
+
+
+async def test_get_data_object_calls_measurement_listeners(aresponses):
+    """Test measurement listeners are called until removed."""
+
+    for _ in range(2):
+        aresponses.add(
+            "example.com",
+            "/api/v1/data",
+            "GET",
+            aresponses.Response(
+                text=load_fixtures("HWE-P1/data.json"),
+                status=200,
+                headers={"Content-Type": "application/json; charset=utf-8"},
+            ),
+        )
+
+    received = []
+    async with HomeWizardEnergyV1("example.com") as api:
+        remove_listener = api.add_measurement_listener(received.append)
+        await api.measurement()
+        remove_listener()
+        await api.measurement()
+
+    assert len(received) == 1
+    assert received[0].power_w == -543.0
+
+
 @pytest.mark.parametrize(
     ("model", "fixtures"),
     [
@@ -880,6 +1025,109 @@ async def test_system_routes_brightness_to_state(aresponses):
         await api.close()
 
 
+async def test_get_system_fields(aresponses):
+    """Test fetches only the requested system fields."""
+
+    aresponses.add(
+        "example.com",
+        "/api/v1/system",
+        "GET",
+        aresponses.Response(
+            text=json.dumps({"cloud_enabled": True}),
+            status=200,
+            headers={"Content-Type": "application/json; charset=utf-8"},
+        ),
+    )
+
+    async with HomeWizardEnergyV1("example.com") as api:
+        system = await api.system(fields=["cloud_enabled", "uptime_s"])
+        assert system == {"cloud_enabled": True, "uptime_s": None}
+
+
+async def test_system_routes_brightness_to_state_with_fields(aresponses):
+    """Test system sets brightness to state and returns requested fields."""
+
+    aresponses.add(
+        "example.com",
+        "/api/v1/state",
+        "PUT",
+        aresponses.Response(
+            text=load_fixtures("HWE-SKT/state_brightness.json"),
+            status=200,
+            headers={"Content-Type": "application/json; charset=utf-8"},
+        ),
+    )
+
+    async with HomeWizardEnergyV1("example.com") as api:
+        system = await api.system(
+            status_led_brightness_pct=100, fields=["status_led_brightness_pct"]
+        )
+        assert system == {"status_led_brightness_pct": 100}
+
+
+async def test_combined_fields_only_fetches_required_endpoints(aresponses):
+    """Test combined with fields remaps legacy values like CombinedModels."""
+
+    aresponses.add(
+        "example.com",
+        "/api/v1/data",
+        "GET",
+        aresponses.Response(
+            text=load_fixtures("HWE-SKT/data.json"),
+            status=200,
+            headers={"Content-Type": "application/json; charset=utf-8"},
+        ),
+    )
+
+    aresponses.add(
+        "example.com",
+        "/api/v1/system",
+        "GET",
+        aresponses.Response(
+            text=load_fixtures("HWE-SKT/system.json"),
+            status=200,
+            headers={"Content-Type": "application/json; charset=utf-8"},
+        ),
+    )
+
+    aresponses.add(
+        "example.com",
+        "/api/v1/state",
+        "GET",
+        aresponses.Response(
+            text=load_fixtures("HWE-SKT/state_brightness.json"),
+            status=200,
+            headers={"Content-Type": "application/json; charset=utf-8"},
+        ),
+    )
+
+    async with HomeWizardEnergyV1("example.com") as api:
+        data = await api.combined(
+            fields=[
+                "power_w",
+                "wifi_ssid",
+                "wifi_strength_pct",
+                "status_led_brightness_pct",
+            ]
+        )
+
+    aresponses.assert_plan_strictly_followed()
+    assert data == {
+        "power_w": 123.0,
+        "wifi_ssid": "My Wi-Fi",
+        "wifi_strength_pct": 100,
+        "status_led_brightness_pct": 100.0,
+    }
+
+
+async def test_combined_fields_rejects_unknown_fields():
+    """Test combined with unknown fields raises before any request."""
+
+    async with HomeWizardEnergyV1("example.com") as api:
+        with pytest.raises(ValueError):
+            await api.combined(fields=["unknown"])
+
+
 # pylint: disable=protected-access
 async def test_request_handles_timeout():
     """Test request raises timeout when request takes too long."""
@@ -893,6 +1141,9 @@ async def test_request_handles_timeout():
         await api._request("api/v1/data")
 
     assert api._session.request.call_count == 3
+    assert api.stats.timeouts == {"api/v1/data": 3}
+    assert api.stats.retries == {"api/v1/data": 2}
+    assert api.stats.errors == {("api/v1/data", "RequestError"): 3}
 
 
 async def test_close_when_out_of_scope():
@@ -904,3 +1155,30 @@ async def test_close_when_out_of_scope():
         assert hwe == api
 
     assert api.close.call_count == 1
+
+
+async def test_blocking_sections_are_reported(aresponses):
+    """Test synchronous sections are attributed to the endpoint and host."""
+
+    aresponses.add(
+        "example.com",
+        "/api/v1/data",
+        "GET",
+        aresponses.Response(
+            text=load_fixtures("HWE-P1/data.json"),
+            status=200,
+            headers={"Content-Type": "application/json; charset=utf-8"},
+        ),
+    )
+
+    async with HomeWizardEnergyV1("example.com") as api:
+        sections: list[BlockingSection] = []
+        api.add_blocking_listener(sections.append, threshold=0)
+        await api.measurement()
+
+    assert {section.host for section in sections} == {"example.com"}
+    assert {section.method for section in sections} == {"measurement"}
+    assert sections[-1].endpoint == "api/v1/data"
+    assert sections[-1].start.startswith("v1/__init__.py:")
+    assert sections[-1].end == "return"
+    assert api.stats.histogram("api/v1/data", "blocking").count == len(sections)
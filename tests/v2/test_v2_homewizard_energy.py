@@ -484,6 +484,82 @@ async def test_measurement_with_valid_authentication(
             assert measurement == snapshot
 
 
+async def test_measurement_fields_with_valid_authentication(aresponses):
+    """Test measurement request decodes only the requested fields."""
+
+    aresponses.add(
+        "example.com",
+        "/api/measurement",
+        "GET",
+        aresponses.Response(
+            text=load_fixtures(
+                "HWE-P1/measurement_3_phase_with_gas_with_watermeter.json"
+            ),
+            status=200,
+            headers={"Content-Type": "application/json"},
+        ),
+    )
+
+    async with HomeWizardEnergyV2("example.com", token="token") as api:
+        measurement = await api.measurement(fields=["power_w", "tariff"])
+        assert measurement == {"power_w": -543.0, "tariff": 2}
+
+
+async def test_measurement_is_added_to_history(aresponses):
+    """Test measurements are added to the history when enabled."""
+
+    aresponses.add(
+        "example.com",
+        "/api/measurement",
+        "GET",
+        aresponses.Response(
+            text=load_fixtures(
+                "HWE-P1/measurement_3_phase_with_gas_with_watermeter.json"
+            ),
+            status=200,
+            headers={"Content-Type": "application/json"},
+        ),
+    )
+
+    async with HomeWizardEnergyV2("example.com", token="token") as api:
+        assert api.history is None
+
+    async with HomeWizardEnergyV2("example.com", token="token", history_size=10) as api:
+        await api.measurement()
+        assert list(api.history.column("power_w")) == [-543.0]
+
+
+async def test_measurement_records_request_stats(aresponses):
+    """Test request phases, including waiting for the lock, are recorded."""
+
+    aresponses.add(
+        "example.com",
+        "/api/measurement",
+        "GET",
+        aresponses.Response(
+            text=load_fixtures(
+                "HWE-P1/measurement_3_phase_with_gas_with_watermeter.json"
+            ),
+            status=200,
+            headers={"Content-Type": "application/json"},
+        ),
+    )
+
+    async with HomeWizardEnergyV2("example.com", token="token") as api:
+        await api.measurement()
+
+        phases = api.stats.histograms()["/api/measurement"]
+        assert set(phases) == {
+            "lock_wait",
+            "request",
+            "body_read",
+            "decode",
+            "connect",
+            "ttfb",
+        }
+        assert all(histogram.count == 1 for histogram in phases.values())
+
+
 ### Telegram tests ###
 
 
@@ -595,6 +671,59 @@ async def test_system_with_valid_authentication(
             assert system == snapshot
 
 
+async def test_system_fields_with_valid_authentication(aresponses):
+    """Test system request decodes only the requested fields."""
+
+    aresponses.add(
+        "example.com",
+        "/api/system",
+        "GET",
+        aresponses.Response(
+            text=load_fixtures("HWE-P1/system.json"),
+            status=200,
+            headers={"Content-Type": "application/json"},
+        ),
+    )
+
+    async with HomeWizardEnergyV2("example.com", token="token") as api:
+        system = await api.system(fields=["wifi_strength_pct", "uptime_s"])
+        assert system == {"wifi_strength_pct": 46, "uptime_s": 356}
+
+
+async def test_combined_fields_with_valid_authentication(aresponses):
+    """Test combined request with fields only fetches measurement and system."""
+
+    aresponses.add(
+        "example.com",
+        "/api/measurement",
+        "GET",
+        aresponses.Response(
+            text=load_fixtures(
+                "HWE-P1/measurement_3_phase_with_gas_with_watermeter.json"
+            ),
+            status=200,
+            headers={"Content-Type": "application/json"},
+        ),
+    )
+
+    aresponses.add(
+        "example.com",
+        "/api/system",
+        "GET",
+        aresponses.Response(
+            text=load_fixtures("HWE-P1/system.json"),
+            status=200,
+            headers={"Content-Type": "application/json"},
+        ),
+    )
+
+    async with HomeWizardEnergyV2("example.com", token="token") as api:
+        data = await api.combined(fields=["power_w", "wifi_ssid", "cloud_enabled"])
+
+    aresponses.assert_plan_strictly_followed()
+    assert data == {"power_w": -543.0, "wifi_ssid": "My Wi-Fi", "cloud_enabled": False}
+
+
 async def test_system_set_with_valid_authentication(aresponses):
     """Test system set request is successful when valid authentication is provided."""
 
@@ -769,6 +898,60 @@ async def test_batteries_put_with_valid_authentication(
         assert batteries == snapshot
 
 
+async def test_batteries_put_skips_known_mode(aresponses):
+    """Test setting the mode the batteries already have is skipped while fresh."""
+
+    for method in ("GET", "PUT", "PUT"):
+        aresponses.add(
+            "example.com",
+            "/api/batteries",
+            method,
+            aresponses.Response(
+                text=load_fixtures("HWE-P1/batteries.json"),
+                status=200,
+                headers={"Content-Type": "application/json"},
+            ),
+        )
+
+    async with HomeWizardEnergyV2("example.com", token="token") as api:
+        known = await api.batteries()
+        assert known.mode == Batteries.Mode.ZERO
+
+        # Known and fresh, nothing is sent
+        assert await api.batteries(mode=Batteries.Mode.ZERO, max_age=60) is known
+        assert api.stats.writes_avoided == {"/api/batteries": 1}
+
+        # A different mode, or the same mode without max_age, is sent
+        await api.batteries(mode=Batteries.Mode.ZERO_CHARGE_ONLY, max_age=60)
+        await api.batteries(mode=Batteries.Mode.ZERO)
+        assert api.stats.writes_avoided == {"/api/batteries": 1}
+
+    aresponses.assert_all_requests_matched()
+
+
+async def test_batteries_put_sends_known_mode_when_stale(aresponses):
+    """Test a mode is set again when the last known state is too old."""
+
+    for method in ("PUT", "PUT"):
+        aresponses.add(
+            "example.com",
+            "/api/batteries",
+            method,
+            aresponses.Response(
+                text=load_fixtures("HWE-P1/batteries.json"),
+                status=200,
+                headers={"Content-Type": "application/json"},
+            ),
+        )
+
+    async with HomeWizardEnergyV2("example.com", token="token") as api:
+        await api.batteries(mode=Batteries.Mode.ZERO)
+        await api.batteries(mode=Batteries.Mode.ZERO, max_age=0)
+        assert not api.stats.writes_avoided
+
+    aresponses.assert_all_requests_matched()
+
+
 ### Identify tests ###
 
 
@@ -1043,6 +1226,8 @@ async def test_request_handles_timeout():
             await api.device()
 
         assert api._session.request.call_count == 3
+        assert api.stats.timeouts == {"/api": 3}
+        assert api.stats.retries == {"/api": 2}
 
 
 # pylint: disable=protected-access
@@ -1056,6 +1241,8 @@ async def test_request_handles_clienterror():
             await api.device()
 
         assert api._session.request.call_count == 3
+        assert not api.stats.timeouts
+        assert api.stats.errors == {("/api", "RequestError"): 3}
 
 
 async def test_request_with_identifier_sets_common_name(aresponses):